@@ -0,0 +1,372 @@
+"""
+Benchmarks for RoicScraper against synthetic roic.ai pages served from a local stand-in server.
+
+The pages in `synthetic_pages` are hand-built to mimic the table markup the XPaths in PAGE_TABLES
+expect, with random values. They were not recorded from the live site, so the parser is unverified
+against the live DOM, and the timings only compare versions of this code on the same input.
+
+    python benchmarks/bench.py --tickers 500 --output bench_results.json
+
+Every stage of a scrape (browser start, page load, label discovery, cell extraction, DataFrame
+build, CSV write) is timed per table. A synthetic batch of tickers is then scraped end to end
+through the HTTP path. Its tables are loaded as DataFrames and as a Universe to compare memory,
+and fresh interpreters time the import and first cached read of a worker.
+Pass --chromedriver to also time the browser stages with headless Chrome.
+Results are written as JSON so runs of different versions can be compared.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import threading
+import gc
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import roic_scraper  # noqa: E402
+from roic_scraper import (  # noqa: E402
+    PAGE_TABLES,
+    CsvStorage,
+    RoicReader,
+    RoicScraper,
+    ScrapeProfile,
+    Universe,
+    build_table,
+    extract_table_cells,
+    get_http_session,
+    lxml_html,
+    parse_table_labels,
+    _find_table,
+)
+
+SYNTHETIC_PAGES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "synthetic_pages")
+
+
+"""----------------------------------- Stand-in Server -----------------------------------"""
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    pages = {}  # Page name -> HTML bytes, filled in by StubServer.
+
+    def do_GET(self) -> None:
+        # /quote/{TICKER}:{COUNTRY} is the summary page, /quote/{TICKER}:{COUNTRY}/{page} the others.
+        parts = self.path.strip("/").split("/")
+        page = parts[2] if len(parts) > 2 else "summary"
+        body = self.pages.get(page)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass  # Keep the benchmark output clean.
+
+
+class StubServer:
+    """Serves the synthetic pages in `synthetic_pages` for any ticker, on a free local port."""
+
+    def __init__(self, pages_folder: str = SYNTHETIC_PAGES_FOLDER) -> None:
+        pages = {}
+        for page in PAGE_TABLES:
+            with open(os.path.join(pages_folder, f"{page}.html"), "rb") as file:
+                pages[page] = file.read()
+        handler = type("PageHandler", (_PageHandler,), {"pages": pages})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+"""----------------------------------- Stage Benchmarks -----------------------------------"""
+
+
+def _summarize(samples: list) -> dict:
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "runs": len(samples),
+    }
+
+
+def bench_stages(site_url: str, output_folder: str, runs: int, chromedriver: str = None) -> dict:
+    """
+    :return: (dict) Page -> stage -> timing summary, and page -> table -> stage -> timing summary.
+    """
+    results = {}
+    storage = CsvStorage(output_folder)
+    for page, tables in PAGE_TABLES.items():
+        scraper_url = f"{site_url}/quote/BENCH:US"
+        url = scraper_url if page == "summary" else f"{scraper_url}/{page}"
+        page_samples = {"browser_start": [], "page_load": []}
+        table_samples = {
+            name: {
+                "label_discovery": [],
+                "cell_extraction": [],
+                "dataframe_build": [],
+                "csv_write": [],
+            }
+            for name in tables
+        }
+
+        for _ in range(runs):
+            if chromedriver is not None:
+                start = time.perf_counter()
+                browser = ScrapeProfile().start_browser(chromedriver)
+                page_samples["browser_start"].append(time.perf_counter() - start)
+                try:
+                    start = time.perf_counter()
+                    browser.get(url)
+                    roic_scraper.WebDriverWait(browser, roic_scraper.READY_TIMEOUT).until(
+                        roic_scraper._TablesReady(list(tables.values()))
+                    )
+                    source = browser.page_source
+                    page_samples["page_load"].append(time.perf_counter() - start)
+                finally:
+                    browser.quit()
+            else:
+                start = time.perf_counter()
+                source = get_http_session().get(url).content
+                page_samples["page_load"].append(time.perf_counter() - start)
+
+            snapshot = lxml_html.document_fromstring(source)
+            for name, table_xpath in tables.items():
+                samples = table_samples[name]
+
+                start = time.perf_counter()
+                table = _find_table(snapshot, table_xpath)
+                labels = parse_table_labels(table)
+                samples["label_discovery"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                grid, col_labels = extract_table_cells(table, labels)
+                samples["cell_extraction"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                df = build_table(grid, labels["rows"], col_labels)
+                samples["dataframe_build"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                storage.write("BENCH", name, df)
+                samples["csv_write"].append(time.perf_counter() - start)
+
+        results[page] = {
+            "stages": {
+                stage: _summarize(samples)
+                for stage, samples in page_samples.items()
+                if samples
+            },
+            "tables": {
+                name: {stage: _summarize(s) for stage, s in samples.items()}
+                for name, samples in table_samples.items()
+            },
+        }
+    return results
+
+
+"""----------------------------------- Batch Benchmark -----------------------------------"""
+
+
+def bench_batch(site_url: str, output_folder: str, n_tickers: int) -> dict:
+    """
+    Scrape every page of `n_tickers` synthetic tickers through RoicScraper's HTTP path.
+
+    :return: (dict) Total and per-ticker timings.
+    """
+    storage = CsvStorage(output_folder)
+    per_ticker = []
+    start = time.perf_counter()
+    for i in range(n_tickers):
+        ticker_start = time.perf_counter()
+        scraper = RoicScraper(
+            f"T{i:04d}",
+            http_first=True,
+            site_url=site_url,
+            storage=storage,
+            memory_cache=None,
+        )
+        scraper.get_summary()
+        scraper.get_all_financial_statements()
+        scraper.get_all_ratios_data()
+        per_ticker.append(time.perf_counter() - ticker_start)
+    total = time.perf_counter() - start
+    return {
+        "tickers": n_tickers,
+        "total_seconds": total,
+        "tickers_per_second": n_tickers / total if total else None,
+        "per_ticker": _summarize(per_ticker),
+    }
+
+
+"""----------------------------------- Memory Benchmark -----------------------------------"""
+
+
+def _measure_load(load) -> tuple:
+    """
+    :return: (tuple) (Bytes allocated by `load` that are still held, seconds it took.)
+    """
+    start = time.perf_counter()
+    load()
+    seconds = time.perf_counter() - start  # Timed apart, tracing slows allocations down.
+
+    gc.collect()
+    tracemalloc.start()
+    loaded = load()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+    return held, seconds
+
+
+def bench_memory(output_folder: str, n_tickers: int) -> dict:
+    """
+    Load every cached table of the synthetic batch as one DataFrame per (ticker, table), as the
+    `get_*` methods do, then as a Universe. Run after `bench_batch`, which caches the tables.
+
+    :return: (dict) Bytes held and load time of each representation.
+    """
+    storage = CsvStorage(output_folder)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    tables = [name for page in PAGE_TABLES.values() for name in page]
+    storage.read(tickers[0], tables[0])  # Import and warm up the CSV reader outside of the measurements.
+
+    def load_frames() -> dict:
+        return {
+            (ticker, table): RoicReader(ticker, storage=storage, memory_cache=None).get_table(table)
+            for ticker in tickers
+            for table in tables
+        }
+
+    results = {}
+    for name, load in [
+        ("dataframes", load_frames),
+        ("universe_float64", lambda: Universe.from_storage(storage, tickers, tables)),
+        ("universe_float32", lambda: Universe.from_storage(storage, tickers, tables, dtype="float32")),
+    ]:
+        held, seconds = _measure_load(load)
+        results[name] = {"bytes": held, "load_seconds": seconds}
+    for name in ("universe_float64", "universe_float32"):
+        results[name]["reduction"] = results["dataframes"]["bytes"] / results[name]["bytes"]
+    return results
+
+
+"""----------------------------------- Startup Benchmark -----------------------------------"""
+
+_STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import roic_scraper
+imported = time.perf_counter()
+roic_scraper.RoicReader({ticker!r}).get_all_financial_statements()
+print(imported - start, time.perf_counter() - imported, "selenium" in sys.modules)
+"""
+
+
+def bench_startup(runs: int, ticker: str = "T0000") -> dict:
+    """
+    Start fresh interpreters that import roic_scraper and read the statements of a cached ticker,
+    like a cold API worker. Run after `bench_batch`, which caches the ticker.
+
+    :return: (dict) Import and first read timings, and whether selenium was imported.
+    """
+    import_samples = []
+    read_samples = []
+    selenium_imported = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT.format(ticker=ticker)],
+            cwd=os.path.dirname(os.path.dirname(SYNTHETIC_PAGES_FOLDER)),  # The repository root.
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        import_samples.append(float(output[0]))
+        read_samples.append(float(output[1]))
+        selenium_imported = selenium_imported or output[2] == "True"
+    return {
+        "import": _summarize(import_samples),
+        "first_read": _summarize(read_samples),
+        "selenium_imported": selenium_imported,
+    }
+
+
+"""----------------------------------- Runner -----------------------------------"""
+
+
+def _get_version() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(SYNTHETIC_PAGES_FOLDER),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(n_tickers: int = 500, runs: int = 5, chromedriver: str = None) -> dict:
+    output_folder = tempfile.mkdtemp(prefix="roic_bench_")
+    config_path = os.path.join(output_folder, "config.json")
+    with open(config_path, "w") as file:
+        json.dump(
+            {"chrome_driver_path": chromedriver or "", "data_export_path": output_folder},
+            file,
+        )
+    os.environ["ROIC_SCRAPER_CONFIG"] = config_path
+
+    try:
+        with StubServer() as server:
+            return {
+                "version": _get_version(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "browser": chromedriver is not None,
+                "stages": bench_stages(server.url, output_folder, runs, chromedriver),
+                "batch": bench_batch(server.url, output_folder, n_tickers),
+                "memory": bench_memory(output_folder, n_tickers),
+                "startup": bench_startup(runs),
+            }
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500, help="Tickers in the synthetic batch.")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions of each stage.")
+    parser.add_argument("--chromedriver", help="Path to chromedriver, to also time the browser stages.")
+    parser.add_argument("--output", default="bench_results.json", help="File the JSON results are written to.")
+    args = parser.parse_args()
+
+    results = run(args.tickers, args.runs, args.chromedriver)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Batch: {results['batch']['tickers']} tickers in {results['batch']['total_seconds']:.2f}s")
+    print(f"Memory: {results['memory']['universe_float64']['reduction']:.1f}x smaller as a Universe")
+    print(f"Startup: import {results['startup']['import']['median']:.3f}s, first read {results['startup']['first_read']['median']:.3f}s")
+    print(f"Results written to {args.output}")
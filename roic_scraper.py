@@ -1,657 +1,4546 @@
 import os
 import json
+import sqlite3
+import hashlib
+import time
+import datetime
+import threading
+from collections import OrderedDict
+import multiprocessing
+import multiprocessing.util
+import asyncio
+import functools
+import contextlib
+import importlib
+import socket
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
+from lxml import html as lxml_html
 
-# Selenium imports
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
+ROIC_URL = "https://roic.ai"
 
-class RoicScraper:
-    def __init__(self, ticker: str, country: str = "US", debug: bool = False) -> None:
-        self.ticker = ticker.upper()
-        self.country = country.upper()
-        self.debug = debug
-        self.base_url = f"https://roic.ai/quote/{self.ticker}:{self.country}"
-        self.chrome_driver_path = self._get_chrome_driver_path()
-        self.base_export_path = self._get_data_export_path()
-        self.ticker_folder = f"{self.base_export_path}\\{self.ticker}"
-        os.makedirs(self.base_export_path, exist_ok=True)  # Create folder for ROIC data
-        os.makedirs(self.ticker_folder, exist_ok=True)  # Create folder for ticker
+# Table locations on each roic.ai page, keyed by page then table name.
+PAGE_TABLES = {
+    "summary": {
+        "summary": "/html/body/div[1]/div/div[2]/div[1]/div[2]/div/div/table",
+    },
+    "financials": {
+        "income_statement": "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table",
+        "balance_sheet": "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table",
+        "cash_flow": "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table",
+    },
+    "ratios": {
+        "profitability": "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table",
+        "credit": "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table",
+        "liquidity": "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table",
+        "working_capital": "/html/body/div[1]/div/div[2]/div[3]/div[4]/div/div/div/table",
+        "enterprise_value": "/html/body/div[1]/div/div[2]/div[3]/div[5]/div/div/div/table",
+        "multiples": "/html/body/div[1]/div/div[2]/div[3]/div[6]/div/div/div/table",
+        "per_share_data": "/html/body/div[1]/div/div[2]/div[3]/div[7]/div/div/div/table",
+    },
+}
 
-        """ -- Chromedriver options -- """
-        self.chrome_options = webdriver.ChromeOptions()
-        self.chrome_options.add_argument("--disable-gpu")
 
-    """-----------------------------------"""
+"""----------------------------------- Lazy Imports -----------------------------------"""
 
-    def _get_data_export_path(self):
-        path = f"{os.getcwd()}\\RoicScraper\\config.json"
-        with open(path, "r") as file:
-            data = json.load(file)
-        return data["data_export_path"]
 
-    """-----------------------------------"""
-    """----------------------------------- Browser Operations -----------------------------------"""
+class _LazySelenium:
+    """
+    Selenium names, imported the first time one of them is used.
+
+    Reading cached tables never touches them, so processes that only read do not pay for importing selenium.
+    """
+
+    NAMES = {
+        "webdriver": ("selenium", "webdriver"),
+        "Service": ("selenium.webdriver.chrome.service", "Service"),
+        "By": ("selenium.webdriver.common.by", "By"),
+        "WebDriverWait": ("selenium.webdriver.support.ui", "WebDriverWait"),
+        "EC": ("selenium.webdriver.support", "expected_conditions"),
+        "NoSuchElementException": ("selenium.common.exceptions", "NoSuchElementException"),
+        "TimeoutException": ("selenium.common.exceptions", "TimeoutException"),
+        "WebDriverException": ("selenium.common.exceptions", "WebDriverException"),
+    }
+
+    def __getattr__(self, name: str):
+        if name not in self.NAMES:
+            raise AttributeError(name)
+        module, attribute = self.NAMES[name]
+        value = getattr(importlib.import_module(module), attribute)
+        setattr(self, name, value)  # Later lookups skip __getattr__.
+        return value
+
+
+_selenium = _LazySelenium()
+
+
+def __getattr__(name: str):
+    # Keeps `roic_scraper.WebDriverWait` and friends working for callers.
+    if name in _LazySelenium.NAMES:
+        return getattr(_selenium, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+"""----------------------------------- Config -----------------------------------"""
 
-    def _get_chrome_driver_path(self):
-        path = f"{os.getcwd()}\\RoicScraper\\config.json"
-        with open(path, "r") as file:
-            data = json.load(file)
-        return data["chrome_driver_path"]
 
-    def _create_browser(self, url=None):
+@functools.lru_cache(maxsize=None)
+def _load_config_file(path: str) -> dict:
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def load_config() -> dict:
+    """
+    :return: (dict) Contents of 'config.json'. The file is read once per process.
+        Set the ROIC_SCRAPER_CONFIG environment variable to read another file.
+    """
+    path = os.environ.get(
+        "ROIC_SCRAPER_CONFIG", f"{os.getcwd()}\\RoicScraper\\config.json"
+    )
+    return _load_config_file(path)
+
+
+# Environment variables that override a setting of 'config.json'.
+SETTING_ENV_VARS = {
+    "data_export_path": "ROIC_SCRAPER_DATA_PATH",
+    "chrome_driver_path": "ROIC_SCRAPER_CHROMEDRIVER",
+}
+
+
+def get_setting(name: str, value: str = None) -> str:
+    """
+    :param name: Setting, e.g. 'data_export_path'.
+    :param value: Value passed by the caller, used as is if set.
+    :return: (str) The value, else its environment variable, else the entry in 'config.json'.
+        The config file is only read when neither is set.
+    """
+    if value is not None:
+        return value
+    value = os.environ.get(SETTING_ENV_VARS[name])
+    if value is not None:
+        return value
+    return load_config()[name]
+
+
+"""----------------------------------- Memory Cache -----------------------------------"""
+
+
+class TableCache:
+    """
+    Process-wide LRU cache of tables loaded from storage, keyed by (ticker, country, table).
+    Tables are copied on the way out, so callers can modify what they get.
+    """
+
+    def __init__(self, max_tables: int = 512) -> None:
         """
-        :param url: The website to visit.
+        :param max_tables: Number of tables kept before the least recently used one is dropped.
+        """
+        self.max_tables = max_tables
+        self._tables = OrderedDict()  # key -> (DataFrame, scraped_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        """
+        :return: (tuple) (DataFrame, scraped_at), or None if the table is not cached.
+        """
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is None:
+                return None
+            self._tables.move_to_end(key)
+        df, scraped_at = entry
+        return df.copy(), scraped_at
+
+    def put(self, key: tuple, df: pd.DataFrame, scraped_at: float) -> None:
+        with self._lock:
+            self._tables[key] = (df.copy(), scraped_at)
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._tables
+
+    def invalidate(self, key: tuple) -> None:
+        with self._lock:
+            self._tables.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+
+# Shared by every RoicScraper in the process unless another cache is passed in.
+table_cache = TableCache()
+
+
+"""----------------------------------- HTTP Session -----------------------------------"""
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+HTTP_TIMEOUT = 15  # Seconds
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """
+    :return: Keep-alive session shared by every scraper in the process.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            _http_session = session
+    return _http_session
+
+
+"""----------------------------------- Scrape Profile -----------------------------------"""
+
+# Requests that never carry table data. Blocked through CDP when a profile has `block_resources`.
+BLOCKED_URL_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*.mp3",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*intercom.io*",
+]
+
+
+class ScrapeProfile:
+    """
+    Chrome settings tuned for scraping throughput: headless, no images/fonts/media/analytics,
+    no extensions or sync, eager page loads and a disk cache shared between sessions.
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        block_resources: bool = True,
+        blocked_urls: list = None,
+        eager: bool = True,
+        cache_dir: str = None,
+        window_size: str = "1280,2000",
+    ) -> None:
+        """
+        :param headless: If True, Chrome runs without a window.
+        :param block_resources: If True, requests matching `blocked_urls` are dropped.
+        :param blocked_urls: URL patterns to block. Defaults to BLOCKED_URL_PATTERNS.
+        :param eager: If True, `get` returns once the DOM is ready instead of waiting for every resource.
+        :param cache_dir: Disk cache directory shared by every session using this profile. If None, each session has its own.
+        :param window_size: Size of the (virtual) window. Tall enough to render every table row.
+        """
+        self.headless = headless
+        self.block_resources = block_resources
+        self.blocked_urls = BLOCKED_URL_PATTERNS if blocked_urls is None else blocked_urls
+        self.eager = eager
+        self.cache_dir = cache_dir
+        self.window_size = window_size
+
+    def get_chrome_options(self):
+        """
+        :return: (webdriver.ChromeOptions) Options to start Chrome with.
+        """
+        options = _selenium.webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless=new")
+        for argument in (
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-sync",
+            "--disable-background-networking",
+            "--disable-default-apps",
+            "--disable-component-update",
+            "--disable-notifications",
+            "--no-first-run",
+            "--mute-audio",
+            f"--window-size={self.window_size}",
+        ):
+            options.add_argument(argument)
+        if self.block_resources:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+        if self.cache_dir is not None:
+            options.add_argument(f"--disk-cache-dir={self.cache_dir}")
+        if self.eager:
+            options.page_load_strategy = "eager"
+        return options
+
+    def apply(self, browser) -> None:
+        """
+        Set up a freshly started session. Blocks the resource requests through CDP.
+
+        :param browser: Chrome session started with `get_chrome_options`.
         :return: None
         """
-        service = Service(executable_path=self.chrome_driver_path)
-        self.browser = webdriver.Chrome(service=service, options=self.chrome_options)
-        # Default browser route
-        if url == None:
-            self.browser.get(url=self.sec_annual_url)
-        # External browser route
-        else:
-            self.browser.get(url=url)
+        if self.block_resources and self.blocked_urls:
+            browser.execute_cdp_cmd("Network.enable", {})
+            browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+
+    def start_browser(self, chrome_driver_path: str):
+        """
+        :param chrome_driver_path: Path to the chromedriver executable.
+        :return: A new Chrome session with this profile applied.
+        """
+        service = _selenium.Service(executable_path=chrome_driver_path)
+        browser = _selenium.webdriver.Chrome(service=service, options=self.get_chrome_options())
+        self.apply(browser)
+        return browser
 
-    def _clean_close(self) -> None:
-        self.browser.close()
-        self.browser.quit()
 
-    def _read_data(
-        self, xpath: str, wait: bool = False, _wait_time: int = 5, tag: str = ""
-    ) -> str:
+def _get_browser_rss(browser):
+    """
+    :return: (int) Resident memory of chromedriver and every Chrome process under it, in bytes. None without psutil.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        driver_process = psutil.Process(browser.service.process.pid)
+        processes = [driver_process] + driver_process.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            continue  # The process exited while it was being measured.
+    return rss
+
+
+def measure_profile(chrome_driver_path: str, url: str, profile=None, runs: int = 3) -> dict:
+    """
+    Measure page load time and browser memory for a profile, to compare settings against each other.
+
+    :param chrome_driver_path: Path to the chromedriver executable.
+    :param url: Page to load, e.g. 'https://roic.ai/quote/AAPL:US/financials'.
+    :param profile: ScrapeProfile to measure. If None, the plain options RoicScraper used before profiles are measured.
+    :param runs: Number of page loads. The first is a cold load, the rest reuse the session.
+    :return: (dict) Load seconds of every run, and the peak RSS in MB (None without psutil).
+    """
+    start = time.perf_counter()
+    if profile is None:
+        options = _selenium.webdriver.ChromeOptions()
+        options.add_argument("--disable-gpu")
+        browser = _selenium.webdriver.Chrome(
+            service=_selenium.Service(executable_path=chrome_driver_path), options=options
+        )
+    else:
+        browser = profile.start_browser(chrome_driver_path)
+    startup_seconds = time.perf_counter() - start
+
+    load_seconds = []
+    peak_rss = None
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            browser.get(url)
+            load_seconds.append(time.perf_counter() - start)
+            rss = _get_browser_rss(browser)
+            if rss is not None:
+                peak_rss = max(peak_rss or 0, rss)
+    finally:
+        browser.quit()
+
+    return {
+        "startup_seconds": startup_seconds,
+        "load_seconds": load_seconds,
+        "peak_rss_mb": None if peak_rss is None else peak_rss / 1024**2,
+    }
+
+
+"""----------------------------------- Driver Pool -----------------------------------"""
+
+
+class DriverPool:
+    """
+    Keeps a fixed number of headless Chrome sessions alive and lends them out to scrapes.
+    A session is replaced after `max_page_loads` page loads, or when it is returned as failed.
+    """
+
+    def __init__(
+        self,
+        chrome_driver_path: str,
+        size: int = 2,
+        max_page_loads: int = 50,
+        profile: ScrapeProfile = None,
+    ) -> None:
         """
-        :param xpath: Path to the web element.
-        :param wait: Boolean to determine if selenium should wait until the element is located.
-        :param wait_time: Integer that represents how many seconds selenium should wait, if wait is True.
-        :return: (str) Text of the element.
+        :param chrome_driver_path: Path to the chromedriver executable.
+        :param size: Maximum number of Chrome sessions alive at once.
+        :param max_page_loads: Number of page loads after which a session is recycled.
+        :param profile: Settings used to start each session. Defaults to ScrapeProfile().
         """
+        self.chrome_driver_path = chrome_driver_path
+        self.size = size
+        self.max_page_loads = max_page_loads
+        if profile is None:
+            profile = ScrapeProfile()
+        self.profile = profile
+        self._idle = []  # Most recently used session last, it is the warmest.
+        self._page_loads = {}
+        self._started = 0
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)  # Notified when a session is idle or a slot is free.
+        self._closed = False
 
-        if wait:
+    def _start_browser(self):
+        return self.profile.start_browser(self.chrome_driver_path)
+
+    def _stop_browser(self, browser) -> None:
+        try:
+            browser.quit()
+        except _selenium.WebDriverException:
+            pass  # The session already crashed.
+        with self._freed:
+            self._page_loads.pop(id(browser), None)
+            self._started -= 1
+            self._freed.notify()
+
+    def _is_alive(self, browser) -> bool:
+        try:
+            browser.current_url
+            return True
+        except _selenium.WebDriverException:
+            return False
+
+    def acquire(self, timeout: float = None):
+        """
+        :param timeout: Seconds to wait for a free session. If None, wait forever.
+        :return: A live Chrome session. Must be handed back with `release`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._freed:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DriverPool is closed.")
+                    if self._idle:
+                        browser = self._idle.pop()
+                        break
+                    if self._started < self.size:
+                        self._started += 1
+                        browser = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No Chrome session became free in time.")
+                    self._freed.wait(remaining)
+            if browser is None:
+                try:
+                    browser = self._start_browser()
+                except Exception:
+                    with self._freed:
+                        self._started -= 1
+                        self._freed.notify()
+                    raise
+                with self._lock:
+                    self._page_loads[id(browser)] = 0
+                return browser
+            if self._is_alive(browser):
+                return browser
+            self._stop_browser(browser)
+
+    def record_page_load(self, browser) -> None:
+        with self._lock:
+            self._page_loads[id(browser)] = self._page_loads.get(id(browser), 0) + 1
+
+    def release(self, browser, failed: bool = False) -> None:
+        """
+        :param browser: Session obtained from `acquire`.
+        :param failed: If True, the session is discarded instead of reused.
+        :return: None
+        """
+        with self._freed:
+            worn_out = self._page_loads.get(id(browser), 0) >= self.max_page_loads
+            if not (failed or worn_out or self._closed):
+                self._idle.append(browser)
+                self._freed.notify()
+                return
+        self._stop_browser(browser)
+
+    def close(self) -> None:
+        """Quit every idle session. Sessions still lent out are quit when they are released."""
+        with self._freed:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._freed.notify_all()
+        for browser in idle:
+            self._stop_browser(browser)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+"""----------------------------------- Storage -----------------------------------"""
+
+
+def to_float_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    :param df: Table as scraped or read from a CSV file.
+    :return: (pd.DataFrame) Same table with float64 columns named by year.
+    """
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        values = df.to_numpy(dtype="float64")
+    else:
+        values = normalize_values(df.to_numpy())
+    df = pd.DataFrame(values, index=df.index, columns=[str(col) for col in df.columns])
+    df.index.name = "index"
+    return df
+
+
+def _read_json(path: str, default=None):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+def _fsync(path: str) -> None:
+    if os.name == "nt" and os.path.isdir(path):
+        return  # Windows cannot open a folder, and its renames need no folder sync.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_files_atomic(files: list, durable: bool = True) -> None:
+    """
+    Write every file to a temporary file next to it, then rename them all into place.
+
+    A reader sees either the old or the new content of a file, never a partial one, and a killed
+    process leaves at most a stray '.tmp' file behind. With `durable`, the temporary files are
+    synced before the renames, and each folder is synced once after them, however many files it holds.
+
+    :param files: (folder, path, write) tuples. `write` is called with the temporary path to write to.
+    :param durable: If True, the files are on disk when this returns.
+    :return: None
+    """
+    temp_paths = []
+    try:
+        for folder, path, write in files:
+            os.makedirs(folder, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            temp_paths.append(temp_path)
+            write(temp_path)
+        if durable:
+            for temp_path in temp_paths:
+                _fsync(temp_path)
+        for (_, path, _), temp_path in zip(files, temp_paths):
+            os.replace(temp_path, path)
+    except BaseException:
+        for temp_path in temp_paths:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+        raise
+    if durable:
+        for folder in {folder for folder, _, _ in files}:
+            _fsync(folder)
+
+
+def _scrape_time_writer(scraped_at: float):
+    # Every (ticker, table) has a file of its own, so processes scraping different tables of one
+    # ticker never read-modify-write the same file.
+    def write(temp_path: str) -> None:
+        with open(temp_path, "w") as file:
+            json.dump(scraped_at, file)
+
+    return write
+
+
+class CsvStorage:
+    """
+    Stores each table in its own CSV file: `{root}/{shard}/{TICKER}/{table}.csv`, and when it was
+    scraped next to it in `{table}.scraped.json`.
+
+    The shard folders are named after the first hex digits of a hash of the ticker, so a large universe
+    is spread over 256 (or 65,536 with two levels) folders instead of one folder per ticker in the root.
+    Tables cached in the old flat `{root}/{TICKER}` layout are still read, and move to their shard
+    when they are written again. Every write is atomic.
+    """
+
+    def __init__(self, root: str, shard_levels: int = 1, durable: bool = True) -> None:
+        """
+        :param root: Folder the tables are stored in.
+        :param shard_levels: Levels of shard folders above the ticker folders. 0 keeps the flat layout.
+        :param durable: If True, every write is synced to disk before it returns.
+        """
+        self.root = root
+        self.shard_levels = shard_levels
+        self.durable = durable
+
+    def _get_folder(self, ticker: str) -> str:
+        digest = hashlib.md5(ticker.encode()).hexdigest()
+        shards = [digest[2 * level: 2 * level + 2] for level in range(self.shard_levels)]
+        return os.path.join(self.root, *shards, ticker)
+
+    def _get_path(self, ticker: str, table: str) -> str:
+        return os.path.join(self._get_folder(ticker), f"{table}.csv")
+
+    def _get_legacy_paths(self, ticker: str, file: str) -> list:
+        paths = [os.path.join(self.root, ticker, file)]
+        if os.sep != "\\":
+            # Older versions joined paths with backslashes, which outside Windows made flat files next to the root.
+            paths.append(f"{self.root}\\{ticker}\\{file}")
+        return paths
+
+    def _read_legacy_csv(self, ticker: str, table: str) -> pd.DataFrame:
+        for path in self._get_legacy_paths(ticker, f"{table}.csv"):
             try:
-                data = (
-                    WebDriverWait(self.browser, _wait_time)
-                    .until(EC.presence_of_element_located((By.XPATH, xpath)))
-                    .text
-                )
-            except TimeoutException:
-                print(f"[Failed Xpath] {xpath}")
-                if tag != "":
-                    print(f"[Tag]: {tag}")
-                raise NoSuchElementException("Element not found")
-            except NoSuchElementException:
-                print(f"[Failed Xpath] {xpath}")
-                return "N\A"
-        else:
+                return pd.read_csv(path, float_precision="round_trip").set_index("index")
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"No {table} stored for {ticker}.")
+
+    def read(self, ticker: str, table: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) The stored table. Raises FileNotFoundError if it was never written.
+        """
+        try:
+            return pd.read_csv(self._get_path(ticker, table), float_precision="round_trip").set_index("index")
+        except FileNotFoundError:
+            if self.shard_levels == 0:
+                raise
+            return self._read_legacy_csv(ticker, table)
+
+    def exists(self, ticker: str, table: str) -> bool:
+        """
+        :return: (bool) True if the table is stored.
+        """
+        paths = [self._get_path(ticker, table)]
+        if self.shard_levels > 0:
+            paths += self._get_legacy_paths(ticker, f"{table}.csv")
+        return any(os.path.exists(path) for path in paths)
+
+    def write(self, ticker: str, table: str, df: pd.DataFrame) -> None:
+        self.write_many({(ticker, table): df})
+
+    def _get_scrape_time_path(self, ticker: str, table: str) -> str:
+        return os.path.join(self._get_folder(ticker), f"{table}.scraped.json")
+
+    def read_scrape_time(self, ticker: str, table: str):
+        """
+        :return: (float) When the table was last scraped, in seconds since the epoch. None if unknown.
+        """
+        scraped_at = _read_json(self._get_scrape_time_path(ticker, table))
+        if scraped_at is None:
+            # Scrape times used to be kept in one scrape log per ticker.
+            log_paths = [os.path.join(self._get_folder(ticker), "scrape_log.json")]
+            if self.shard_levels > 0:
+                log_paths += self._get_legacy_paths(ticker, "scrape_log.json")
+            for path in log_paths:
+                scraped_at = _read_json(path, {}).get(table)
+                if scraped_at is not None:
+                    break
+        return scraped_at
+
+    def write_scrape_time(self, ticker: str, table: str, scraped_at: float) -> None:
+        self.write_many(scrape_times={(ticker, table): scraped_at})
+
+    def write_many(self, tables: dict = None, scrape_times: dict = None) -> None:
+        """
+        Write many tables and scrape times in one atomic batch.
+
+        :param tables: (ticker, table) mapped to its DataFrame.
+        :param scrape_times: (ticker, table) mapped to when it was scraped, in seconds since the epoch.
+        :return: None
+        """
+        files = []
+        for (ticker, table), df in (tables or {}).items():
+            files.append((self._get_folder(ticker), self._get_path(ticker, table), df.to_csv))
+        for (ticker, table), scraped_at in (scrape_times or {}).items():
+            path = self._get_scrape_time_path(ticker, table)
+            files.append((self._get_folder(ticker), path, _scrape_time_writer(scraped_at)))
+        write_files_atomic(files, self.durable)
+
+
+class ParquetStorage:
+    """
+    Stores every table type as typed float64 columns in Parquet.
+
+    Writes land in one small file per ticker: `{root}/{table}/parts/{TICKER}.parquet`. Scrape times are
+    kept in `{root}/scrape_log/{table}/{TICKER}.json`.
+    `compact` merges the parts of a table type into a single `{root}/{table}.parquet` file in long
+    format (ticker, metric, position, year, value), sorted by metric, which is read memory-mapped. Loading one
+    metric for every ticker is then a single columnar scan of one file. Only year columns are compacted.
+    """
+
+    def __init__(self, root: str, durable: bool = True) -> None:
+        """
+        :param root: Folder the tables are stored in.
+        :param durable: If True, every write is synced to disk before it returns.
+        """
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetStorage requires pyarrow. Install it with `pip install pyarrow`.")
+        self.root = root
+        self.durable = durable
+
+    def _get_part_path(self, ticker: str, table: str) -> str:
+        return os.path.join(self.root, table, "parts", f"{ticker}.parquet")
+
+    def _get_compacting_path(self, ticker: str, table: str) -> str:
+        return os.path.join(self.root, table, "compacting", f"{ticker}.parquet")
+
+    def _get_compacted_path(self, table: str) -> str:
+        return os.path.join(self.root, f"{table}.parquet")
+
+    def _get_scrape_time_path(self, ticker: str, table: str) -> str:
+        return os.path.join(self.root, "scrape_log", table, f"{ticker}.json")
+
+    def read(self, ticker: str, table: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) The stored table. Raises FileNotFoundError if it was never written.
+        """
+        import pyarrow.parquet as pq
+
+        for part_path in (self._get_part_path(ticker, table), self._get_compacting_path(ticker, table)):
             try:
-                data = self.browser.find_element("xpath", xpath).text
-            except NoSuchElementException:
-                data = "N\A"
-        # Return the text of the element found.
-        return data
+                return pq.read_table(part_path, memory_map=True).to_pandas()
+            except FileNotFoundError:
+                continue
 
-    def _click_button(
+        compacted_path = self._get_compacted_path(table)
+        if os.path.exists(compacted_path):
+            long = pq.read_table(
+                compacted_path,
+                memory_map=True,
+                filters=[("ticker", "=", ticker)],
+                columns=["metric", "position", "year", "value"],
+            ).to_pandas()
+            if not long.empty:
+                return self._long_to_wide(long)
+        raise FileNotFoundError(f"No {table} stored for {ticker}.")
+
+    def exists(self, ticker: str, table: str) -> bool:
+        """
+        :return: (bool) True if the table is stored.
+        """
+        import pyarrow.parquet as pq
+
+        part_paths = (self._get_part_path(ticker, table), self._get_compacting_path(ticker, table))
+        if any(os.path.exists(path) for path in part_paths):
+            return True
+        compacted_path = self._get_compacted_path(table)
+        if not os.path.exists(compacted_path):
+            return False
+        tickers = pq.read_table(
+            compacted_path, memory_map=True, filters=[("ticker", "=", ticker)], columns=["ticker"]
+        )
+        return tickers.num_rows > 0
+
+    def write(self, ticker: str, table: str, df: pd.DataFrame) -> None:
+        self.write_many({(ticker, table): df})
+
+    def read_scrape_time(self, ticker: str, table: str):
+        """
+        :return: (float) When the table was last scraped, in seconds since the epoch. None if unknown.
+        """
+        scraped_at = _read_json(self._get_scrape_time_path(ticker, table))
+        if scraped_at is None:
+            # Scrape times used to be kept in one scrape log per ticker.
+            scraped_at = _read_json(os.path.join(self.root, "scrape_log", f"{ticker}.json"), {}).get(table)
+        return scraped_at
+
+    def write_scrape_time(self, ticker: str, table: str, scraped_at: float) -> None:
+        self.write_many(scrape_times={(ticker, table): scraped_at})
+
+    def write_many(self, tables: dict = None, scrape_times: dict = None) -> None:
+        """
+        Write many tables and scrape times in one atomic batch.
+
+        :param tables: (ticker, table) mapped to its DataFrame.
+        :param scrape_times: (ticker, table) mapped to when it was scraped, in seconds since the epoch.
+        :return: None
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        files = []
+        for (ticker, table), df in (tables or {}).items():
+            arrow_table = pa.Table.from_pandas(to_float_table(df))
+            path = self._get_part_path(ticker, table)
+            files.append((os.path.dirname(path), path, functools.partial(pq.write_table, arrow_table)))
+        for (ticker, table), scraped_at in (scrape_times or {}).items():
+            path = self._get_scrape_time_path(ticker, table)
+            files.append((os.path.dirname(path), path, _scrape_time_writer(scraped_at)))
+        write_files_atomic(files, self.durable)
+
+    def read_metric(self, table: str, metric: str) -> pd.DataFrame:
+        """
+        :param table: Table type, e.g. 'income_statement'.
+        :param metric: Row label of the table, e.g. 'Gross Profit'.
+        :return: (pd.DataFrame) One row per ticker and one column per year. Only compacted data is read.
+        """
+        import pyarrow.parquet as pq
+
+        long = pq.read_table(
+            self._get_compacted_path(table),
+            memory_map=True,
+            filters=[("metric", "=", metric)],
+            columns=["ticker", "year", "value"],
+        ).to_pandas()
+        return long.pivot(index="ticker", columns="year", values="value")
+
+    def compact(self, table: str) -> None:
+        """
+        Merge the per-ticker parts of a table type into its single columnar file, then remove the parts.
+
+        The parts are first moved aside, where they are still read, so a part a writer adds or rewrites
+        while the table is compacted stays in place for the next compaction instead of being removed.
+
+        :param table: Table type, e.g. 'income_statement'.
+        :return: None
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parts_folder = os.path.join(self.root, table, "parts")
+        compacting_folder = os.path.join(self.root, table, "compacting")
+        os.makedirs(compacting_folder, exist_ok=True)
+        part_files = sorted(os.listdir(parts_folder)) if os.path.isdir(parts_folder) else []
+        for file in part_files:
+            if file.endswith(".parquet"):
+                os.replace(os.path.join(parts_folder, file), os.path.join(compacting_folder, file))
+        # Parts left aside by a compaction that did not finish are merged too.
+        compacting_files = sorted(file for file in os.listdir(compacting_folder) if file.endswith(".parquet"))
+        if not compacting_files:
+            return
+
+        frames = []
+        new_tickers = set()
+        for file in compacting_files:
+            ticker = file[: -len(".parquet")]
+            new_tickers.add(ticker)
+            df = pq.read_table(os.path.join(compacting_folder, file)).to_pandas()
+            frames.append(self._wide_to_long(ticker, df))
+
+        compacted_path = self._get_compacted_path(table)
+        if os.path.exists(compacted_path):
+            old = pq.read_table(compacted_path).to_pandas()
+            frames.append(old[~old["ticker"].isin(new_tickers)])
+
+        long = pd.concat(frames, ignore_index=True)
+        long = long.sort_values(["metric", "ticker", "year"], ignore_index=True)
+        arrow_table = pa.Table.from_pandas(long, preserve_index=False)
+        write_files_atomic(
+            [(self.root, compacted_path, functools.partial(pq.write_table, arrow_table, row_group_size=64_000))],
+            self.durable,
+        )
+        for file in compacting_files:
+            os.remove(os.path.join(compacting_folder, file))
+
+    @staticmethod
+    def _wide_to_long(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.rename_axis("metric").reset_index()
+        df.insert(1, "position", np.arange(len(df), dtype="int32"))
+        long = df.melt(
+            id_vars=["metric", "position"], var_name="year", value_name="value"
+        )
+        long.insert(0, "ticker", ticker)
+        # Columns that are not years, e.g. 'TTM', have no place in the year column and are dropped.
+        long["year"] = pd.to_numeric(long["year"], errors="coerce")
+        long = long.dropna(subset=["year"])
+        long["year"] = long["year"].astype("int32")
+        return long
+
+    @staticmethod
+    def _long_to_wide(long: pd.DataFrame) -> pd.DataFrame:
+        # Keep the original row order, which follows the page.
+        metric_order = long.sort_values("position")["metric"].unique()
+        df = long.pivot(index="metric", columns="year", values="value")
+        df = df.reindex(metric_order)
+        df.columns = [str(col) for col in df.columns]
+        df.index.name = "index"
+        return df
+
+
+class StorageWriter:
+    """
+    Buffers table writes in front of a storage and commits them in atomic batches.
+
+    Pass it anywhere a storage is accepted. Buffered tables are read back from the buffer, so a scraper
+    sees its own writes before they are flushed. A batch is written when `batch_size` tables are waiting,
+    when `flush_interval` seconds have passed since the last one, on `flush`, or when the writer is closed.
+    A batch syncs each folder once instead of once per table and scrape time.
+    """
+
+    def __init__(self, storage, batch_size: int = 100, flush_interval: float = 5.0) -> None:
+        """
+        :param storage: Storage with a `write_many` method, e.g. CsvStorage or ParquetStorage.
+        :param batch_size: Tables buffered before a batch is written. None to only write on `flush`.
+        :param flush_interval: Seconds after which the buffered tables are written on the next write. None to disable.
+        """
+        self.storage = storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._tables = {}
+        self._scrape_times = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str):
+        if name == "storage":
+            raise AttributeError(name)  # Not set yet, e.g. while unpickling.
+        return getattr(self.storage, name)  # e.g. ParquetStorage.compact
+
+    def __getstate__(self) -> dict:
+        # Buffered writes stay with this writer; a copy sent to a worker process starts empty.
+        state = self.__dict__.copy()
+        state.update(_tables={}, _scrape_times={}, _lock=None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def read(self, ticker: str, table: str) -> pd.DataFrame:
+        with self._lock:
+            df = self._tables.get((ticker, table))
+        return self.storage.read(ticker, table) if df is None else df.copy()
+
+    def exists(self, ticker: str, table: str) -> bool:
+        with self._lock:
+            if (ticker, table) in self._tables:
+                return True
+        return self.storage.exists(ticker, table)
+
+    def read_scrape_time(self, ticker: str, table: str):
+        with self._lock:
+            scraped_at = self._scrape_times.get((ticker, table))
+        return self.storage.read_scrape_time(ticker, table) if scraped_at is None else scraped_at
+
+    def write(self, ticker: str, table: str, df: pd.DataFrame) -> None:
+        with self._lock:
+            self._tables[(ticker, table)] = df
+            self._flush_if_due()
+
+    def write_scrape_time(self, ticker: str, table: str, scraped_at: float) -> None:
+        with self._lock:
+            self._scrape_times[(ticker, table)] = scraped_at
+            self._flush_if_due()
+
+    def _flush_if_due(self) -> None:
+        if self.batch_size is not None and len(self._tables) >= self.batch_size:
+            self.flush()
+        elif self.flush_interval is not None and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered table and scrape time in one batch.
+
+        :return: None
+        """
+        with self._lock:
+            if self._tables or self._scrape_times:
+                self.storage.write_many(self._tables, self._scrape_times)
+                self._tables = {}
+                self._scrape_times = {}
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+"""----------------------------------- Cache Policy -----------------------------------"""
+
+DAY = 24 * 60 * 60  # Seconds
+
+# Tables whose values move with the share price, so they go stale regardless of filings.
+MARKET_TABLES = ["summary", "enterprise_value", "multiples"]
+
+
+class StaleTableError(FileNotFoundError):
+    """Raised when a cached table exists but the cache policy says it must be scraped again."""
+
+
+class CachePolicy:
+    """
+    Decides whether a cached table can be served or must be scraped again.
+
+    A table is fresh while it is younger than its TTL. Tables that only change when a company
+    files (everything not in MARKET_TABLES) are also fresh, whatever their age, until a new fiscal
+    year can have been reported after the latest year in the table. A fiscal year is named after the
+    calendar year it ends in, and is expected `filing_lag` after the end of its last month.
+    """
+
+    def __init__(
         self,
-        xpath: str,
-        wait: bool = False,
-        _wait_time: int = 5,
-        scroll: bool = False,
-        tag: str = "",
+        ttls: dict = None,
+        default_ttl: float = 7 * DAY,
+        market_ttl: float = 1 * DAY,
+        wait_for_new_period: bool = True,
+        fiscal_year_end_month: int = 12,
+        fiscal_year_end_months: dict = None,
+        filing_lag: float = 30 * DAY,
     ) -> None:
         """
-        :param xpath: Path to the web element.
-        :param wait: Boolean to determine if selenium should wait until the element is located.
-        :param wait_time: Integer that represents how many seconds selenium should wait, if wait is True.
-        :return: None. Because this function clicks the button but does not return any information about the button or any related web elements.
+        :param ttls: Table name mapped to its TTL in seconds. Overrides the defaults below.
+        :param default_ttl: TTL of tables that only change with filings.
+        :param market_ttl: TTL of the tables in MARKET_TABLES.
+        :param wait_for_new_period: If True, filing-driven tables are not refreshed until a new fiscal year is expected.
+        :param fiscal_year_end_month: Last month of the fiscal year of tickers not in `fiscal_year_end_months`.
+        :param fiscal_year_end_months: Ticker mapped to the last month of its fiscal year, e.g. {"AAPL": 9, "MSFT": 6}.
+        :param filing_lag: Seconds after the end of a fiscal year before its results can be reported.
+        """
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.market_ttl = market_ttl
+        self.wait_for_new_period = wait_for_new_period
+        self.fiscal_year_end_month = fiscal_year_end_month
+        self.fiscal_year_end_months = {ticker.upper(): month for ticker, month in (fiscal_year_end_months or {}).items()}
+        self.filing_lag = filing_lag
+
+    def get_ttl(self, table: str) -> float:
+        if table in self.ttls:
+            return self.ttls[table]
+        if table in MARKET_TABLES:
+            return self.market_ttl
+        return self.default_ttl
+
+    def get_fiscal_year_end_month(self, ticker: str = None) -> int:
+        if ticker is None:
+            return self.fiscal_year_end_month
+        return self.fiscal_year_end_months.get(ticker.upper(), self.fiscal_year_end_month)
+
+    def is_new_period_expected(self, df: pd.DataFrame, now: float = None, ticker: str = None) -> bool:
+        """
+        :param df: Cached table with years as columns.
+        :param now: Current time in seconds since the epoch. Defaults to the current time.
+        :param ticker: Ticker of the table, to look up its fiscal year end.
+        :return: (bool) True if a fiscal year after the latest column may have been reported.
+        """
+        years = pd.to_numeric(pd.Series(df.columns, dtype=object), errors="coerce").dropna()
+        if years.empty:
+            return True
+        next_year = int(years.max()) + 1
+        end_month = self.get_fiscal_year_end_month(ticker)
+        # The fiscal year ends with its last month, i.e. at the start of the month after it.
+        year_end = datetime.datetime(next_year + end_month // 12, end_month % 12 + 1, 1)
+        if now is None:
+            now = time.time()
+        return now >= year_end.timestamp() + self.filing_lag
+
+    def is_fresh(
+        self, table: str, df: pd.DataFrame, scraped_at: float, now: float = None, ticker: str = None
+    ) -> bool:
+        """
+        :param table: Table name, e.g. 'income_statement'.
+        :param df: Cached table.
+        :param scraped_at: When the table was scraped, in seconds since the epoch. None if unknown.
+        :param now: Current time in seconds since the epoch. Defaults to the current time.
+        :param ticker: Ticker of the table, to look up its fiscal year end.
+        :return: (bool) True if the cached table can be served.
+        """
+        if now is None:
+            now = time.time()
+        if scraped_at is not None and now - scraped_at < self.get_ttl(table):
+            return True
+        if self.wait_for_new_period and table not in MARKET_TABLES:
+            return not self.is_new_period_expected(df, now, ticker)
+        return False
+
+
+"""----------------------------------- Consolidated Dataset -----------------------------------"""
+
+
+class ConsolidatedDataset:
+    """
+    Every scraped table of every ticker in one long table: (ticker, table, metric, year) -> value.
+
+    Tables are added as they are scraped and merged in on the next query or `save`. Rows are kept
+    sorted by an integer key packing the (table, metric, year, ticker) category codes, so a
+    cross-sectional screen is one binary search, and newly added rows are merged into the sorted
+    rows instead of sorting the whole dataset again.
+    """
+
+    COLUMNS = ["ticker", "table", "metric", "year", "value"]
+
+    # Bits of the sort key taken by each code, from the lowest: ticker, year, metric, then table.
+    _TICKER_BITS = 28
+    _YEAR_BITS = 12
+    _METRIC_BITS = 16
+
+    def __init__(self, path: str = None) -> None:
+        """
+        :param path: Parquet file the dataset is loaded from and saved to. If None, the dataset only lives in memory.
+        """
+        self.path = path
+        self._pending = {}  # (ticker, table) -> long DataFrame
+        if path is not None and os.path.exists(path):
+            data = pd.read_parquet(path)
+            for col in ("ticker", "table", "metric"):
+                data[col] = data[col].astype("category")
+            data["year"] = data["year"].astype("int32")
+            keys = self._get_keys(data)
+            order = np.argsort(keys, kind="stable")
+            self._data = data.iloc[order].reset_index(drop=True)
+            self._keys = keys[order]
+        else:
+            self._data = pd.DataFrame(
+                {
+                    "ticker": pd.Series(dtype="category"),
+                    "table": pd.Series(dtype="category"),
+                    "metric": pd.Series(dtype="category"),
+                    "year": pd.Series(dtype="int32"),
+                    "value": pd.Series(dtype="float64"),
+                }
+            )
+            self._keys = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def _pack(cls, table_codes, metric_codes, years, ticker_codes) -> np.ndarray:
+        key = np.asarray(table_codes, dtype=np.int64)
+        key = (key << cls._METRIC_BITS) | np.asarray(metric_codes, dtype=np.int64)
+        key = (key << cls._YEAR_BITS) | np.asarray(years, dtype=np.int64)
+        return (key << cls._TICKER_BITS) | np.asarray(ticker_codes, dtype=np.int64)
+
+    @classmethod
+    def _get_keys(cls, data: pd.DataFrame) -> np.ndarray:
+        return cls._pack(
+            data["table"].cat.codes,
+            data["metric"].cat.codes,
+            data["year"],
+            data["ticker"].cat.codes,
+        )
+
+    @classmethod
+    def from_storage(cls, storage, tickers: list, tables: list = None, path: str = None):
+        """
+        Build a dataset from tables that are already cached.
+
+        :param storage: Storage the tables are read from, e.g. CsvStorage.
+        :param tickers: Tickers to include.
+        :param tables: Tables to include. Defaults to every table in PAGE_TABLES.
+        :param path: See `__init__`.
+        :return: (ConsolidatedDataset)
+        """
+        if tables is None:
+            tables = [name for page in PAGE_TABLES.values() for name in page]
+        dataset = cls(path)
+        for ticker in tickers:
+            for table in tables:
+                try:
+                    dataset.add(ticker.upper(), table, storage.read(ticker.upper(), table))
+                except FileNotFoundError:
+                    continue
+        return dataset
+
+    def add(self, ticker: str, table: str, df: pd.DataFrame) -> None:
+        """
+        Add or replace one table of one ticker.
+
+        :param ticker: Ticker of the table.
+        :param table: Table name, e.g. 'income_statement'.
+        :param df: Table with metrics as the index and years as columns.
+        :return: None
+        """
+        df = to_float_table(df)
+        n_rows, n_cols = df.shape
+        years = pd.to_numeric(pd.Series(df.columns), errors="coerce").to_numpy()
+        values = df.to_numpy().ravel()
+        year = np.tile(years, n_rows)
+        keep = ~np.isnan(values) & ~np.isnan(year)
+        # Metrics are kept as codes into the table's own labels until they are merged.
+        row_codes, metrics = pd.factorize(df.index.astype(str))
+        self._pending[(ticker, table)] = (
+            metrics,
+            np.repeat(row_codes, n_cols)[keep],
+            year[keep].astype("int32"),
+            values[keep],
+        )
+
+    @staticmethod
+    def _extend_categories(column: pd.Series, new_values) -> pd.Series:
+        """
+        :return: (pd.Series) `column` with the new values appended to its categories. Existing codes are unchanged.
+        """
+        added = pd.Index(pd.unique(np.asarray(new_values, dtype=object))).difference(column.cat.categories, sort=False)
+        return column.cat.add_categories(added) if len(added) else column
+
+    def _merge_pending(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        data = self._data.copy(deep=False)
+        data["ticker"] = self._extend_categories(data["ticker"], [ticker for ticker, _ in pending])
+        data["table"] = self._extend_categories(data["table"], [table for _, table in pending])
+        data["metric"] = self._extend_categories(
+            data["metric"], np.concatenate([metrics.to_numpy(dtype=object) for metrics, _, _, _ in pending.values()])
+        )
+        ticker_codes = data["ticker"].cat.categories.get_indexer([ticker for ticker, _ in pending])
+        table_codes = data["table"].cat.categories.get_indexer([table for _, table in pending])
+        metric_categories = data["metric"].cat.categories
+
+        # Codes of the new rows, without converting any labels of the rows already merged.
+        sizes = [len(values) for _, _, _, values in pending.values()]
+        new = {
+            "ticker": np.repeat(ticker_codes, sizes),
+            "table": np.repeat(table_codes, sizes),
+            "metric": np.concatenate(
+                [metric_categories.get_indexer(metrics)[codes] for metrics, codes, _, _ in pending.values()]
+            ),
+            "year": np.concatenate([year for _, _, year, _ in pending.values()]),
+            "value": np.concatenate([values for _, _, _, values in pending.values()]),
+        }
+
+        # Drop the rows of the replaced (ticker, table) pairs, found by their codes.
+        pairs = data["table"].cat.codes.to_numpy(np.int64) << self._TICKER_BITS | data["ticker"].cat.codes.to_numpy(np.int64)
+        keep = ~np.isin(pairs, table_codes.astype(np.int64) << self._TICKER_BITS | ticker_codes)
+        keys = self._keys
+        if not keep.all():
+            data = data[keep]
+            keys = keys[keep]
+
+        # Insert the sorted new rows into the sorted kept rows.
+        new_keys = self._pack(new["table"], new["metric"], new["year"], new["ticker"])
+        order = np.argsort(new_keys, kind="stable")
+        new_keys = new_keys[order]
+        positions = np.searchsorted(keys, new_keys) + np.arange(len(new_keys))
+        is_new = np.zeros(len(keys) + len(new_keys), dtype=bool)
+        is_new[positions] = True
+        merged_keys = np.empty(len(is_new), dtype=np.int64)
+        merged_keys[is_new] = new_keys
+        merged_keys[~is_new] = keys
+
+        columns = {}
+        for col in self.COLUMNS:
+            old_values = data[col]
+            if isinstance(old_values.dtype, pd.CategoricalDtype):
+                codes = np.empty(len(is_new), dtype=np.int32)
+                codes[is_new] = new[col][order]
+                codes[~is_new] = old_values.cat.codes.to_numpy()
+                columns[col] = pd.Categorical.from_codes(codes, dtype=old_values.dtype)
+            else:
+                values = np.empty(len(is_new), dtype=old_values.dtype)
+                values[is_new] = new[col][order]
+                values[~is_new] = old_values.to_numpy()
+                columns[col] = values
+        self._data = pd.DataFrame(columns)
+        self._keys = merged_keys
+
+    def _get_rows(self, table_code: int, metric_code: int) -> pd.DataFrame:
+        start, stop = np.searchsorted(
+            self._keys, [self._pack(table_code, metric_code, 0, 0), self._pack(table_code, metric_code + 1, 0, 0)]
+        )
+        return self._data.iloc[start:stop]
+
+    def screen(self, metric: str, years=None, table: str = None) -> pd.DataFrame:
+        """
+        :param metric: Row label, e.g. 'Gross Margin (%)'.
+        :param years: Years to include, e.g. range(2015, 2024). If None, every year is included.
+        :param table: Table holding the metric. Only needed when several tables share the label.
+        :return: (pd.DataFrame) One row per ticker and one column per year.
+        """
+        self._merge_pending()
+        metric_code = self._data["metric"].cat.categories.get_indexer([metric])[0]
+        table_categories = self._data["table"].cat.categories
+        if table is None:
+            # The first table, by name, that holds the metric.
+            candidates = sorted(table_categories)
+        else:
+            candidates = [table]
+        rows = None
+        for name in candidates:
+            table_code = table_categories.get_indexer([name])[0]
+            if metric_code >= 0 and table_code >= 0:
+                rows = self._get_rows(table_code, metric_code)
+                if not rows.empty:
+                    break
+        if rows is None or rows.empty:
+            if table is None:
+                raise KeyError(metric)
+            raise KeyError((table, metric))
+        if years is not None:
+            rows = rows[rows["year"].isin(list(years))]
+        values = pd.Series(
+            rows["value"].to_numpy(),
+            index=pd.MultiIndex.from_arrays(
+                [rows["year"].to_numpy(), rows["ticker"].astype(str).to_numpy()], names=["year", "ticker"]
+            ),
+        )
+        return values.unstack("year")
+
+    def get(self, ticker: str, table: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) One table of one ticker, with metrics as the index and years as columns.
+        """
+        self._merge_pending()
+        rows = self._data[
+            (self._data["ticker"] == ticker.upper()) & (self._data["table"] == table)
+        ]
+        if rows.empty:
+            raise KeyError((ticker, table))
+        df = rows.pivot(index="metric", columns="year", values="value")
+        df.index = df.index.astype(str)
+        df.columns = [str(col) for col in df.columns]
+        df.index.name = "index"
+        return df
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) The whole dataset in long format.
+        """
+        self._merge_pending()
+        return self._data
+
+    def save(self) -> None:
+        if self.path is None:
+            raise ValueError("ConsolidatedDataset has no path to save to.")
+        self._merge_pending()
+        tmp_path = f"{self.path}.tmp"
+        self._data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+
+"""----------------------------------- Universe -----------------------------------"""
+
+
+class UniverseTable:
+    """
+    One table type for a whole universe of tickers, in one contiguous block.
+
+    Row labels and years are stored once, as shared categorical dictionaries. The values of every
+    ticker are stacked in one (rows, years) float block, with each row pointing at its label by code,
+    and `offsets` marking where each ticker's rows start. `get` returns a DataFrame that is a view of
+    the block, without copying any values.
+    """
+
+    def __init__(self, table: str, tickers: list, metrics: pd.Index, years: pd.Index, codes, offsets, block) -> None:
+        self.table = table
+        self.tickers = list(tickers)
+        self.metrics = metrics
+        self.years = years
+        self.codes = codes
+        self.offsets = offsets
+        self.block = block
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._metric_dtype = pd.CategoricalDtype(metrics)
+
+    @classmethod
+    def from_tables(cls, table: str, tables: dict, dtype: str = "float64"):
+        """
+        :param table: Table name, e.g. 'income_statement'.
+        :param tables: Ticker mapped to its table, with metrics as the index and years as columns.
+        :param dtype: 'float64', or 'float32' to halve the block at the cost of precision.
+        :return: (UniverseTable)
+        """
+        tables = {ticker: to_float_table(df) for ticker, df in tables.items()}
+        frames = list(tables.values())
+        metrics = pd.Index(pd.unique(np.concatenate([df.index.to_numpy(dtype=object) for df in frames])) if frames else [])
+        years = pd.Index(sorted({col for df in frames for col in df.columns}, key=lambda col: (len(col), col)))
+
+        offsets = np.zeros(len(frames) + 1, dtype="int64")
+        offsets[1:] = np.cumsum([len(df) for df in frames])
+        block = np.full((offsets[-1], len(years)), np.nan, dtype=dtype)
+        codes = np.empty(offsets[-1], dtype="int16" if len(metrics) < 2**15 else "int32")
+        for i, df in enumerate(frames):
+            start, stop = offsets[i], offsets[i + 1]
+            codes[start:stop] = metrics.get_indexer(df.index)
+            block[start:stop, years.get_indexer(df.columns)] = df.to_numpy()
+        return cls(table, list(tables), metrics, years, codes, offsets, block)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: (int) Bytes held by the block, the codes, the offsets and the label dictionaries.
+        """
+        labels = self.metrics.memory_usage(deep=True) + self.years.memory_usage(deep=True)
+        return self.block.nbytes + self.codes.nbytes + self.offsets.nbytes + labels
+
+    def get(self, ticker: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) The ticker's table, as a view of the block. Writes to it change the block.
+        """
+        i = self._positions.get(ticker.upper())
+        if i is None:
+            raise KeyError((ticker, self.table))
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        index = pd.CategoricalIndex(
+            pd.Categorical.from_codes(self.codes[start:stop], dtype=self._metric_dtype), name="index"
+        )
+        return pd.DataFrame(self.block[start:stop], index=index, columns=self.years, copy=False)
+
+    def screen(self, metric: str) -> pd.DataFrame:
+        """
+        :param metric: Row label, e.g. 'Gross Margin (%)'.
+        :return: (pd.DataFrame) One row per ticker that has the metric and one column per year.
+        """
+        code = self.metrics.get_loc(metric)
+        rows = np.flatnonzero(self.codes == code)
+        # Each row belongs to the last ticker whose offset is at or before it.
+        owners = np.searchsorted(self.offsets, rows, side="right") - 1
+        df = pd.DataFrame(self.block[rows], index=pd.Index(np.asarray(self.tickers)[owners], name="ticker"), columns=self.years)
+        return df[~df.index.duplicated()]
+
+
+class Universe:
+    """
+    Every table type of a universe of tickers, each held as a UniverseTable.
+
+    Uses a fraction of the memory of one DataFrame per (ticker, table), and screens a metric across
+    every ticker with one array gather.
+    """
+
+    def __init__(self, tables: dict) -> None:
+        """
+        :param tables: Table name mapped to its UniverseTable.
+        """
+        self.tables = tables
+
+    @classmethod
+    def from_storage(cls, storage, tickers: list, tables: list = None, dtype: str = "float64"):
+        """
+        Load cached tables into a universe. Tables that are not cached are left out.
+
+        :param storage: Storage the tables are read from, e.g. CsvStorage.
+        :param tickers: Tickers to include.
+        :param tables: Tables to include. Defaults to every table in PAGE_TABLES.
+        :param dtype: See `UniverseTable.from_tables`.
+        :return: (Universe)
+        """
+        if tables is None:
+            tables = [name for page in PAGE_TABLES.values() for name in page]
+        universe = {}
+        for table in tables:
+            # One table type at a time, so only its DataFrames are held while its block is built.
+            frames = {}
+            for ticker in tickers:
+                try:
+                    frames[ticker.upper()] = storage.read(ticker.upper(), table)
+                except FileNotFoundError:
+                    continue
+            universe[table] = UniverseTable.from_tables(table, frames, dtype)
+        return cls(universe)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.nbytes for table in self.tables.values())
+
+    def get(self, ticker: str, table: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) One table of one ticker, as a view. See `UniverseTable.get`.
+        """
+        return self.tables[table].get(ticker)
+
+    def screen(self, metric: str, table: str) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) One row per ticker and one column per year. See `UniverseTable.screen`.
+        """
+        return self.tables[table].screen(metric)
+
+
+"""----------------------------------- Change Detection -----------------------------------"""
+
+
+def table_fingerprint(df: pd.DataFrame) -> str:
+    """
+    :param df: Table as scraped or read from storage.
+    :return: (str) Hash of the normalized table. Equal for tables with the same labels and values,
+             whether they were just scraped or read back from a CSV file.
+    """
+    df = to_float_table(df)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(map(str, df.index)).encode())
+    digest.update(b"\x1e")
+    digest.update("\x1f".join(map(str, df.columns)).encode())
+    digest.update(b"\x1e")
+    values = df.to_numpy(dtype="float64")
+    # One NaN bit pattern, and no negative zero, so equal values always hash the same.
+    values = np.where(np.isnan(values), np.nan, values) + 0.0
+    digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def diff_tables(ticker: str, table: str, old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    :param old: Cached table, or None if there was none.
+    :param new: Table about to be written.
+    :return: (pd.DataFrame) One row per cell whose value changed, appeared or disappeared, with the
+             columns ticker, table, metric, year, old and new.
+    """
+    new = to_float_table(new)
+    new = new[~new.index.duplicated()]
+    if old is None:
+        old = pd.DataFrame(index=new.index, columns=new.columns, dtype="float64")
+    old = to_float_table(old)
+    old = old[~old.index.duplicated()]
+    old, new = old.align(new, join="outer")
+    before, after = old.to_numpy(dtype="float64"), new.to_numpy(dtype="float64")
+    changed = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+    rows, cols = np.nonzero(changed)
+    return pd.DataFrame(
+        {
+            "ticker": ticker,
+            "table": table,
+            "metric": new.index[rows],
+            "year": new.columns[cols],
+            "old": before[rows, cols],
+            "new": after[rows, cols],
+        }
+    )
+
+
+class ChangeTracker:
+    """
+    Skips writes of tables that did not change, and keeps a changelog of the cells that did.
+
+    Pass one to every RoicScraper of a run. Each table about to be written is fingerprinted and
+    compared with the cached one. Unchanged tables are not rewritten, so their files, and whatever
+    depends on them, are left alone. Changed cells are listed in `get_changelog`, so downstream
+    models can recompute only what changed.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        """
+        :param path: JSON file the fingerprints are kept in between runs, saved by `save`. Known
+                     fingerprints spare reading the cached table when nothing changed. If None,
+                     every cached table is read once per run to compare it.
+        """
+        self.path = path
+        self._fingerprints = {}  # "TICKER/table" -> fingerprint of the stored table.
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as file:
+                self._fingerprints = json.load(file)
+        self._changes = []
+        self._lock = threading.Lock()
+
+    def check(self, ticker: str, table: str, df: pd.DataFrame, storage):
+        """
+        Compare a table about to be written with the cached one. Nothing is recorded until `commit`.
+
+        :param storage: Storage the cached table is read from.
+        :return: (dict) The change to pass to `commit` once the table is written. None if the table did not change
+                 and is stored.
+        """
+        key = f"{ticker}/{table}"
+        fingerprint = table_fingerprint(df)
+        with self._lock:
+            known = self._fingerprints.get(key)
+        # The fingerprint only stands for the stored table while it is still there, e.g. in this storage.
+        if known == fingerprint and storage.exists(ticker, table):
+            return None
+
+        try:
+            old = storage.read(ticker, table)
+        except FileNotFoundError:
+            old = None
+        if old is not None and known is None and table_fingerprint(old) == fingerprint:
+            # The stored table is already this one, so its fingerprint can be kept right away.
+            with self._lock:
+                self._fingerprints[key] = fingerprint
+            return None
+
+        return {"key": key, "fingerprint": fingerprint, "changes": diff_tables(ticker, table, old, df)}
+
+    def commit(self, change: dict) -> None:
+        """
+        Record a change returned by `check`. Call it only once the table was written, so a failed
+        write is not taken for an unchanged table when it is retried.
+
+        :param change: Change returned by `check`.
+        :return: None
+        """
+        with self._lock:
+            self._fingerprints[change["key"]] = change["fingerprint"]
+            if not change["changes"].empty:
+                self._changes.append(change["changes"])
+
+    def get_changelog(self) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) Every changed cell of the run: ticker, table, metric, year, old and new value.
+        """
+        with self._lock:
+            changes = list(self._changes)
+        if not changes:
+            return pd.DataFrame(columns=["ticker", "table", "metric", "year", "old", "new"])
+        return pd.concat(changes, ignore_index=True)
+
+    def get_changed_tables(self) -> list:
+        """
+        :return: (list) (ticker, table) of every table that changed in the run.
+        """
+        changelog = self.get_changelog()
+        return list(changelog[["ticker", "table"]].drop_duplicates().itertuples(index=False, name=None))
+
+    def write_changelog(self, path: str) -> None:
+        """
+        Write the changelog of the run as JSON lines, one changed cell per line.
+
+        :param path: File to write. Replaced atomically.
+        :return: None
+        """
+        changelog = self.get_changelog()
+        folder = os.path.dirname(path) or "."
+        write_files_atomic(
+            [(folder, path, lambda temp_path: changelog.to_json(temp_path, orient="records", lines=True))]
+        )
+
+    def save(self) -> None:
+        """
+        Save the fingerprints to `path`, for the next run.
+
+        :return: None
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            fingerprints = dict(self._fingerprints)
+        folder = os.path.dirname(self.path) or "."
+
+        def write(temp_path: str) -> None:
+            with open(temp_path, "w") as file:
+                json.dump(fingerprints, file)
+
+        write_files_atomic([(folder, self.path, write)])
+
+    def new_run(self) -> None:
+        """
+        Clear the changelog, keeping the fingerprints.
+
+        :return: None
+        """
+        with self._lock:
+            self._changes = []
+
+
+"""----------------------------------- Instrumentation -----------------------------------"""
+
+# Upper bounds of the duration histogram buckets, in seconds.
+DURATION_BUCKETS = [0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf")]
+
+
+class MetricsRegistry:
+    """
+    Counters and duration histograms for every scrape stage, labelled by ticker and table.
+
+    Listeners added with `add_listener` receive each event as a dict as soon as it is recorded,
+    e.g. to stream them to a JSON lines file with `JsonLinesWriter`. The totals can be exported
+    in Prometheus text format with `to_prometheus` or as JSON lines with `to_json_lines`.
+    """
+
+    def __init__(self) -> None:
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def add_listener(self, listener) -> None:
+        """
+        :param listener: Callable taking one event dict.
+        :return: None
+        """
+        self._listeners.append(listener)
+
+    def _emit(self, event: dict) -> None:
+        for listener in self._listeners:
+            listener(event)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            key = self._get_key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit({"type": "counter", "name": name, "value": value, **labels})
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            key = self._get_key(name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = [[0] * len(DURATION_BUCKETS), 0.0, 0]
+                self._histograms[key] = histogram
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+        self._emit({"type": "histogram", "name": name, "value": value, **labels})
+
+    @contextlib.contextmanager
+    def time(self, stage: str, **labels):
+        """
+        Record the duration of a stage in 'stage_seconds', and count it in 'stage_failures_total' if it raises.
+
+        :param stage: Stage name, e.g. 'page_load'.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count("stage_failures_total", stage=stage, **labels)
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """
+        :return: (float) Value of the counter, summed over every label set that matches `labels`.
+        """
+        with self._lock:
+            return sum(
+                value
+                for (counter, counter_labels), value in self._counters.items()
+                if counter == name and set(labels.items()) <= set(counter_labels)
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(labels: tuple, extra: str = "") -> str:
+        parts = [f'{key}="{str(value)}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def to_prometheus(self, prefix: str = "roic_") -> str:
+        """
+        :return: (str) Every counter and histogram in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {prefix}{name} counter")
+                typed.add(name)
+            lines.append(f"{prefix}{name}{self._format_labels(labels)} {value}")
+        for (name, labels), (buckets, total, count) in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                typed.add(name)
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = self._format_labels(labels, 'le="' + le + '"')
+                lines.append(f"{prefix}{name}_bucket{bucket_labels} {bucket_count}")
+            lines.append(f"{prefix}{name}_sum{self._format_labels(labels)} {total}")
+            lines.append(f"{prefix}{name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self) -> str:
+        """
+        :return: (str) One JSON object per counter and histogram.
+        """
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(json.dumps({"type": "counter", "name": name, "value": value, **dict(labels)}))
+            for (name, labels), (buckets, total, count) in sorted(self._histograms.items()):
+                lines.append(
+                    json.dumps(
+                        {
+                            "type": "histogram",
+                            "name": name,
+                            "sum": total,
+                            "count": count,
+                            "buckets": dict(zip([str(b) for b in DURATION_BUCKETS], buckets)),
+                            **dict(labels),
+                        }
+                    )
+                )
+        return "\n".join(lines) + "\n"
+
+
+class JsonLinesWriter:
+    """Metrics listener appending every event, with its time, to a JSON lines file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps({"time": time.time(), **event})
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(line + "\n")
+
+
+# Shared by every RoicScraper in the process unless another registry is passed in.
+metrics = MetricsRegistry()
+
+
+"""----------------------------------- Page Readiness -----------------------------------"""
+
+READY_TIMEOUT = 15  # Seconds
+READY_POLL_INTERVAL = 0.25  # Seconds
+READY_STABLE_POLLS = 2  # Polls in a row with no change before a page counts as loaded.
+READY_EMPTY_STABLE_POLLS = 8  # Polls in a row with no change before a table without rows counts as empty.
+
+# Returns the page state, the number of resources fetched so far, and the row count of each table (-1 if missing).
+_READY_SCRIPT = """
+const counts = arguments[0].map((xpath) => {
+    const table = document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    return table ? table.querySelectorAll("tbody > tr").length : -1;
+});
+return [document.readyState, performance.getEntriesByType("resource").length, counts];
+"""
+
+
+class _TablesReady:
+    """
+    WebDriverWait condition. True once neither the row counts nor the number of network requests
+    changed for READY_STABLE_POLLS polls in a row, and every table has rows. A table that is still
+    empty or missing after READY_EMPTY_STABLE_POLLS such polls is listed in `empty` instead.
+    """
+
+    def __init__(self, table_xpaths: list) -> None:
+        self.table_xpaths = table_xpaths
+        self.polls = 0
+        self.empty = []
+        self._last_state = None
+        self._stable_polls = 0
+
+    def __call__(self, browser) -> bool:
+        self.polls += 1
+        ready_state, resources, counts = browser.execute_script(
+            _READY_SCRIPT, self.table_xpaths
+        )
+        state = (resources, tuple(counts))
+        if ready_state == "loading" or state != self._last_state:
+            self._last_state = state
+            self._stable_polls = 0
+            return False
+        self._stable_polls += 1
+        if min(counts, default=1) > 0:
+            return self._stable_polls >= READY_STABLE_POLLS
+        # A table may be filled in late, so give the page longer to settle before calling it empty.
+        if self._stable_polls >= READY_EMPTY_STABLE_POLLS:
+            self.empty = [xpath for xpath, count in zip(self.table_xpaths, counts) if count <= 0]
+            return True
+        return False
+
+
+"""----------------------------------- Cache Reader -----------------------------------"""
+
+
+class RoicReader:
+    """
+    Read-only access to the cached tables of a ticker.
+
+    Never imports selenium, never starts a browser and never writes, so it is cheap to create in
+    processes that only serve cached data. Missing tables raise FileNotFoundError instead of being
+    scraped. RoicScraper builds on it and scrapes whatever is missing.
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        country: str = "US",
+        data_export_path: str = None,
+        storage=None,
+        cache_policy: CachePolicy = None,
+        memory_cache: TableCache = table_cache,
+    ) -> None:
+        """
+        :param data_export_path: Folder of the default CSV storage. See `get_setting`.
+        :param storage: Where tables are cached, e.g. ParquetStorage. Defaults to CSV files in the 'data_export_path'.
+        :param cache_policy: If set, tables it considers stale raise StaleTableError.
+        :param memory_cache: Keeps recently read tables in memory. Shared by every reader in the process by default. None disables it.
+        """
+        self.ticker = ticker.upper()
+        self.country = country.upper()
+        if storage is None:
+            storage = CsvStorage(get_setting("data_export_path", data_export_path))
+        self.storage = storage
+        self.cache_policy = cache_policy
+        self.memory_cache = memory_cache
+
+    def _read_table(self, table: str) -> pd.DataFrame:
+        """
+        :param table: Table name, e.g. 'income_statement'.
+        :return: (pd.DataFrame) The cached table. Raises FileNotFoundError if it is missing, or StaleTableError if it must be scraped again.
+        """
+        key = (self.ticker, self.country, table)
+        cached = None if self.memory_cache is None else self.memory_cache.get(key)
+        if cached is not None:
+            df, scraped_at = cached
+        else:
+            df = self.storage.read(self.ticker, table)
+            scraped_at = self.storage.read_scrape_time(self.ticker, table)
+            if self.memory_cache is not None:
+                self.memory_cache.put(key, df, scraped_at)
+        if self.cache_policy is not None:
+            if not self.cache_policy.is_fresh(table, df, scraped_at, ticker=self.ticker):
+                raise StaleTableError(f"{self.ticker} {table} is stale.")
+        return df
+
+    def is_stale(self, table: str) -> bool:
+        """
+        :param table: Table name, e.g. 'income_statement'.
+        :return: (bool) True if the table is missing, or the cache policy says it must be scraped again.
+        """
+        try:
+            self._read_table(table)
+        except FileNotFoundError:
+            return True
+        return False
+
+    def get_table(self, table: str) -> pd.DataFrame:
+        """
+        :param table: Table name, e.g. 'income_statement'.
+        :return: (pd.DataFrame) The cached table. Raises FileNotFoundError if it is missing or stale.
+        """
+        return self._read_table(table)
+
+    def get_all_financial_statements(self) -> dict:
+        return {name: self._read_table(name) for name in PAGE_TABLES["financials"]}
+
+    def get_all_ratios_data(self, derive: bool = False) -> dict:
+        """
+        :param derive: If True, the tables in DERIVED_TABLES are computed from the cached financial statements.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        data = {}
+        for name in PAGE_TABLES["ratios"]:
+            if not (derive and name in DERIVED_TABLES):
+                data[name] = self._read_table(name)
+        if derive:
+            data.update(derive_ratio_tables(self.get_all_financial_statements()))
+        return {name: data[name] for name in PAGE_TABLES["ratios"]}
+
+
+class RoicScraper(RoicReader):
+    def __init__(
+        self,
+        ticker: str,
+        country: str = "US",
+        debug: bool = False,
+        pool: DriverPool = None,
+        http_first: bool = False,
+        site_url: str = ROIC_URL,
+        storage=None,
+        dataset: ConsolidatedDataset = None,
+        cache_policy: CachePolicy = None,
+        memory_cache: TableCache = table_cache,
+        profile: ScrapeProfile = None,
+        metrics: MetricsRegistry = metrics,
+        data_export_path: str = None,
+        chrome_driver_path: str = None,
+        changes: ChangeTracker = None,
+    ) -> None:
+        """
+        :param http_first: If True, tables are read from the plain HTTP response when the server renders them, and the browser is only used as a fallback.
+        :param site_url: Root of the site to scrape. Override to point at a local copy.
+        :param storage: Where tables are cached, e.g. ParquetStorage. Defaults to CSV files in the 'data_export_path'.
+        :param dataset: If set, every table written is also added to this consolidated dataset.
+        :param cache_policy: Decides when a cached table is scraped again. If None, cached tables are served until updated.
+        :param memory_cache: Keeps recently read tables in memory. Shared by every scraper in the process by default. None disables it.
+        :param profile: Chrome settings for browsers this scraper starts itself. Ignored when `pool` is set.
+        :param metrics: Registry that stage timings and WebDriver round trips are recorded in.
+        :param data_export_path: Folder of the default CSV storage. See `get_setting`.
+        :param chrome_driver_path: Path to the chromedriver executable, looked up when the first browser starts. See `get_setting`.
+        :param changes: If set, tables that did not change are not rewritten, and changed cells are logged in it.
+        """
+        super().__init__(ticker, country, data_export_path, storage, cache_policy, memory_cache)
+        self.debug = debug
+        self.http_first = http_first
+        self.base_url = f"{site_url}/quote/{self.ticker}:{self.country}"
+        self._chrome_driver_path = chrome_driver_path
+        self.dataset = dataset
+        self.changes = changes
+        self.metrics = metrics
+
+        """ -- Chromedriver options -- """
+        self.profile = profile
+        self._chrome_options = None
+        self.pool = pool  # If set, browsers are borrowed from the pool instead of started.
+        self.browser = None
+
+    """----------------------------------- Browser Operations -----------------------------------"""
+
+    @property
+    def chrome_driver_path(self) -> str:
+        # Only looked up once a browser is needed.
+        if self._chrome_driver_path is None:
+            self._chrome_driver_path = get_setting("chrome_driver_path")
+        return self._chrome_driver_path
+
+    @property
+    def chrome_options(self):
+        if self._chrome_options is None:
+            if self.profile is not None:
+                self._chrome_options = self.profile.get_chrome_options()
+            else:
+                self._chrome_options = _selenium.webdriver.ChromeOptions()
+                self._chrome_options.add_argument("--disable-gpu")
+        return self._chrome_options
+
+    def _timed(self, stage: str, table: str = ""):
+        """
+        :param stage: Stage name, e.g. 'page_load'.
+        :param table: Table (or page) the stage works on.
+        :return: Context manager recording the duration of the stage.
+        """
+        if not self.debug:
+            return self.metrics.time(stage, ticker=self.ticker, table=table)
+        return self._timed_debug(stage, table)
+
+    @contextlib.contextmanager
+    def _timed_debug(self, stage: str, table: str):
+        start = time.perf_counter()
+        with self.metrics.time(stage, ticker=self.ticker, table=table):
+            yield
+        print(f"[{self.ticker}] {table} {stage}: {time.perf_counter() - start:.3f}s")
+
+    def _count_round_trips(self, table: str = "", n: int = 1) -> None:
+        self.metrics.count("webdriver_round_trips_total", n, ticker=self.ticker, table=table)
+
+    def _create_browser(self, url=None, table: str = ""):
+        """
+        :param url: The website to visit.
+        :param table: Table (or page) the browser is opened for. Only used to label metrics.
+        :return: None
+        """
+        with self._timed("browser_start", table):
+            if self.pool is not None:
+                self.browser = self.pool.acquire()
+            else:
+                service = _selenium.Service(executable_path=self.chrome_driver_path)
+                self.browser = _selenium.webdriver.Chrome(service=service, options=self.chrome_options)
+                if self.profile is not None:
+                    self.profile.apply(self.browser)
+        try:
+            with self._timed("page_load", table):
+                self._count_round_trips(table)
+                # Default browser route
+                if url == None:
+                    self.browser.get(url=self.sec_annual_url)
+                # External browser route
+                else:
+                    self.browser.get(url=url)
+        except _selenium.WebDriverException:
+            self._clean_close(failed=True)
+            raise
+        if self.pool is not None:
+            self.pool.record_page_load(self.browser)
+
+    def _clean_close(self, failed: bool = False) -> None:
+        """
+        :param failed: If True, the session crashed and must not be reused.
+        :return: None
+        """
+        if self.pool is not None:
+            self.pool.release(self.browser, failed=failed)
+        else:
+            try:
+                self.browser.close()
+            except _selenium.WebDriverException:
+                pass  # The window is already gone.
+            self.browser.quit()
+        self.browser = None
+
+    def _read_data(
+        self, xpath: str, wait: bool = False, _wait_time: int = 5, tag: str = ""
+    ) -> str:
+        """
+        :param xpath: Path to the web element.
+        :param wait: Boolean to determine if selenium should wait until the element is located.
+        :param wait_time: Integer that represents how many seconds selenium should wait, if wait is True.
+        :return: (str) Text of the element.
+        """
+        self._count_round_trips()
+        if wait:
+            try:
+                data = (
+                    _selenium.WebDriverWait(self.browser, _wait_time)
+                    .until(_selenium.EC.presence_of_element_located((_selenium.By.XPATH, xpath)))
+                    .text
+                )
+            except _selenium.TimeoutException:
+                print(f"[Failed Xpath] {xpath}")
+                if tag != "":
+                    print(f"[Tag]: {tag}")
+                raise _selenium.NoSuchElementException("Element not found")
+            except _selenium.NoSuchElementException:
+                print(f"[Failed Xpath] {xpath}")
+                return "N\A"
+        else:
+            try:
+                data = self.browser.find_element("xpath", xpath).text
+            except _selenium.NoSuchElementException:
+                data = "N\A"
+        # Return the text of the element found.
+        return data
+
+    def _click_button(
+        self,
+        xpath: str,
+        wait: bool = False,
+        _wait_time: int = 5,
+        scroll: bool = False,
+        tag: str = "",
+    ) -> None:
+        """
+        :param xpath: Path to the web element.
+        :param wait: Boolean to determine if selenium should wait until the element is located.
+        :param wait_time: Integer that represents how many seconds selenium should wait, if wait is True.
+        :return: None. Because this function clicks the button but does not return any information about the button or any related web elements.
+        """
+        self._count_round_trips()
+        if wait:
+            try:
+                element = _selenium.WebDriverWait(self.browser, _wait_time).until(
+                    _selenium.EC.presence_of_element_located((_selenium.By.XPATH, xpath))
+                )
+                # If the webdriver needs to scroll before clicking the element.
+                if scroll:
+                    self.browser.execute_script("arguments[0].click();", element)
+                element.click()
+            except _selenium.TimeoutException:
+                print(f"[Failed Xpath] {xpath}")
+                if tag != "":
+                    print(f"[Tag]: {tag}")
+                raise _selenium.NoSuchElementException("Element not found")
+        else:
+            element = self.browser.find_element("xpath", xpath)
+            if scroll:
+                self.browser.execute_script("arguments[0].click();", element)
+            element.click()
+
+    """----------------------------------- Table Storage -----------------------------------"""
+
+    def _write_table(self, table: str, df: pd.DataFrame) -> None:
+        with self._timed("storage_write", table):
+            change = None if self.changes is None else self.changes.check(self.ticker, table, df, self.storage)
+            changed = self.changes is None or change is not None
+            if changed:
+                self.storage.write(self.ticker, table, df)
+            if change is not None:
+                self.changes.commit(change)
+            # An unchanged table is only marked as checked.
+            self._write_scrape_time(table)
+        if self.dataset is not None and changed:
+            self.dataset.add(self.ticker, table, df)
+
+    def _write_scrape_time(self, table: str) -> None:
+        """
+        Record that the table was scraped now. The cached copy in memory is dropped, as it holds the old scrape time.
+
+        :param table: Table name, e.g. 'income_statement'.
+        :return: None
+        """
+        self.storage.write_scrape_time(self.ticker, table, time.time())
+        if self.memory_cache is not None:
+            self.memory_cache.invalidate((self.ticker, self.country, table))
+
+    """----------------------------------- Page Scraping -----------------------------------"""
+
+    def _scrape_summary_page(self):
+        return self.scrape_page("summary", ["summary"])["summary"]
+
+    def get_summary(self):
+        try:
+            df = self._read_table("summary")
+            return df
+        except FileNotFoundError:
+            df = self.update_summary()
+            return df
+
+    def update_summary(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("summary", ["summary"])["summary"]
+        df = self._scrape_summary_page()
+        self._write_table("summary", df)
+        return df
+
+    """----------------------------------- Scrape Income Statement  -----------------------------------"""
+
+    def _scrape_income_statement(self):
+        return self.scrape_page("financials", ["income_statement"])["income_statement"]
+
+    def get_income_statement(self, update: bool = False):
+        if update:
+            df = self.update_income_statement()
+            return df
+        else:
+            try:
+                df = self._read_table("income_statement")
+                return df
+            except FileNotFoundError:
+                df = self.update_income_statement()
+                return df
+
+    def update_income_statement(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("financials", ["income_statement"])["income_statement"]
+        df = self._scrape_income_statement()
+        self._write_table("income_statement", df)
+        return df
+
+    """----------------------------------- Scrape Balance Sheet  -----------------------------------"""
+
+    def _scrape_balance_sheet(self):
+        return self.scrape_page("financials", ["balance_sheet"])["balance_sheet"]
+
+    def get_balance_sheet(self, update: bool = False):
+        if update:
+            df = self.update_balance_sheet()
+            return df
+        else:
+            try:
+                df = self._read_table("balance_sheet")
+                return df
+            except FileNotFoundError:
+                df = self.update_balance_sheet()
+                return df
+
+    def update_balance_sheet(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("financials", ["balance_sheet"])["balance_sheet"]
+        df = self._scrape_balance_sheet()
+        self._write_table("balance_sheet", df)
+        return df
+
+    """----------------------------------- Scrape Cash Flow  -----------------------------------"""
+
+    def _scrape_cash_flow(self):
+        return self.scrape_page("financials", ["cash_flow"])["cash_flow"]
+
+    def get_cash_flow(self, update: bool = False):
+        if update:
+            df = self.update_cash_flow()
+            return df
+        else:
+            try:
+                df = self._read_table("cash_flow")
+                return df
+            except FileNotFoundError:
+                df = self.update_cash_flow()
+                return df
+
+    def update_cash_flow(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("financials", ["cash_flow"])["cash_flow"]
+        df = self._scrape_cash_flow()
+        self._write_table("cash_flow", df)
+        return df
+
+    """----------------------------------- Scrape Profitability  -----------------------------------"""
+
+    def _scrape_profitability(self):
+        return self.scrape_page("ratios", ["profitability"])["profitability"]
+
+    def get_profitability(self, update: bool = False):
+        if update:
+            df = self.update_profitability()
+            return df
+        else:
+            try:
+                df = self._read_table("profitability")
+                return df
+            except FileNotFoundError:
+                df = self.update_profitability()
+                return df
+
+    def update_profitability(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["profitability"])["profitability"]
+        df = self._scrape_profitability()
+        self._write_table("profitability", df)
+        return df
+
+    """----------------------------------- Scrape Credit  -----------------------------------"""
+
+    def _scrape_credit(self):
+        return self.scrape_page("ratios", ["credit"])["credit"]
+
+    def get_credit(self, update: bool = False):
+        if update:
+            df = self.update_credit()
+            return df
+        else:
+            try:
+                df = self._read_table("credit")
+                return df
+            except FileNotFoundError:
+                df = self.update_credit()
+                return df
+
+    def update_credit(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["credit"])["credit"]
+        df = self._scrape_credit()
+        self._write_table("credit", df)
+        return df
+
+    """----------------------------------- Scrape Liquidity  -----------------------------------"""
+
+    def _scrape_liquidity(self):
+        return self.scrape_page("ratios", ["liquidity"])["liquidity"]
+
+    def get_liquidity(self, update: bool = False):
+        if update:
+            df = self.update_liquidity()
+            return df
+        else:
+            try:
+                df = self._read_table("liquidity")
+                return df
+            except FileNotFoundError:
+                df = self.update_liquidity()
+                return df
+
+    def update_liquidity(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["liquidity"])["liquidity"]
+        df = self._scrape_liquidity()
+        self._write_table("liquidity", df)
+        return df
+
+    """----------------------------------- Scrape Working Capital  -----------------------------------"""
+
+    def _scrape_working_capital(self):
+        return self.scrape_page("ratios", ["working_capital"])["working_capital"]
+
+    def get_working_capital(self, update: bool = False):
+        if update:
+            df = self.update_working_capital()
+            return df
+        else:
+            try:
+                df = self._read_table("working_capital")
+                return df
+            except FileNotFoundError:
+                df = self.update_working_capital()
+                return df
+
+    def update_working_capital(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["working_capital"])["working_capital"]
+        df = self._scrape_working_capital()
+        self._write_table("working_capital", df)
+        return df
+
+    """----------------------------------- Scrape Enterprise Value  -----------------------------------"""
+
+    def _scrape_enterprise_value(self):
+        return self.scrape_page("ratios", ["enterprise_value"])["enterprise_value"]
+
+    def get_enterprise_value(self, update: bool = False):
+        if update:
+            df = self.update_enterprise_value()
+            return df
+        else:
+            try:
+                df = self._read_table("enterprise_value")
+                return df
+            except FileNotFoundError:
+                df = self.update_enterprise_value()
+                return df
+
+    def update_enterprise_value(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["enterprise_value"])["enterprise_value"]
+        df = self._scrape_enterprise_value()
+        self._write_table("enterprise_value", df)
+        return df
+
+    """----------------------------------- Scrape Multiples  -----------------------------------"""
+
+    def _scrape_multiples(self):
+        return self.scrape_page("ratios", ["multiples"])["multiples"]
+
+    def get_multiples(self, update: bool = False):
+        if update:
+            df = self.update_multiples()
+            return df
+        else:
+            try:
+                df = self._read_table("multiples")
+                return df
+            except FileNotFoundError:
+                df = self.update_multiples()
+                return df
+
+    def update_multiples(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["multiples"])["multiples"]
+        df = self._scrape_multiples()
+        self._write_table("multiples", df)
+        return df
+
+    """----------------------------------- Scrape Per Share Data-----------------------------------"""
+
+    def _scrape_per_share_data(self):
+        return self.scrape_page("ratios", ["per_share_data"])["per_share_data"]
+
+    def get_per_share_data(self, update: bool = False):
+        if update:
+            df = self.update_per_share_data()
+            return df
+        else:
+            try:
+                df = self._read_table("per_share_data")
+                return df
+            except FileNotFoundError:
+                df = self.update_per_share_data()
+                return df
+
+    def update_per_share_data(self, incremental: bool = False):
+        if incremental:
+            return self._update_tables_incremental("ratios", ["per_share_data"])["per_share_data"]
+        df = self._scrape_per_share_data()
+        self._write_table("per_share_data", df)
+        return df
+
+    """----------------------------------- Page Level Scraping -----------------------------------"""
+
+    def _get_page_url(self, page: str) -> str:
+        if page == "summary":
+            return self.base_url
+        return f"{self.base_url}/{page}"
+
+    def scrape_page(self, page: str, tables: list = None) -> dict:
+        """
+        Load a page once and read every requested table from the same snapshot.
+
+        :param page: Page to scrape. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to read. If None, every table on the page is read.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        if tables is None:
+            tables = list(PAGE_TABLES[page].keys())
+        if self.http_first:
+            data = self._scrape_page_http(page, tables)
+            if data is not None:
+                return data
+        snapshot = self._load_page_snapshot(page, tables)
+        return self._read_snapshot_tables(snapshot, page, tables)
+
+    def _read_snapshot_tables(self, snapshot, page: str, tables: list) -> dict:
+        """
+        :param snapshot: Page loaded in the browser, parsed.
+        :param page: Page the snapshot is of. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to read.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        data = {}
+        for name in tables:
+            with self._timed("table_parse", name):
+                data[name] = self._get_table_data(PAGE_TABLES[page][name], snapshot)
+        return data
+
+    def _scrape_page_http(self, page: str, tables: list):
+        """
+        Read the tables from the server response, without a browser.
+
+        :param page: Page to fetch. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to read.
+        :return: (dict) Table name mapped to its DataFrame, or None if any table is not in the response.
+        """
+        with self._timed("http_page_load", page):
+            snapshot = self._fetch_http_snapshot(page)
+        if snapshot is None:
+            return None
+        return self._read_http_tables(snapshot, page, tables)
+
+    def _read_http_tables(self, snapshot, page: str, tables: list):
+        """
+        :param snapshot: Server response, parsed.
+        :param page: Page the response is of. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to read.
+        :return: (dict) Table name mapped to its DataFrame, or None if any table is not in the response.
+        """
+        data = {}
+        for name in tables:
+            try:
+                with self._timed("table_parse", name):
+                    df = parse_table(snapshot, PAGE_TABLES[page][name])
+            except TableNotFoundError:
+                return None
+            # An empty table means it is filled in by the browser after the page loads.
+            if df.empty:
+                return None
+            data[name] = df
+        return data
+
+    def _fetch_http_snapshot(self, page: str):
+        """
+        :param page: Page to fetch. One of the keys of PAGE_TABLES.
+        :return: Parsed server response, or None if the request failed.
+        """
+        import requests
+
+        try:
+            response = get_http_session().get(
+                self._get_page_url(page), timeout=HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            return None
+        return lxml_html.document_fromstring(response.content)
+
+    def _get_snapshot(self, page: str, tables: list):
+        """
+        :param page: Page to load. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables that must be readable from the snapshot.
+        :return: Parsed page, from the server response if `http_first` and it holds every table, otherwise from the browser.
+        """
+        if self.http_first:
+            snapshot = self._fetch_http_snapshot(page)
+            if snapshot is not None:
+                try:
+                    if all(
+                        parse_table_labels(_find_table(snapshot, PAGE_TABLES[page][name]))["rows"]
+                        for name in tables
+                    ):
+                        return snapshot
+                except TableNotFoundError:
+                    pass
+        return self._load_page_snapshot(page, tables)
+
+    def _update_tables_incremental(self, page: str, tables: list) -> dict:
+        """
+        Load a page once and read only the year columns missing from each cached table, then append them.
+        Tables that are not cached yet are read in full.
+
+        :param page: Page to scrape. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to update.
+        :return: (dict) Table name mapped to its updated DataFrame.
+        """
+        snapshot = self._get_snapshot(page, tables)
+        data = {}
+        for name in tables:
+            table_xpath = PAGE_TABLES[page][name]
+            try:
+                cached = to_float_table(self.storage.read(self.ticker, name))
+            except FileNotFoundError:
+                df = self._get_table_data(table_xpath, snapshot)
+                self._write_table(name, df)
+                data[name] = df
+                continue
+
+            labels = self._get_table_labels(table_xpath, snapshot)
+            new_cols = [col for col in labels["cols"][1:] if col not in cached.columns]
+            if not new_cols:
+                # Nothing was filed since the last scrape, only record that the table was checked.
+                self._write_scrape_time(name)
+                data[name] = cached
+                continue
+
+            new = parse_table(snapshot, table_xpath, columns=new_cols)
+            rows = cached.index.append(new.index.difference(cached.index, sort=False))
+            df = cached.reindex(rows)
+            df[new_cols] = new.reindex(rows)[new_cols]
+            df.index.name = "index"
+            self._write_table(name, df)
+            data[name] = df
+        return data
+
+    def _load_page_snapshot(self, page: str, tables: list = None):
+        """
+        :param page: Page to load. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to wait for. If None, every table on the page.
+        :return: Parsed copy of the page. The browser is closed (or returned to the pool) before returning.
+        """
+        if tables is None:
+            tables = list(PAGE_TABLES[page].keys())
+        self._create_browser(self._get_page_url(page), page)
+        try:
+            with self._timed("table_ready", page):
+                self._wait_for_tables([PAGE_TABLES[page][name] for name in tables], page=page)
+            with self._timed("page_snapshot", page):
+                self._count_round_trips(page)
+                snapshot = self._get_page_snapshot()
+        except _selenium.TimeoutException:
+            self._clean_close()
+            raise
+        except _selenium.WebDriverException:
+            self._clean_close(failed=True)
+            raise
+        self._clean_close()
+        return snapshot
+
+    def _wait_for_tables(
+        self, table_xpaths: list, timeout: float = READY_TIMEOUT, page: str = ""
+    ) -> None:
+        """
+        Wait once until every table is populated and the page has stopped loading, so the whole
+        table can be read in a single pass. Tables that stay empty or missing once the page has
+        settled are reported, and read as empty tables.
+
+        :param table_xpaths: Paths to the table elements.
+        :param timeout: Seconds to wait before raising TimeoutException.
+        :return: None
+        """
+        condition = _TablesReady(table_xpaths)
+        try:
+            _selenium.WebDriverWait(self.browser, timeout, poll_frequency=READY_POLL_INTERVAL).until(
+                condition,
+                message=f"Page did not settle within {timeout} seconds: {table_xpaths}",
+            )
+        finally:
+            self._count_round_trips(page, condition.polls)
+        for xpath in condition.empty:
+            self.metrics.count("empty_tables_total", ticker=self.ticker, table=page)
+            if self.debug:
+                print(f"[{self.ticker}] {page}: table has no rows: {xpath}")
+
+    def _get_page_tables(
+        self, page: str, update: bool = False, incremental: bool = False, tables: list = None
+    ) -> dict:
+        """
+        Read the tables of a page from their CSV files, scraping the page at most once for any that are missing.
+
+        :param page: Page to read. One of the keys of PAGE_TABLES.
+        :param update: If True, every table is scraped and saved again.
+        :param incremental: If True, only the year columns missing from cached tables are scraped and appended.
+        :param tables: Tables of the page to read. Defaults to all of them.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        if tables is None:
+            tables = list(PAGE_TABLES[page])
+        data = {} if update else self._read_cached_tables(tables)
+        missing = [name for name in tables if name not in data]
+        if missing and incremental:
+            data.update(self._update_tables_incremental(page, missing))
+        elif missing:
+            scraped = self.scrape_page(page, missing)
+            self._write_tables(scraped)
+            data.update(scraped)
+
+        # Keep the page order of the tables.
+        return {name: data[name] for name in PAGE_TABLES[page] if name in data}
+
+    def _read_cached_tables(self, tables: list) -> dict:
+        """
+        :param tables: Names of the tables to read.
+        :return: (dict) Table name mapped to its DataFrame, for the tables that are cached and fresh.
+        """
+        data = {}
+        for name in tables:
+            try:
+                data[name] = self._read_table(name)
+            except FileNotFoundError:
+                pass
+        return data
+
+    def _write_tables(self, data: dict) -> None:
+        for name, df in data.items():
+            self._write_table(name, df)
+
+    """----------------------------------- Financial Statements Page -----------------------------------"""
+
+    def get_all_financial_statements(
+        self, update: bool = False, incremental: bool = False
+    ) -> dict:
+        return self._get_page_tables("financials", update, incremental)
+
+    """----------------------------------- Ratios Page -----------------------------------"""
+
+    def get_all_ratios_data(
+        self, update: bool = False, incremental: bool = False, derive: bool = False
+    ) -> dict:
+        """
+        :param update: If True, every table is scraped and saved again.
+        :param incremental: If True, only the year columns missing from cached tables are scraped and appended.
+        :param derive: If True, the tables in DERIVED_TABLES are computed from the financial statements
+                       instead of read from the ratios page, which is then only scraped for the tables
+                       that depend on the share price. Derived tables are not saved. The statements are
+                       read from the cache, and only scraped if missing or stale, even with `update`.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        if not derive:
+            return self._get_page_tables("ratios", update, incremental)
+        statements = self.get_all_financial_statements(incremental=incremental)
+        market_tables = [name for name in PAGE_TABLES["ratios"] if name not in DERIVED_TABLES]
+        data = self._get_page_tables("ratios", update, incremental, tables=market_tables)
+        data.update(derive_ratio_tables(statements))
+        return {name: data[name] for name in PAGE_TABLES["ratios"]}
+
+    def reconcile_ratios(self, rtol: float = 0.05, atol: float = 0.01) -> pd.DataFrame:
+        """
+        Check the derived ratio tables against the ones on the ratios page, cached or scraped.
+
+        :return: (pd.DataFrame) Per (table, metric) match counts, see `reconcile_ratios`.
+        """
+        derived = derive_ratio_tables(self.get_all_financial_statements())
+        scraped = self._get_page_tables("ratios", tables=DERIVED_TABLES)
+        return reconcile_ratios(derived, scraped, rtol, atol)
+
+    """----------------------------------- Scraping Utilities -----------------------------------"""
+
+    def _get_page_snapshot(self):
+        """
+        :return: Parsed copy of the page currently loaded in the browser.
+        """
+        return lxml_html.document_fromstring(self.browser.page_source)
+
+    def _get_table_data(self, table_xpath: str, snapshot=None) -> pd.DataFrame:
+        """
+        :param table_xpath: Path to the table element.
+        :param snapshot: Parsed page to read from. If None, the current page source is fetched once.
+        :return: (pd.DataFrame) Table data with the row labels as the index and the years as columns.
+                 Empty if the table is not on the page.
+        """
+        if snapshot is None:
+            self._count_round_trips()
+            snapshot = self._get_page_snapshot()
+        try:
+            return parse_table(snapshot, table_xpath)
+        except TableNotFoundError:
+            return build_table(np.empty((0, 0), dtype=object), [], [])
+
+    def _get_table_labels(self, table_xpath: str, snapshot=None) -> dict:
+        """
+        :param table_xpath: Path to the table element.
+        :param snapshot: Parsed page to read from. If None, the current page source is fetched once.
+        :return: (dict) Row and column labels of the table. No labels if the table is not on the page.
+        """
+        if snapshot is None:
+            self._count_round_trips()
+            snapshot = self._get_page_snapshot()
+        with self._timed("label_discovery"):
+            try:
+                return parse_table_labels(_find_table(snapshot, table_xpath))
+            except TableNotFoundError:
+                return {"rows": [], "cols": ["index"]}
+
+    """----------------------------------- Metric Calculations -----------------------------------"""
+
+    def calc_growth(self, values: pd.Series) -> pd.Series:
+        """
+        :param values: Row of a table, e.g. its 'Sales/Revenue/Turnover' row. Text cells are parsed.
+        :return: (pd.Series) Year over year growth as a fraction. See `yoy_growth`.
+        """
+        return yoy_growth(values)
+
+
+"""----------------------------------- Table Parsing -----------------------------------"""
+
+# Positions of the elements within a table, relative to the table element.
+ROW_XPATH = "tbody/tr"
+ROW_LABEL_XPATH = "td[1]/div/div[2]/span"
+COL_LABEL_XPATH = "thead/tr/th[{}]/div/span"
+DATA_XPATH = "td[{}]/div/span"
+FIRST_DATA_COL = 3  # First column holding data ('td[1]' is the label, 'td[2]' is a spacer).
+
+
+class TableNotFoundError(LookupError):
+    """Raised when a table is not in a page snapshot."""
+
+
+def _element_text(element, xpath: str) -> str:
+    found = element.xpath(xpath)
+    if not found:
+        return "N\\A"
+    return found[0].text_content()
+
+
+def _find_table(snapshot, table_xpath: str):
+    if isinstance(snapshot, (str, bytes)):
+        snapshot = lxml_html.document_fromstring(snapshot)
+    tables = snapshot.xpath(table_xpath)
+    if not tables:
+        raise TableNotFoundError(f"Table not found: {table_xpath}")
+    return tables[0]
+
+
+def parse_table_labels(table) -> dict:
+    """
+    :param table: Parsed table element.
+    :return: (dict) Row labels and column labels. The column labels start with 'index'.
+    """
+    rows = []
+    for row in table.xpath(ROW_XPATH):
+        row_data = _element_text(row, ROW_LABEL_XPATH)
+        if row_data == "N\\A":
+            break
+        row_data = row_data.replace(",", "").replace("+", "").replace("-", "")
+        if row_data[:1] == " ":
+            row_data = row_data[1:]  # Skip the empty space
+        rows.append(row_data)
+
+    cols = ["index"]
+    col_index = FIRST_DATA_COL
+    while True:
+        col_data = _element_text(table, COL_LABEL_XPATH.format(col_index))
+        if col_data == "N\\A":
+            break
+        cols.append(col_data.split(" ")[0])
+        col_index += 1
+
+    return {
+        "rows": rows,
+        "cols": cols,
+    }
+
+
+def parse_table(snapshot, table_xpath: str, columns: list = None) -> pd.DataFrame:
+    """
+    Build a table from a single snapshot of the page, without any browser round trips.
+
+    :param snapshot: Page source as a string, or a page already parsed with lxml.
+    :param table_xpath: Path to the table element.
+    :param columns: Column labels (years) to read. If None, every column is read.
+    :return: (pd.DataFrame) Table data with the row labels as the index and the years as columns.
+             Raises TableNotFoundError if the table is not in the snapshot.
+    """
+    table = _find_table(snapshot, table_xpath)
+    labels = parse_table_labels(table)
+    grid, col_labels = extract_table_cells(table, labels, columns)
+    return build_table(grid, labels["rows"], col_labels)
+
+
+def extract_table_cells(table, labels: dict, columns: list = None) -> tuple:
+    """
+    :param table: Parsed table element.
+    :param labels: Labels of the table, from `parse_table_labels`.
+    :param columns: Column labels (years) to read. If None, every column is read.
+    :return: (tuple) 2-D array of raw cell text, and the labels of the columns read.
+    """
+    row_labels = labels["rows"]
+    col_labels = labels["cols"][1:]  # Skip the 'index' element.
+    col_range = [FIRST_DATA_COL + i for i in range(len(col_labels))]
+    if columns is not None:
+        col_range = [col for col, label in zip(col_range, col_labels) if label in columns]
+        col_labels = [label for label in col_labels if label in columns]
+
+    rows = table.xpath(ROW_XPATH)[: len(row_labels)]
+    grid = np.array(
+        [[_element_text(row, DATA_XPATH.format(col)) for col in col_range] for row in rows],
+        dtype=object,
+    ).reshape(len(row_labels), len(col_labels))
+    return grid, col_labels
+
+
+def build_table(grid, row_labels: list, col_labels: list) -> pd.DataFrame:
+    """
+    :param grid: 2-D array of raw cell text.
+    :param row_labels: Label of each row.
+    :param col_labels: Label (year) of each column.
+    :return: (pd.DataFrame) Normalized float64 table with the row labels as the index.
+    """
+    values = normalize_values(grid, percent_rows=["%" in label for label in row_labels])
+    df = pd.DataFrame(values, index=row_labels, columns=col_labels)
+    df.index.name = "index"
+    return df
+
+
+"""----------------------------------- Value Normalization -----------------------------------"""
+
+# Cell text that means there is no value.
+MISSING_VALUES = ["- -", "--", "-", "N\\A", "N/A", "NA", "NaN", "nan", ""]
+SUFFIX_MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+def normalize_values(grid, percent_rows=None) -> np.ndarray:
+    """
+    Convert a grid of raw cell text to numbers, in one pass over the whole table.
+
+    Handles thousands separators, parenthesized negatives, 'K'/'M'/'B'/'T' suffixes, missing value
+    sentinels and percentages. Percentages are stored as fractions: cells ending in '%' (or '%)' when
+    negative), and every cell of the rows flagged in `percent_rows`, are divided by 100.
+
+    :param grid: 2-D array of cell text (or numbers).
+    :param percent_rows: One boolean per row. If None, only cells ending in '%' are scaled.
+    :return: (np.ndarray) float64 array with the shape of the grid. Unparseable cells are NaN.
+    """
+    grid = np.asarray(grid, dtype=object)
+    shape = grid.shape
+    if grid.size == 0:
+        return np.empty(shape, dtype="float64")
+
+    text = pd.Series(grid.ravel(), dtype="string").str.strip()
+    text = text.mask(text.isin(MISSING_VALUES))
+    negative = (text.str.startswith("(") & text.str.endswith(")")).fillna(False)
+    percent = text.str.rstrip(")").str.endswith("%").fillna(False)
+    text = text.str.replace(r"[(),%\s$]", "", regex=True)
+    multiplier = text.str[-1].str.upper().map(SUFFIX_MULTIPLIERS).astype("float64").fillna(1.0)
+    text = text.str.replace(r"[KMBTkmbt]$", "", regex=True)
+
+    values = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    values = values * multiplier.to_numpy()
+    values = np.where(negative.to_numpy(dtype=bool), -np.abs(values), values)
+
+    scale = percent.to_numpy(dtype=bool).reshape(shape)
+    if percent_rows is not None:
+        scale = scale | np.asarray(percent_rows, dtype=bool).reshape(-1, 1)
+    values = values.reshape(shape)
+    return np.where(scale, values / 100, values)
+
+
+"""----------------------------------- Metric Engine -----------------------------------"""
+
+# Every function below works on whole tables at once: a table of one ticker (metrics x years), a
+# screen of many tickers (tickers x years, see ConsolidatedDataset.screen), or any array with the
+# years on its last axis, e.g. a stacked (ticker, metric, year) block. Years must be consecutive
+# columns in ascending order. Missing inputs give NaN, never an error.
+
+
+def _to_float_array(values) -> np.ndarray:
+    if isinstance(values, (pd.DataFrame, pd.Series)):
+        values = values.to_numpy()
+    array = np.asarray(values)
+    if array.dtype.kind not in "fiub":
+        array = normalize_values(array)  # Cell text, e.g. a table read from CSV with object columns.
+    return array.astype("float64", copy=False)
+
+
+def _like(values, result: np.ndarray):
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(result, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+def _shift(array: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full_like(array, np.nan)
+    if periods < array.shape[-1]:
+        shifted[..., periods:] = array[..., : array.shape[-1] - periods]
+    return shifted
+
+
+def _align(*values) -> list:
+    if all(isinstance(value, pd.DataFrame) for value in values):
+        index, columns = values[0].index, values[0].columns
+        for value in values[1:]:
+            index, columns = index.union(value.index, sort=False), columns.union(value.columns, sort=False)
+        return [value.reindex(index=index, columns=columns) for value in values]
+    return list(values)
+
+
+def safe_divide(numerator, denominator):
+    """
+    :param numerator: Table or array.
+    :param denominator: Table or array of the same shape. DataFrames are aligned on index and columns first.
+    :return: numerator / denominator, NaN where the denominator is 0 or missing.
+    """
+    numerator, denominator = _align(numerator, denominator)
+    top, bottom = _to_float_array(numerator), _to_float_array(denominator)
+    result = np.full(np.broadcast(top, bottom).shape, np.nan)
+    np.divide(top, bottom, out=result, where=(bottom != 0) & ~np.isnan(bottom))
+    return _like(numerator, result)
+
+
+def yoy_growth(values, periods: int = 1):
+    """
+    :param values: Table or array with years on the last axis.
+    :param periods: Years between the values compared.
+    :return: Growth over `periods` years as a fraction, e.g. 0.1 for 10%, as `pct_change` computes it, so
+             growth from a negative value has the sign of the ratio. NaN for the first `periods` years
+             and where the earlier value is 0 (where `pct_change` gives inf) or missing.
+    """
+    array = _to_float_array(values)
+    previous = _shift(array, periods)
+    result = np.full_like(array, np.nan)
+    np.divide(array - previous, previous, out=result, where=(previous != 0) & ~np.isnan(previous))
+    return _like(values, result)
+
+
+def cagr(values, years: int):
+    """
+    :param values: Table or array with years on the last axis.
+    :param years: Length of the window, e.g. 10 for a 10-year CAGR.
+    :return: Compound annual growth rate over the `years` years ending at each column, as a fraction.
+             NaN for the first `years` columns and where either end is missing, or the start is not
+             positive or the end is negative. The latest CAGR of every ticker is the last column.
+    """
+    array = _to_float_array(values)
+    start = _shift(array, years)
+    valid = (start > 0) & (array >= 0)
+    result = np.full_like(array, np.nan)
+    np.divide(array, start, out=result, where=valid)
+    np.power(result, 1 / years, out=result, where=valid)
+    return _like(values, result - 1)
+
+
+def rolling_mean(values, window: int, min_periods: int = None):
+    """
+    :param values: Table or array with years on the last axis.
+    :param window: Years in each average.
+    :param min_periods: Values needed in a window for an average. Defaults to `window`.
+    :return: Mean of the `window` years ending at each column, skipping missing values.
+    """
+    if min_periods is None:
+        min_periods = window
+    array = _to_float_array(values)
+    present = ~np.isnan(array)
+    sums = np.cumsum(np.where(present, array, 0.0), axis=-1)
+    counts = np.cumsum(present, axis=-1)
+    sums[..., window:] -= sums[..., :-window].copy()
+    counts[..., window:] -= counts[..., :-window].copy()
+    result = np.full_like(array, np.nan)
+    np.divide(sums, counts, out=result, where=counts >= max(min_periods, 1))
+    return _like(values, result)
+
+
+def margin(numerator, revenue):
+    """
+    :param numerator: e.g. gross profit, operating income or free cash flow.
+    :param revenue: Revenue of the same tickers and years.
+    :return: numerator / revenue as a fraction. NaN where revenue is 0 or missing.
+    """
+    return safe_divide(numerator, revenue)
+
+
+def invested_capital(total_debt, total_equity, cash):
+    """
+    :return: Total debt + total equity - cash. NaN where any of them is missing.
+    """
+    total_debt, total_equity, cash = _align(total_debt, total_equity, cash)
+    result = _to_float_array(total_debt) + _to_float_array(total_equity) - _to_float_array(cash)
+    return _like(total_debt, result)
+
+
+def roic(operating_income, tax_rate, capital, average_capital: bool = True):
+    """
+    Return on invested capital: operating income after tax, over invested capital.
+
+    :param operating_income: Operating income (EBIT).
+    :param tax_rate: Effective tax rate as a fraction. Missing rates are treated as 0.
+    :param capital: Invested capital, see `invested_capital`.
+    :param average_capital: If True, the average of the opening and closing capital is used, which
+                            needs the previous year. Otherwise the closing capital.
+    :return: ROIC as a fraction.
+    """
+    operating_income, tax_rate, capital = _align(operating_income, tax_rate, capital)
+    nopat = _to_float_array(operating_income) * (1 - np.nan_to_num(_to_float_array(tax_rate)))
+    capital_array = _to_float_array(capital)
+    if average_capital:
+        capital_array = (capital_array + _shift(capital_array, 1)) / 2
+    return safe_divide(_like(operating_income, nopat), _like(operating_income, capital_array))
+
+
+"""----------------------------------- Ratio Derivation -----------------------------------"""
+
+FINANCIAL_TABLES = list(PAGE_TABLES["financials"])
+# Ratio tables that only need the financial statements. The other ratio tables depend on the share price.
+DERIVED_TABLES = ["profitability", "credit", "liquidity", "working_capital", "per_share_data"]
+DAYS_PER_YEAR = 365
+
+
+class _Statements:
+    """Rows of a ticker's three financial statements as float arrays over the same years."""
+
+    def __init__(self, statements: dict) -> None:
+        tables = [to_float_table(statements[name]) for name in FINANCIAL_TABLES]
+        columns = tables[0].columns
+        for df in tables[1:]:
+            columns = columns.union(df.columns, sort=False)
+        self.columns = columns
+        self._tables = [df.reindex(columns=columns) for df in tables]
+
+    def __call__(self, label: str) -> np.ndarray:
+        """
+        :return: (np.ndarray) The row from the first statement that has it, or NaN if none does.
+        """
+        for df in self._tables:
+            if label in df.index:
+                row = df.loc[label]
+                # A label repeated within a table keeps its first row.
+                return (row.iloc[0] if isinstance(row, pd.DataFrame) else row).to_numpy()
+        return np.full(len(self.columns), np.nan)
+
+    def average(self, label: str) -> np.ndarray:
+        """
+        :return: (np.ndarray) Average of the opening and closing balance, or the closing one in the first year.
+        """
+        return rolling_mean(self(label), 2, min_periods=1)
+
+    @property
+    def revenue(self) -> np.ndarray:
+        return self("Sales/Revenue/Turnover")
+
+    @property
+    def total_debt(self) -> np.ndarray:
+        short_term, long_term = self("ST Debt"), self("LT Debt")
+        both_missing = np.isnan(short_term) & np.isnan(long_term)
+        return np.where(both_missing, np.nan, np.nan_to_num(short_term) + np.nan_to_num(long_term))
+
+    @property
+    def net_debt(self) -> np.ndarray:
+        return self.total_debt - self("Cash Cash Equivalents & STI")
+
+    @property
+    def common_equity(self) -> np.ndarray:
+        return self("Equity Before Minority Interest")
+
+    @property
+    def shares(self) -> np.ndarray:
+        return self("Basic Weighted Avg Shares")
+
+    @property
+    def tax_rate(self) -> np.ndarray:
+        return safe_divide(self("Income Tax Expense (Benefit)"), self("Pretax Income (Loss) GAAP"))
+
+    @property
+    def payout_ratio(self) -> np.ndarray:
+        return safe_divide(np.abs(self("Dividends Paid")), self("Net Income Avail to Common GAAP"))
+
+    def return_on_equity(self) -> np.ndarray:
+        return safe_divide(self("Net Income Avail to Common GAAP"), rolling_mean(self.common_equity, 2, min_periods=1))
+
+    def turnover(self, flow: np.ndarray, balance: str) -> np.ndarray:
+        return safe_divide(flow, self.average(balance))
+
+
+# Table -> row label -> formula over the statements, in the row order of the page.
+RATIO_FORMULAS = {
+    "profitability": {
+        "Return on Common Equity (%)": lambda s: s.return_on_equity(),
+        "Return on Assets (%)": lambda s: safe_divide(s("Net Income GAAP"), s.average("Total Assets")),
+        "Return on Capital (%)": lambda s: roic(
+            s("Operating Income (Loss)"), s.tax_rate, s.total_debt + s("Total Equity")
+        ),
+        "Return on Invested Capital (%)": lambda s: roic(
+            s("Operating Income (Loss)"),
+            s.tax_rate,
+            invested_capital(s.total_debt, s("Total Equity"), s("Cash Cash Equivalents & STI")),
+        ),
+        "Gross Margin (%)": lambda s: margin(s("Gross Profit"), s.revenue),
+        "EBITDA Margin (%)": lambda s: margin(s("EBITDA"), s.revenue),
+        "Operating Margin (%)": lambda s: margin(s("Operating Income (Loss)"), s.revenue),
+        "Incremental Operating Margin (%)": lambda s: safe_divide(
+            np.diff(s("Operating Income (Loss)"), prepend=np.nan), np.diff(s.revenue, prepend=np.nan)
+        ),
+        "Pretax Margin (%)": lambda s: margin(s("Pretax Income (Loss) GAAP"), s.revenue),
+        "Income before XO Margin (%)": lambda s: margin(s("Income (Loss) from Cont Ops"), s.revenue),
+        "Net Income Margin (%)": lambda s: margin(s("Net Income GAAP"), s.revenue),
+        "Net Income to Common Margin (%)": lambda s: margin(s("Net Income Avail to Common GAAP"), s.revenue),
+        "Effective Tax Rate (%)": lambda s: s.tax_rate,
+        "Dvd Payout Ratio (%)": lambda s: s.payout_ratio,
+        "Sustainable Growth Rate (%)": lambda s: s.return_on_equity() * (1 - s.payout_ratio),
+    },
+    "credit": {
+        "Total Debt/EBIT": lambda s: safe_divide(s.total_debt, s("Operating Income (Loss)")),
+        "Net Debt/EBIT": lambda s: safe_divide(s.net_debt, s("Operating Income (Loss)")),
+        "Total Debt/EBITDA": lambda s: safe_divide(s.total_debt, s("EBITDA")),
+        "Net Debt/EBITDA": lambda s: safe_divide(s.net_debt, s("EBITDA")),
+        "EBITDA to Interest Expense": lambda s: safe_divide(s("EBITDA"), s("Interest Expense")),
+        "Common Equity/Total Assets (%)": lambda s: safe_divide(s.common_equity, s("Total Assets")),
+        "LT Debt/Equity (%)": lambda s: safe_divide(s("LT Debt"), s("Total Equity")),
+        "LT Debt/Capital (%)": lambda s: safe_divide(s("LT Debt"), s.total_debt + s("Total Equity")),
+        "LT Debt/Total Assets (%)": lambda s: safe_divide(s("LT Debt"), s("Total Assets")),
+        "Total Debt/Equity (%)": lambda s: safe_divide(s.total_debt, s("Total Equity")),
+        "Total Debt/Capital (%)": lambda s: safe_divide(s.total_debt, s.total_debt + s("Total Equity")),
+        "Total Debt/Total Assets (%)": lambda s: safe_divide(s.total_debt, s("Total Assets")),
+        "Net Debt/Equity (%)": lambda s: safe_divide(s.net_debt, s("Total Equity")),
+    },
+    "liquidity": {
+        "Cash Ratio": lambda s: safe_divide(s("Cash Cash Equivalents & STI"), s("Total Current Liabilities")),
+        "Current Ratio": lambda s: safe_divide(s("Total Current Assets"), s("Total Current Liabilities")),
+        "Quick Ratio": lambda s: safe_divide(
+            s("Cash Cash Equivalents & STI") + s("Accounts & Notes Receiv"), s("Total Current Liabilities")
+        ),
+        "CFO/Current Liabilities": lambda s: safe_divide(
+            s("Cash from Operating Activities"), s("Total Current Liabilities")
+        ),
+        "Common Equity/Total Assets (%)": lambda s: safe_divide(s.common_equity, s("Total Assets")),
+    },
+    "working_capital": {
+        "Asset Turnover": lambda s: s.turnover(s.revenue, "Total Assets"),
+        "Fixed Asset Turnover": lambda s: s.turnover(s.revenue, "Property Plant & Equip Net"),
+        "Accounts Receivable Turnover": lambda s: s.turnover(s.revenue, "Accounts Receivable Net"),
+        "Days Sales Outstanding": lambda s: safe_divide(
+            DAYS_PER_YEAR, s.turnover(s.revenue, "Accounts Receivable Net")
+        ),
+        "Inventory Turnover": lambda s: s.turnover(s("Cost of Revenue"), "Inventories"),
+        "Days Inventory Outstanding": lambda s: safe_divide(
+            DAYS_PER_YEAR, s.turnover(s("Cost of Revenue"), "Inventories")
+        ),
+        "Accounts Payable Turnover": lambda s: s.turnover(s("Cost of Revenue"), "Accounts Payable"),
+        "Days Payable Outstanding": lambda s: safe_divide(
+            DAYS_PER_YEAR, s.turnover(s("Cost of Revenue"), "Accounts Payable")
+        ),
+        "Cash Conversion Cycle": lambda s: (
+            safe_divide(DAYS_PER_YEAR, s.turnover(s.revenue, "Accounts Receivable Net"))
+            + safe_divide(DAYS_PER_YEAR, s.turnover(s("Cost of Revenue"), "Inventories"))
+            - safe_divide(DAYS_PER_YEAR, s.turnover(s("Cost of Revenue"), "Accounts Payable"))
+        ),
+    },
+    "per_share_data": {
+        "Revenue per Share": lambda s: safe_divide(s.revenue, s.shares),
+        "Basic EPS": lambda s: s("Basic EPS GAAP"),
+        "Diluted EPS": lambda s: s("Diluted EPS GAAP"),
+        "Book Value per Share": lambda s: safe_divide(s.common_equity, s.shares),
+        "Tangible Book Value per Share": lambda s: safe_divide(
+            s.common_equity - np.nan_to_num(s("Total Intangible Assets")), s.shares
+        ),
+        "Free Cash Flow per Share": lambda s: safe_divide(
+            s("Cash from Operating Activities") + np.nan_to_num(s("Capital Expenditures")), s.shares
+        ),
+        "Dividends per Share": lambda s: s("Dividend per Share"),
+    },
+}
+
+
+def derive_ratio_tables(statements: dict, tables: list = None) -> dict:
+    """
+    Compute ratio tables from a ticker's financial statements, without scraping the ratios page.
+
+    :param statements: Table name mapped to its DataFrame, for every table in FINANCIAL_TABLES.
+    :param tables: Ratio tables to derive. Defaults to DERIVED_TABLES.
+    :return: (dict) Table name mapped to its derived DataFrame, with the rows of the scraped table.
+    """
+    rows = _Statements(statements)
+    derived = {}
+    for table in tables or DERIVED_TABLES:
+        formulas = RATIO_FORMULAS[table]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = np.vstack([np.asarray(formula(rows), dtype="float64") for formula in formulas.values()])
+        df = pd.DataFrame(values, index=list(formulas), columns=rows.columns)
+        df.index.name = "index"
+        derived[table] = df
+    return derived
+
+
+def reconcile_ratios(derived: dict, scraped: dict, rtol: float = 0.05, atol: float = 0.01) -> pd.DataFrame:
+    """
+    Compare derived ratio tables with the ones scraped from the ratios page.
+
+    :param derived: Table name mapped to its derived DataFrame, see `derive_ratio_tables`.
+    :param scraped: Table name mapped to its scraped DataFrame.
+    :param rtol: Relative difference under which two values match.
+    :param atol: Absolute difference under which two values match, for values near 0.
+    :return: (pd.DataFrame) One row per (table, metric): the years both have a value for, how many of
+             them match, and the largest relative difference.
+    """
+    rows = []
+    for table, derived_df in derived.items():
+        scraped_df = to_float_table(scraped[table])
+        for metric in derived_df.index:
+            if metric not in scraped_df.index:
+                continue
+            ours, theirs = derived_df.loc[[metric]].align(scraped_df.loc[[metric]], join="inner", axis=1)
+            ours, theirs = ours.to_numpy()[0], theirs.to_numpy()[0]
+            both = ~np.isnan(ours) & ~np.isnan(theirs)
+            relative = safe_divide(np.abs(ours[both] - theirs[both]), np.abs(theirs[both]))
+            relative = relative[~np.isnan(relative)]
+            rows.append(
+                {
+                    "table": table,
+                    "metric": metric,
+                    "years": int(both.sum()),
+                    "matching": int(np.isclose(ours[both], theirs[both], rtol=rtol, atol=atol).sum()),
+                    "max_relative_difference": relative.max() if relative.size else np.nan,
+                }
+            )
+    report = pd.DataFrame(rows, columns=["table", "metric", "years", "matching", "max_relative_difference"])
+    report["reconciled"] = report["matching"] == report["years"]
+    return report
+
+
+"""----------------------------------- Job Journal -----------------------------------"""
+
+
+class JobJournal:
+    """
+    Persistent record of the (ticker, page) tasks of a batch run, in SQLite.
+
+    Each task goes pending -> running -> done, or -> failed and back to pending after a backoff,
+    until it runs out of attempts and is marked dead. Tasks left 'running' by a crashed run are
+    picked up again on the next one, and finished tasks are never repeated. Use one journal file
+    per run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 4,
+        backoff: float = 30,
+        max_backoff: float = 30 * 60,
+    ) -> None:
+        """
+        :param path: SQLite file of the journal. Created if missing.
+        :param max_attempts: Attempts before a failing task is marked dead.
+        :param backoff: Seconds before the first retry. Doubles with every attempt.
+        :param max_backoff: Longest wait between two attempts, in seconds.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    ticker TEXT NOT NULL,
+                    page TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    started_at REAL,
+                    finished_at REAL,
+                    duration REAL,
+                    last_error TEXT,
+                    PRIMARY KEY (ticker, page)
+                )
+                """
+            )
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock, self._connection:
+            return self._connection.execute(sql, params).fetchall()
+
+    def add_tasks(self, tickers: list, pages: list) -> None:
+        """Add tasks that are not in the journal yet. Existing tasks keep their state."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO tasks (ticker, page) VALUES (?, ?)",
+                [(ticker.upper(), page) for ticker in tickers for page in pages],
+            )
+
+    def recover(self) -> int:
+        """
+        Put tasks that were running when a previous run died back in the queue.
+
+        :return: (int) Number of tasks recovered.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE tasks SET state = 'pending' WHERE state = 'running'"
+            )
+            return cursor.rowcount
+
+    def get_runnable(self, now: float = None) -> list:
+        """
+        :return: (list) (ticker, page) of every task that can run now.
+        """
+        if now is None:
+            now = time.time()
+        return self._execute(
+            """
+            SELECT ticker, page FROM tasks
+            WHERE state IN ('pending', 'failed') AND next_attempt_at <= ?
+            ORDER BY attempts, ticker, page
+            """,
+            (now,),
+        )
+
+    def get_next_retry_time(self):
+        """
+        :return: (float) When the next failed task can be retried, or None if none is waiting.
+        """
+        rows = self._execute("SELECT MIN(next_attempt_at) FROM tasks WHERE state = 'failed'")
+        return rows[0][0]
+
+    def mark_running(self, ticker: str, page: str) -> None:
+        self._execute(
+            """
+            UPDATE tasks SET state = 'running', attempts = attempts + 1, started_at = ?
+            WHERE ticker = ? AND page = ?
+            """,
+            (time.time(), ticker, page),
+        )
+
+    def mark_done(self, ticker: str, page: str) -> None:
+        now = time.time()
+        self._execute(
+            """
+            UPDATE tasks SET state = 'done', finished_at = ?, duration = ? - started_at, last_error = NULL
+            WHERE ticker = ? AND page = ?
+            """,
+            (now, now, ticker, page),
+        )
+
+    def mark_failed(self, ticker: str, page: str, error: str) -> bool:
+        """
+        :return: (bool) True if the task has no attempts left and is now dead.
+        """
+        attempts = self._execute(
+            "SELECT attempts FROM tasks WHERE ticker = ? AND page = ?", (ticker, page)
+        )[0][0]
+        dead = attempts >= self.max_attempts
+        delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+        now = time.time()
+        self._execute(
+            """
+            UPDATE tasks SET state = ?, next_attempt_at = ?, finished_at = ?, duration = ? - started_at, last_error = ?
+            WHERE ticker = ? AND page = ?
+            """,
+            ("dead" if dead else "failed", now + delay, now, now, error, ticker, page),
+        )
+        return dead
+
+    def get_summary(self) -> dict:
+        """
+        :return: (dict) Number of tasks in each state.
+        """
+        return dict(self._execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        :return: (pd.DataFrame) Every task with its state, attempts, timings and last error.
+        """
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM tasks", self._connection)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+"""----------------------------------- Batch Scraping -----------------------------------"""
+
+
+class ScrapeError(Exception):
+    """Raised in place of the original error when a batch scrape fails, so it survives the trip between processes."""
+
+    def __init__(self, ticker: str, page: str, message: str) -> None:
+        super().__init__(ticker, page, message)
+        self.ticker = ticker
+        self.page = page
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"[{self.ticker}] {self.page}: {self.message}"
+
+
+class _RateLimiter:
+    """Spaces out requests to one domain across every process that shares it."""
+
+    def __init__(self, requests_per_second: float, lock, next_request_at) -> None:
+        self.min_interval = 1 / requests_per_second if requests_per_second else 0
+        self.lock = lock
+        self.next_request_at = next_request_at  # Shared 'd' value, seconds since the epoch.
+
+    def wait(self) -> None:
+        if not self.min_interval:
+            return
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_request_at.value)
+            self.next_request_at.value = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# State of a batch worker process, filled in by `_init_batch_worker`.
+_batch_worker = {}
+
+
+def _init_batch_worker(
+    browser_slots, rate_limiter: _RateLimiter, keep_warm: bool, max_page_loads: int
+) -> None:
+    _batch_worker["browser_slots"] = browser_slots
+    _batch_worker["rate_limiter"] = rate_limiter
+    _batch_worker["keep_warm"] = keep_warm
+    _batch_worker["max_page_loads"] = max_page_loads
+    _batch_worker["pool"] = None
+    # Quit the warm session when the worker process exits.
+    multiprocessing.util.Finalize(None, _close_batch_worker, exitpriority=10)
+
+
+def _close_batch_worker() -> None:
+    if _batch_worker.get("pool") is not None:
+        _batch_worker["pool"].close()
+
+
+def _scrape_batch_task(
+    ticker: str, country: str, page: str, update: bool, storage, cache_policy
+) -> list:
+    """
+    :return: (list) (ticker, table, DataFrame or ScrapeError) for every table on the page.
+    """
+    try:
+        scraper = RoicScraper(
+            ticker, country, storage=storage, cache_policy=cache_policy
+        )
+        if not update:
+            try:
+                # Everything is cached and fresh, so no browser or rate limit slot is needed.
+                return [
+                    (ticker, name, scraper._read_table(name))
+                    for name in PAGE_TABLES[page]
+                ]
+            except FileNotFoundError:
+                pass  # Something is missing or stale, so the page is scraped.
+        # The tables of the page are committed together once it is done.
+        writer = StorageWriter(scraper.storage, batch_size=None, flush_interval=None)
+        scraper.storage = writer
+        if _batch_worker["keep_warm"]:
+            # Every worker process fits under the browser cap, so each keeps one warm session.
+            if _batch_worker["pool"] is None:
+                _batch_worker["pool"] = DriverPool(
+                    scraper.chrome_driver_path,
+                    size=1,
+                    max_page_loads=_batch_worker["max_page_loads"],
+                )
+            scraper.pool = _batch_worker["pool"]
+        with _batch_worker["browser_slots"]:
+            _batch_worker["rate_limiter"].wait()
+            data = scraper._get_page_tables(page, update)
+        writer.flush()
+    except Exception as e:
+        error = ScrapeError(ticker, page, f"{type(e).__name__}: {str(e).strip()}")
+        return [(ticker, name, error) for name in PAGE_TABLES[page]]
+    return [(ticker, name, df) for name, df in data.items()]
+
+
+def scrape_batch(
+    tickers: list,
+    pages: list = None,
+    country: str = "US",
+    max_workers: int = 4,
+    max_browsers: int = None,
+    requests_per_second: float = 1.0,
+    update: bool = False,
+    max_page_loads: int = 50,
+    storage=None,
+    cache_policy: CachePolicy = None,
+    journal: JobJournal = None,
+):
+    """
+    Scrape many tickers across a process pool, yielding each table as soon as its page is done.
+
+    :param tickers: Tickers to scrape.
+    :param pages: Pages to scrape for each ticker. One or more keys of PAGE_TABLES. Defaults to every page.
+    :param country: Country of the tickers.
+    :param max_workers: Number of worker processes.
+    :param max_browsers: Maximum number of Chrome instances open at once. Defaults to `max_workers`.
+    :param requests_per_second: Maximum page loads per second against roic.ai, across all workers. 0 disables the limit.
+    :param update: If True, cached tables are scraped again.
+    :param max_page_loads: Page loads after which a worker's warm Chrome session is recycled.
+    :param storage: Where tables are cached. Defaults to CSV files in the 'data_export_path'.
+    :param cache_policy: Decides which cached tables are scraped again. If None, only missing tables are scraped.
+    :param journal: If set, the run resumes from it: finished tasks are skipped, and failed tasks are retried with backoff. Errors are only yielded once a task has no attempts left.
+    :return: Generator of (ticker, table, DataFrame or ScrapeError) tuples, in completion order.
+    """
+    if pages is None:
+        pages = list(PAGE_TABLES.keys())
+    if max_browsers is None:
+        max_browsers = max_workers
+
+    ctx = multiprocessing.get_context()
+    browser_slots = ctx.BoundedSemaphore(max_browsers)
+    rate_limiter = _RateLimiter(requests_per_second, ctx.Lock(), ctx.Value("d", 0.0))
+    keep_warm = max_browsers >= max_workers
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=ctx,
+        initializer=_init_batch_worker,
+        initargs=(browser_slots, rate_limiter, keep_warm, max_page_loads),
+    ) as executor:
+
+        def submit(ticker: str, page: str):
+            return executor.submit(
+                _scrape_batch_task, ticker, country, page, update, storage, cache_policy
+            )
+
+        if journal is None:
+            futures = [submit(ticker.upper(), page) for ticker in tickers for page in pages]
+            for future in as_completed(futures):
+                for result in future.result():
+                    yield result
+            return
+
+        journal.add_tasks(tickers, pages)
+        journal.recover()
+        while True:
+            runnable = journal.get_runnable()
+            if not runnable:
+                retry_at = journal.get_next_retry_time()
+                if retry_at is None:
+                    break
+                time.sleep(max(0, retry_at - time.time()))
+                continue
+
+            futures = {}
+            for ticker, page in runnable:
+                journal.mark_running(ticker, page)
+                futures[submit(ticker, page)] = (ticker, page)
+            for future in as_completed(futures):
+                ticker, page = futures[future]
+                results = future.result()
+                errors = [data for _, _, data in results if isinstance(data, ScrapeError)]
+                if not errors:
+                    journal.mark_done(ticker, page)
+                elif not journal.mark_failed(ticker, page, str(errors[0])):
+                    continue  # Retried after the backoff, so nothing is yielded yet.
+                for result in results:
+                    yield result
+
+
+"""----------------------------------- Work Queue -----------------------------------"""
+
+DEFAULT_LEASE = 120  # Seconds a worker holds a task without a heartbeat before it is handed to another one.
+
+
+class SqliteQueue:
+    """
+    Work queue of (ticker, country, page) tasks in a SQLite file.
+
+    Workers on one machine, or on machines sharing a filesystem with working locks, lease tasks from it.
+    A leased task is handed to another worker once its lease runs out without a heartbeat, so tasks of
+    a worker that died are scraped again. Use RedisQueue to spread the work over machines.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3) -> None:
+        """
+        :param path: SQLite file of the queue. Created if missing.
+        :param max_attempts: Leases of a task before it is marked dead.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._connect()
+
+    def _connect(self) -> None:
+        # Autocommit, so every method controls its own transaction.
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queue (
+                    id INTEGER PRIMARY KEY,
+                    ticker TEXT NOT NULL,
+                    country TEXT NOT NULL,
+                    page TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_until REAL,
+                    last_error TEXT,
+                    UNIQUE (ticker, country, page)
+                )
+                """
+            )
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._connect()  # Each worker process opens its own connection.
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def enqueue(self, tickers: list, pages: list = None, country: str = "US") -> None:
+        """
+        Add a task for every page of every ticker. Tasks already in the queue keep their state.
+        """
+        pages = pages or list(PAGE_TABLES.keys())
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO queue (ticker, country, page) VALUES (?, ?, ?)",
+                [(ticker.upper(), country.upper(), page) for ticker in tickers for page in pages],
+            )
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE):
+        """
+        :return: (dict) The next pending task, or one whose lease ran out, now leased to `worker`.
+            None if there is nothing to do right now.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "UPDATE queue SET state = 'dead', last_error = 'Lease expired on the last attempt.' "
+                    "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                row = connection.execute(
+                    "SELECT id, ticker, country, page, attempts FROM queue "
+                    "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+                    "ORDER BY attempts, id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE queue SET state = 'leased', attempts = attempts + 1, worker = ?, lease_until = ? "
+                        "WHERE id = ?",
+                        (worker, now + lease_seconds, row[0]),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        task_id, ticker, country, page, attempts = row
+        return {"id": task_id, "ticker": ticker, "country": country, "page": page, "attempt": attempts + 1}
+
+    def heartbeat(self, task_id, worker: str, lease_seconds: float = DEFAULT_LEASE) -> bool:
+        """
+        :return: (bool) True if the lease was extended. False if the task was handed to another worker.
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "UPDATE queue SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (time.time() + lease_seconds, task_id, worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id, worker: str) -> None:
+        self._execute(
+            "UPDATE queue SET state = 'done', lease_until = NULL, last_error = NULL WHERE id = ? AND worker = ?",
+            (task_id, worker),
+        )
+
+    def fail(self, task_id, worker: str, error: str) -> None:
+        """
+        Put the task back in the queue, or mark it dead once it has used all its attempts.
+        """
+        self._execute(
+            "UPDATE queue SET state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+            "lease_until = NULL, last_error = ? WHERE id = ? AND worker = ?",
+            (self.max_attempts, error, task_id, worker),
+        )
+
+    def get_summary(self) -> dict:
+        """
+        :return: (dict) Number of tasks in each state.
+        """
+        return dict(self._execute("SELECT state, COUNT(*) FROM queue GROUP BY state"))
+
+
+class RedisQueue:
+    """
+    Work queue of (ticker, country, page) tasks in Redis, shared by workers on any number of machines.
+
+    Works with any client that has the redis-py API, e.g. `redis.Redis.from_url(...)`, or
+    `fakeredis.FakeRedis()` as a local stand-in. Pending task ids are kept in a list, leases in a
+    sorted set scored by expiry, and each task in a hash. Every change of a task runs as one Lua script,
+    so a worker that dies midway never leaves a task out of both the list and the leases.
+    Create it with `from_url` to pass it to worker processes, as a client cannot be pickled.
+    """
+
+    # KEYS: pending. ARGV: task key prefix, then ticker, country, page of each task.
+    _ENQUEUE = """
+        for i = 2, #ARGV, 3 do
+            local task_id = ARGV[i + 1] .. ':' .. ARGV[i] .. ':' .. ARGV[i + 2]
+            local key = ARGV[1] .. task_id
+            -- Enqueueing the same task twice is a no-op.
+            if redis.call('HSETNX', key, 'state', 'pending') == 1 then
+                redis.call('HSET', key, 'ticker', ARGV[i], 'country', ARGV[i + 1], 'page', ARGV[i + 2], 'attempts', 0)
+                redis.call('LPUSH', KEYS[1], task_id)
+            end
+        end
+    """
+
+    # KEYS: pending, leases. ARGV: task key prefix, now, lease expiry, worker, max attempts.
+    _LEASE = """
+        local task_id = redis.call('RPOP', KEYS[1])
+        if not task_id then
+            for _, expired_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[2], 'LIMIT', 0, 10)) do
+                redis.call('ZREM', KEYS[2], expired_id)
+                local attempts = tonumber(redis.call('HGET', ARGV[1] .. expired_id, 'attempts') or '0')
+                if attempts < tonumber(ARGV[5]) then
+                    task_id = expired_id
+                    break
+                end
+                redis.call('HSET', ARGV[1] .. expired_id, 'state', 'dead', 'last_error', 'Lease expired on the last attempt.')
+            end
+        end
+        if not task_id then
+            return false
+        end
+        local key = ARGV[1] .. task_id
+        redis.call('ZADD', KEYS[2], ARGV[3], task_id)
+        local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('HSET', key, 'state', 'leased', 'worker', ARGV[4])
+        local task = redis.call('HMGET', key, 'ticker', 'country', 'page')
+        return {task_id, task[1], task[2], task[3], attempts}
+    """
+
+    # Shared start of the scripts below. KEYS: leases, task. ARGV: task id, worker.
+    _OWNED = """
+        if redis.call('HGET', KEYS[2], 'state') ~= 'leased' or redis.call('HGET', KEYS[2], 'worker') ~= ARGV[2] then
+            return 0
+        end
+    """
+
+    # ARGV[3]: new lease expiry.
+    _HEARTBEAT = _OWNED + """
+        -- Only extend a lease that still exists, never revive one another worker claimed.
+        if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+            return 0
+        end
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+        return 1
+    """
+
+    _COMPLETE = _OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HSET', KEYS[2], 'state', 'done')
+        redis.call('HDEL', KEYS[2], 'last_error')
+        return 1
+    """
+
+    # KEYS[3]: pending. ARGV[3]: error, ARGV[4]: max attempts.
+    _FAIL = _OWNED + """
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        if tonumber(redis.call('HGET', KEYS[2], 'attempts')) >= tonumber(ARGV[4]) then
+            redis.call('HSET', KEYS[2], 'state', 'dead', 'last_error', ARGV[3])
+        else
+            redis.call('HSET', KEYS[2], 'state', 'pending', 'last_error', ARGV[3])
+            redis.call('LPUSH', KEYS[3], ARGV[1])
+        end
+        return 1
+    """
+
+    def __init__(self, client, name: str = "roic", max_attempts: int = 3) -> None:
+        """
+        :param client: Redis client.
+        :param name: Prefix of every key, so several queues can share a server.
+        :param max_attempts: Leases of a task before it is marked dead.
+        """
+        self.url = None
+        self.name = name
+        self.max_attempts = max_attempts
+        self._pending = f"{name}:pending"
+        self._leases = f"{name}:leases"
+        self._connect(client)
+
+    @classmethod
+    def from_url(cls, url: str, name: str = "roic", max_attempts: int = 3) -> "RedisQueue":
+        """
+        :param url: Redis URL, e.g. 'redis://host:6379/0'. Requires `redis`.
+        :return: (RedisQueue) A queue that reconnects to `url` when it is unpickled in a worker process.
+        """
+        import redis
+
+        work_queue = cls(redis.Redis.from_url(url), name, max_attempts)
+        work_queue.url = url
+        return work_queue
+
+    def _connect(self, client) -> None:
+        self.client = client
+        self._enqueue = client.register_script(self._ENQUEUE)
+        self._lease = client.register_script(self._LEASE)
+        self._heartbeat = client.register_script(self._HEARTBEAT)
+        self._complete = client.register_script(self._COMPLETE)
+        self._fail = client.register_script(self._FAIL)
+
+    def __getstate__(self) -> dict:
+        if self.url is None:
+            raise TypeError("A RedisQueue built from a client cannot be pickled. Create it with RedisQueue.from_url.")
+        return {"url": self.url, "name": self.name, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state: dict) -> None:
+        import redis
+
+        self.__init__(redis.Redis.from_url(state["url"]), state["name"], state["max_attempts"])
+        self.url = state["url"]  # Each worker process opens its own connection.
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.name}:task:{task_id}"
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def enqueue(self, tickers: list, pages: list = None, country: str = "US") -> None:
+        """
+        Add a task for every page of every ticker. Tasks already in the queue keep their state.
+        """
+        pages = pages or list(PAGE_TABLES.keys())
+        for ticker in tickers:
+            args = [self._task_key("")]
+            for page in pages:
+                args += [ticker.upper(), country.upper(), page]
+            self._enqueue(keys=[self._pending], args=args)
+
+    def lease(self, worker: str, lease_seconds: float = DEFAULT_LEASE):
+        """
+        :return: (dict) The next pending task, or one whose lease ran out, now leased to `worker`.
+            None if there is nothing to do right now.
+        """
+        now = time.time()
+        task = self._lease(
+            keys=[self._pending, self._leases],
+            args=[self._task_key(""), now, now + lease_seconds, worker, self.max_attempts],
+        )
+        if not task:
+            return None
+        task_id, ticker, country, page, attempts = task
+        return {
+            "id": self._decode(task_id),
+            "ticker": self._decode(ticker),
+            "country": self._decode(country),
+            "page": self._decode(page),
+            "attempt": int(attempts),
+        }
+
+    def heartbeat(self, task_id, worker: str, lease_seconds: float = DEFAULT_LEASE) -> bool:
+        """
+        :return: (bool) True if the lease was extended. False if the task was handed to another worker.
+        """
+        return bool(
+            self._heartbeat(
+                keys=[self._leases, self._task_key(task_id)],
+                args=[task_id, worker, time.time() + lease_seconds],
+            )
+        )
+
+    def complete(self, task_id, worker: str) -> None:
+        self._complete(keys=[self._leases, self._task_key(task_id)], args=[task_id, worker])
+
+    def fail(self, task_id, worker: str, error: str) -> None:
+        """
+        Put the task back in the queue, or mark it dead once it has used all its attempts.
         """
+        self._fail(
+            keys=[self._leases, self._task_key(task_id), self._pending],
+            args=[task_id, worker, error, self.max_attempts],
+        )
 
-        if wait:
+    def get_summary(self) -> dict:
+        """
+        :return: (dict) Number of tasks in each state.
+        """
+        summary = {}
+        for key in self.client.scan_iter(match=f"{self.name}:task:*"):
+            state = self._decode(self.client.hget(key, "state"))
+            summary[state] = summary.get(state, 0) + 1
+        return summary
+
+
+def run_queue_worker(
+    work_queue,
+    worker: str = None,
+    lease_seconds: float = DEFAULT_LEASE,
+    update: bool = False,
+    storage=None,
+    cache_policy: CachePolicy = None,
+    requests_per_second: float = 1.0,
+    max_page_loads: int = 50,
+    idle_timeout: float = None,
+    poll_interval: float = 5.0,
+) -> dict:
+    """
+    Lease tasks from a work queue, scrape them and write the tables to storage, until the queue is empty.
+
+    Run one per process, on as many machines as needed. A heartbeat thread renews the lease while a
+    page is scraped. If the worker dies, its task is handed to another worker once the lease runs out.
+
+    :param work_queue: SqliteQueue, RedisQueue, or any object with the same methods.
+    :param worker: Name of this worker in the queue. Defaults to '{hostname}:{pid}'.
+    :param lease_seconds: Seconds a task stays leased without a heartbeat.
+    :param update: If True, tables are scraped even if they are cached and fresh.
+    :param storage: Where the tables are written. Must be shared by every worker, e.g. a network folder.
+    :param cache_policy: See `scrape_batch`.
+    :param requests_per_second: Page loads per second of this worker.
+    :param max_page_loads: Page loads before the warm browser is restarted.
+    :param idle_timeout: Seconds to wait for new tasks once the queue is empty. None to return at once.
+    :param poll_interval: Seconds between polls of an empty queue.
+    :return: (dict) Number of tasks completed and failed by this worker.
+    """
+    if worker is None:
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+    _init_batch_worker(
+        threading.BoundedSemaphore(1),
+        _RateLimiter(requests_per_second, threading.Lock(), multiprocessing.Value("d", 0.0, lock=False)),
+        True,
+        max_page_loads,
+    )
+    counts = {"completed": 0, "failed": 0}
+    idle_since = None
+    try:
+        while True:
+            task = work_queue.lease(worker, lease_seconds)
+            if task is None:
+                if idle_since is None:
+                    idle_since = time.monotonic()
+                if idle_timeout is None or time.monotonic() - idle_since >= idle_timeout:
+                    return counts
+                time.sleep(poll_interval)
+                continue
+            idle_since = None
+
+            stop_heartbeat = threading.Event()
+
+            def keep_leased(task_id=task["id"]):
+                while not stop_heartbeat.wait(lease_seconds / 3):
+                    if not work_queue.heartbeat(task_id, worker, lease_seconds):
+                        return  # Lost to another worker. Its writes are the same tables, so finishing is harmless.
+
+            heartbeat = threading.Thread(target=keep_leased, daemon=True)
+            heartbeat.start()
             try:
-                element = WebDriverWait(self.browser, _wait_time).until(
-                    EC.presence_of_element_located((By.XPATH, xpath))
+                results = _scrape_batch_task(
+                    task["ticker"], task["country"], task["page"], update, storage, cache_policy
                 )
-                # If the webdriver needs to scroll before clicking the element.
-                if scroll:
-                    self.browser.execute_script("arguments[0].click();", element)
-                element.click()
-            except TimeoutException:
-                print(f"[Failed Xpath] {xpath}")
-                if tag != "":
-                    print(f"[Tag]: {tag}")
-                raise NoSuchElementException("Element not found")
-        else:
-            element = self.browser.find_element("xpath", xpath)
-            if scroll:
-                self.browser.execute_script("arguments[0].click();", element)
-            element.click()
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
 
-    """----------------------------------- Page Scraping -----------------------------------"""
+            errors = [data for _, _, data in results if isinstance(data, ScrapeError)]
+            if errors:
+                work_queue.fail(task["id"], worker, str(errors[0]))
+                counts["failed"] += 1
+            else:
+                work_queue.complete(task["id"], worker)
+                counts["completed"] += 1
+    finally:
+        _close_batch_worker()
 
-    def _scrape_summary_page(self):
-        self._create_browser(self.base_url)
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[1]/div[2]/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[1]/div[2]/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[1]/div[2]/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
 
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+"""----------------------------------- Async Scraping -----------------------------------"""
 
-    def get_summary(self):
-        path = f"{self.ticker_folder}\\summary.csv"
-        try:
-            df = pd.read_csv(path).set_index("index")
-            return df
-        except FileNotFoundError:
-            df = self._scrape_summary_page()
-            df.to_csv(path)
-            return df
 
-    def update_summary(self):
-        path = f"{self.ticker_folder}\\summary.csv"
-        df = self._scrape_summary_page()
-        df.to_csv(path)
-        return df
+class AsyncRoicScraper:
+    """
+    Awaitable version of RoicScraper, so many scrapes can be awaited from one event loop.
 
-    """----------------------------------- Scrape Income Statement  -----------------------------------"""
+    With `http_first`, pages are fetched with an async HTTP client (httpx), so the pages in flight are
+    not bounded by threads. Browser page loads, table parsing and storage reads and writes are blocking,
+    and run on `executor`. Each awaited call gets a RoicScraper of its own, so concurrent calls never
+    share a browser.
+    """
 
-    def _scrape_income_statement(self):
-        self._create_browser(f"{self.base_url}/financials")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
+    def __init__(
+        self,
+        ticker: str,
+        country: str = "US",
+        debug: bool = False,
+        pool: DriverPool = None,
+        executor=None,
+        http_first: bool = False,
+        site_url: str = ROIC_URL,
+        storage=None,
+        data_export_path: str = None,
+    ) -> None:
+        """
+        :param pool: Shared sessions. Its size bounds how many pages are loading in the browser at once.
+        :param executor: Executor that runs the blocking calls. If None, the event loop's default executor is used.
+        :param http_first: See RoicScraper. Requires httpx.
+        :param storage: See RoicScraper.
+        :param data_export_path: Folder of the default CSV storage. See `get_setting`.
+        """
+        if storage is None:
+            storage = CsvStorage(get_setting("data_export_path", data_export_path))
+        self.http_first = http_first
+        self.executor = executor
+        self._scraper_args = dict(
+            ticker=ticker,
+            country=country,
+            debug=debug,
+            pool=pool,
+            http_first=http_first,
+            site_url=site_url,
+            storage=storage,
         )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+        self._http_client = None
+        self._http_client_loop = None
 
-    def get_income_statement(self, update: bool = False):
-        path = f"{self.ticker_folder}\\income_statement.csv"
+    def _new_scraper(self) -> RoicScraper:
+        return RoicScraper(**self._scraper_args)
 
-        if update:
-            df = self.update_income_statement()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_income_statement()
-                df.to_csv(path)
-                return df
+    async def _run_blocking(self, func, *args):
+        """
+        :param func: Blocking function.
+        :return: What `func` returns, computed on `executor`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
 
-    def update_income_statement(self):
-        path = f"{self.ticker_folder}\\income_statement.csv"
-        df = self._scrape_income_statement()
-        df.to_csv(path)
-        return df
+    def _get_http_client(self):
+        """
+        :return: (httpx.AsyncClient) Keep-alive client of the running event loop.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("AsyncRoicScraper with http_first requires httpx. Install it with `pip install httpx`.")
+        loop = asyncio.get_running_loop()
+        # A client is bound to the event loop it was first used on.
+        if self._http_client is None or self._http_client_loop is not loop:
+            self._http_client = httpx.AsyncClient(
+                headers=HTTP_HEADERS,
+                timeout=HTTP_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=32),
+            )
+            self._http_client_loop = loop
+        return self._http_client
 
-    """----------------------------------- Scrape Balance Sheet  -----------------------------------"""
+    async def _fetch_http_content(self, scraper: RoicScraper, page: str):
+        """
+        :param scraper: Scraper of the call, for the page URL and the metrics.
+        :param page: Page to fetch. One of the keys of PAGE_TABLES.
+        :return: (bytes) Body of the server response, or None if the request failed.
+        """
+        import httpx
 
-    def _scrape_balance_sheet(self):
-        self._create_browser(f"{self.base_url}/financials")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+        client = self._get_http_client()
+        try:
+            with scraper._timed("http_page_load", page):
+                response = await client.get(scraper._get_page_url(page))
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        return response.content
 
-    def get_balance_sheet(self, update: bool = False):
-        path = f"{self.ticker_folder}\\balance_sheet.csv"
-        if update:
-            df = self.update_balance_sheet()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_balance_sheet()
-                df.to_csv(path)
-                return df
+    @staticmethod
+    def _read_http_content(scraper: RoicScraper, content: bytes, page: str, tables: list):
+        return scraper._read_http_tables(lxml_html.document_fromstring(content), page, tables)
 
-    def update_balance_sheet(self):
-        path = f"{self.ticker_folder}\\balance_sheet.csv"
-        df = self._scrape_balance_sheet()
-        df.to_csv(path)
-        return df
+    async def scrape_page(self, page: str, tables: list = None) -> dict:
+        """
+        Load a page once and read every requested table from the same snapshot.
 
-    """----------------------------------- Scrape Cash Flow  -----------------------------------"""
+        :param page: Page to scrape. One of the keys of PAGE_TABLES.
+        :param tables: Names of the tables to read. If None, every table on the page is read.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        if tables is None:
+            tables = list(PAGE_TABLES[page].keys())
+        scraper = self._new_scraper()
+        if self.http_first:
+            content = await self._fetch_http_content(scraper, page)
+            if content is not None:
+                data = await self._run_blocking(self._read_http_content, scraper, content, page, tables)
+                if data is not None:
+                    return data
+        snapshot = await self._run_blocking(scraper._load_page_snapshot, page, tables)
+        return await self._run_blocking(scraper._read_snapshot_tables, snapshot, page, tables)
 
-    def _scrape_cash_flow(self):
-        self._create_browser(f"{self.base_url}/financials")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+    async def _get_page_tables(self, page: str, update: bool = False, tables: list = None) -> dict:
+        """
+        Read the tables of a page from storage, scraping the page at most once for any that are missing.
 
-    def get_cash_flow(self, update: bool = False):
-        path = f"{self.ticker_folder}\\cash_flow.csv"
-        if update:
-            df = self.update_cash_flow()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_cash_flow()
-                df.to_csv(path)
-                return df
+        :param page: Page to read. One of the keys of PAGE_TABLES.
+        :param update: If True, every table is scraped and saved again.
+        :param tables: Tables of the page to read. Defaults to all of them.
+        :return: (dict) Table name mapped to its DataFrame.
+        """
+        if tables is None:
+            tables = list(PAGE_TABLES[page])
+        scraper = self._new_scraper()
+        data = {} if update else await self._run_blocking(scraper._read_cached_tables, tables)
+        missing = [name for name in tables if name not in data]
+        if missing:
+            scraped = await self.scrape_page(page, missing)
+            await self._run_blocking(scraper._write_tables, scraped)
+            data.update(scraped)
+        return {name: data[name] for name in PAGE_TABLES[page] if name in data}
 
-    def update_cash_flow(self):
-        path = f"{self.ticker_folder}\\cash_flow.csv"
-        df = self._scrape_cash_flow()
-        df.to_csv(path)
-        return df
+    async def _get_table(self, table: str, update: bool = False) -> pd.DataFrame:
+        return (await self._get_page_tables(TABLE_PAGES[table], update, [table]))[table]
 
-    """----------------------------------- Scrape Profitability  -----------------------------------"""
+    async def get_summary(self):
+        return await self._get_table("summary")
 
-    def _scrape_profitability(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[1]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+    async def get_income_statement(self, update: bool = False):
+        return await self._get_table("income_statement", update)
 
-    def get_profitability(self, update: bool = False):
-        path = f"{self.ticker_folder}\\profitability.csv"
-        if update:
-            df = self.update_profitability()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_profitability()
-                df.to_csv(path)
-                return df
+    async def get_balance_sheet(self, update: bool = False):
+        return await self._get_table("balance_sheet", update)
 
-    def update_profitability(self):
-        path = f"{self.ticker_folder}\\profitability.csv"
-        df = self._scrape_profitability()
-        df.to_csv(path)
-        return df
+    async def get_cash_flow(self, update: bool = False):
+        return await self._get_table("cash_flow", update)
 
-    """----------------------------------- Scrape Credit  -----------------------------------"""
+    async def get_profitability(self, update: bool = False):
+        return await self._get_table("profitability", update)
 
-    def _scrape_credit(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[2]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+    async def get_credit(self, update: bool = False):
+        return await self._get_table("credit", update)
 
-    def get_credit(self, update: bool = False):
-        path = f"{self.ticker_folder}\\credit.csv"
-        if update:
-            df = self.update_credit()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_credit()
-                df.to_csv(path)
-                return df
+    async def get_liquidity(self, update: bool = False):
+        return await self._get_table("liquidity", update)
 
-    def update_credit(self):
-        path = f"{self.ticker_folder}\\credit.csv"
-        df = self._scrape_credit()
-        df.to_csv(path)
-        return df
+    async def get_working_capital(self, update: bool = False):
+        return await self._get_table("working_capital", update)
 
-    """----------------------------------- Scrape Liquidity  -----------------------------------"""
+    async def get_enterprise_value(self, update: bool = False):
+        return await self._get_table("enterprise_value", update)
 
-    def _scrape_liquidity(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[3]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+    async def get_multiples(self, update: bool = False):
+        return await self._get_table("multiples", update)
 
-    def get_liquidity(self, update: bool = False):
-        path = f"{self.ticker_folder}\\liquidity.csv"
-        if update:
-            df = self.update_liquidity()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_liquidity()
-                df.to_csv(path)
-                return df
+    async def get_per_share_data(self, update: bool = False):
+        return await self._get_table("per_share_data", update)
 
-    def update_liquidity(self):
-        path = f"{self.ticker_folder}\\liquidity.csv"
-        df = self._scrape_liquidity()
-        df.to_csv(path)
-        return df
+    async def get_all_financial_statements(self, update: bool = False) -> dict:
+        return await self._get_page_tables("financials", update)
 
-    """----------------------------------- Scrape Working Capital  -----------------------------------"""
+    async def get_all_ratios_data(self, update: bool = False) -> dict:
+        return await self._get_page_tables("ratios", update)
 
-    def _scrape_working_capital(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[4]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[4]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[4]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+    async def aclose(self) -> None:
+        """Close the HTTP client of the `http_first` path."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
-    def get_working_capital(self, update: bool = False):
-        path = f"{self.ticker_folder}\\working_capital.csv"
+    async def __aenter__(self):
+        return self
 
-        if update:
-            df = self.update_working_capital()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_working_capital()
-                df.to_csv(path)
-                return df
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
 
-    def update_working_capital(self):
-        path = f"{self.ticker_folder}\\working_capital.csv"
-        df = self._scrape_working_capital()
-        df.to_csv(path)
-        return df
 
-    """----------------------------------- Scrape Enterprise Value  -----------------------------------"""
+"""----------------------------------- Scrape Service -----------------------------------"""
 
-    def _scrape_enterprise_value(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[5]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[5]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[5]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+# Table name -> page it is scraped from.
+TABLE_PAGES = {name: page for page, tables in PAGE_TABLES.items() for name in tables}
 
-    def get_enterprise_value(self, update: bool = False):
-        path = f"{self.ticker_folder}\\enterprise_value.csv"
-        if update:
-            df = self.update_enterprise_value()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_enterprise_value()
-                df.to_csv(path)
-                return df
 
-    def update_enterprise_value(self):
-        path = f"{self.ticker_folder}\\enterprise_value.csv"
-        df = self._scrape_enterprise_value()
-        df.to_csv(path)
-        return df
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
 
-    """----------------------------------- Scrape Multiples  -----------------------------------"""
 
-    def _scrape_multiples(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[6]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[6]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[6]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that ask for a key already in flight wait for
+    that call and share its result, or its exception, instead of starting their own.
+    """
 
-    def get_multiples(self, update: bool = False):
-        path = f"{self.ticker_folder}\\multiples.csv"
-        if update:
-            df = self.update_multiples()
-            return df
-        else:
-            try:
-                df = pd.read_csv(path).set_index("index")
-                return df
-            except FileNotFoundError:
-                df = self._scrape_multiples()
-                df.to_csv(path)
-                return df
+    def __init__(self) -> None:
+        self._flights = {}
+        self._lock = threading.Lock()
 
-    def update_multiples(self):
-        path = f"{self.ticker_folder}\\multiples.csv"
-        df = self._scrape_multiples()
-        df.to_csv(path)
-        return df
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
 
-    """----------------------------------- Scrape Per Share Data-----------------------------------"""
+    def do(self, key, func):
+        """
+        :param key: Identifies the work, e.g. (ticker, country, page).
+        :param func: Called without arguments if no call for `key` is in flight.
+        :return: (tuple) (result, shared). `shared` is True if the result came from another caller's call.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
 
-    def _scrape_per_share_data(self):
-        self._create_browser(f"{self.base_url}/ratios")
-        row_index = 1
-        col_index = 3
-        row_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[7]/div/div/div/table/tbody/tr[{}]/td[1]/div/div[2]/span"
-        col_label_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[7]/div/div/div/table/thead/tr/th[{}]/div/span"
-        data_xpath = "/html/body/div[1]/div/div[2]/div[3]/div[7]/div/div/div/table/tbody/tr[{}]/td[{}]/div/span"
-        labels = self._get_table_labels(
-            row_label_xpath, col_label_xpath, row_index, col_index
-        )
-        df = self._get_table_data(data_xpath, row_index, col_index, labels)
-        self._clean_close()
-        return df
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
 
-    def get_per_share_data(self, update: bool = False):
-        path = f"{self.ticker_folder}\\per_share_data.csv"
-        if update:
-            df = self.update_per_share_data()
-            return df
-        else:
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class ScrapeService:
+    """
+    Serves tables from the fastest tier that has them: the memory cache, then storage, then a scrape.
+
+    Concurrent requests for tables of the same (ticker, country, page) share one scrape, and updates
+    only share with updates, so the browser load follows the number of distinct pages missing, not the
+    number of callers. At most `max_scrapes` pages are scraped at once. Use `serve` to expose it over HTTP.
+    """
+
+    def __init__(
+        self,
+        storage=None,
+        data_export_path: str = None,
+        max_scrapes: int = 2,
+        pool: DriverPool = None,
+        http_first: bool = False,
+        site_url: str = ROIC_URL,
+        cache_policy: CachePolicy = None,
+        memory_cache: TableCache = table_cache,
+        metrics: MetricsRegistry = metrics,
+    ) -> None:
+        """
+        :param storage: Where tables are cached. Defaults to CSV files in the 'data_export_path'.
+        :param data_export_path: See `get_setting`.
+        :param max_scrapes: Pages scraped at the same time.
+        :param pool: Shared browser sessions. If None, each scrape starts its own browser.
+        :param http_first: See RoicScraper.
+        :param site_url: See RoicScraper.
+        :param cache_policy: Decides when a cached table is scraped again.
+        :param memory_cache: First tier. None to go straight to storage.
+        :param metrics: Registry that requests per tier and coalesced requests are counted in.
+        """
+        if storage is None:
+            storage = CsvStorage(get_setting("data_export_path", data_export_path))
+        self.storage = storage
+        self.pool = pool
+        self.http_first = http_first
+        self.site_url = site_url
+        self.cache_policy = cache_policy
+        self.memory_cache = memory_cache
+        self.metrics = metrics
+        self._scrape_slots = threading.BoundedSemaphore(max_scrapes)
+        self._flights = SingleFlight()
 
+    def in_flight(self) -> int:
+        """
+        :return: (int) Pages being scraped right now.
+        """
+        return len(self._flights)
+
+    def get_table(self, ticker: str, table: str, country: str = "US", update: bool = False) -> tuple:
+        """
+        :param ticker: Ticker, in any case.
+        :param table: Table name, e.g. 'income_statement'.
+        :param country: Country code of the ticker.
+        :param update: If True, the cached copy is skipped and the page is scraped again.
+        :return: (tuple) (DataFrame, tier), where tier is 'memory', 'disk' or 'scrape'.
+        """
+        page = TABLE_PAGES[table]
+        ticker, country = ticker.upper(), country.upper()
+        if not update:
+            reader = RoicReader(
+                ticker,
+                country,
+                storage=self.storage,
+                cache_policy=self.cache_policy,
+                memory_cache=self.memory_cache,
+            )
+            in_memory = self.memory_cache is not None and (ticker, country, table) in self.memory_cache
             try:
-                df = pd.read_csv(path).set_index("index")
-                return df
+                df = reader._read_table(table)
+                tier = "memory" if in_memory else "disk"
+                self.metrics.count("service_requests_total", tier=tier, table=table)
+                return df, tier
             except FileNotFoundError:
-                df = self._scrape_per_share_data()
-                df.to_csv(path)
-                return df
+                pass  # Missing or stale.
 
-    def update_per_share_data(self):
-        path = f"{self.ticker_folder}\\per_share_data.csv"
-        df = self._scrape_per_share_data()
-        df.to_csv(path)
-        return df
+        # An update never joins a scrape that may serve the cached copy, so it leads a flight of its own.
+        data, shared = self._flights.do(
+            (ticker, country, page, update), functools.partial(self._scrape_page, ticker, country, page, update)
+        )
+        if shared:
+            self.metrics.count("service_coalesced_total", table=table)
+        self.metrics.count("service_requests_total", tier="scrape", table=table)
+        return data[table].copy(), "scrape"
 
-    """----------------------------------- Financial Statements Page -----------------------------------"""
+    def _scrape_page(self, ticker: str, country: str, page: str, update: bool) -> dict:
+        with self._scrape_slots:
+            scraper = RoicScraper(
+                ticker,
+                country,
+                pool=self.pool,
+                http_first=self.http_first,
+                site_url=self.site_url,
+                storage=self.storage,
+                cache_policy=self.cache_policy,
+                memory_cache=self.memory_cache,
+                metrics=self.metrics,
+            )
+            data = scraper._get_page_tables(page, update)
+        if self.memory_cache is not None:
+            # Tables read from storage are already in memory. Scraped ones were dropped when they were
+            # written, so they go back in with the scrape time just recorded for them.
+            for name, df in data.items():
+                key = (ticker, country, name)
+                if key not in self.memory_cache:
+                    self.memory_cache.put(key, df, self.storage.read_scrape_time(ticker, name))
+        return data
 
-    def get_all_financial_statements(self, update: bool = False) -> dict:
 
-        if update:
-            income_statement = self.update_income_statement()
-            balance_sheet = self.update_balance_sheet()
-            cash_flow = self.update_cash_flow()
-        else:
-            income_statement = self.get_income_statement()
-            balance_sheet = self.get_balance_sheet()
-            cash_flow = self.get_cash_flow()
+class _ServiceHandler(BaseHTTPRequestHandler):
+    service = None  # Set by `serve`.
 
-        return {
-            "income_statement": income_statement,
-            "balance_sheet": balance_sheet,
-            "cash_flow": cash_flow,
-        }
+    def _send(self, status: int, body: str, tier: str = None, content_type: str = "application/json") -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if tier is not None:
+            self.send_header("X-Roic-Tier", tier)
+        self.end_headers()
+        self.wfile.write(data)
 
-    """----------------------------------- Ratios Page -----------------------------------"""
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = parse_qs(url.query)
+        if parts == ["health"]:
+            self._send(200, json.dumps({"status": "ok", "in_flight": self.service.in_flight()}))
+            return
+        if parts == ["metrics"]:
+            self._send(200, self.service.metrics.to_prometheus(), content_type="text/plain; version=0.0.4")
+            return
+        if len(parts) != 3 or parts[0] != "tables" or parts[2] not in TABLE_PAGES:
+            self._send(404, json.dumps({"error": f"Unknown path: {url.path}"}))
+            return
 
-    def get_all_ratios_data(self, update: bool = False) -> dict:
-        profitability = self.get_profitability(update)
-        credit = self.get_credit(update)
-        liquidity = self.get_liquidity(update)
-        working_capital = self.get_working_capital(update)
-        enterprise_value = self.get_enterprise_value(update)
-        multiples = self.get_multiples(update)
-        per_share_data = self.get_per_share_data(update)
+        ticker, table = parts[1], parts[2]
+        country = query.get("country", ["US"])[0]
+        update = query.get("update", ["0"])[0].lower() in ("1", "true")
+        try:
+            df, tier = self.service.get_table(ticker, table, country, update)
+        except Exception as e:
+            error = ScrapeError(ticker.upper(), TABLE_PAGES[table], f"{type(e).__name__}: {str(e).strip()}")
+            self._send(502, json.dumps({"error": str(error)}))
+            return
+        self._send(200, df.to_json(orient="split"), tier)
 
-        return {
-            "profitability": profitability,
-            "credit": credit,
-            "liquidity": liquidity,
-            "working_capital": working_capital,
-            "enterprise_value": enterprise_value,
-            "multiples": multiples,
-            "per_share_data": per_share_data,
-        }
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else "unix"
 
-    """----------------------------------- Scraping Utilities -----------------------------------"""
+    def log_message(self, *args) -> None:
+        pass  # Requests are counted in the metrics registry instead.
 
-    def _get_table_data(
-        self, data_xpath: str, row_index: int, col_index: int, labels: dict
-    ) -> pd.DataFrame:
-
-        row_labels = labels["rows"]
-        col_labels = labels["cols"]
-
-        _start_col_index = col_index
-
-        df = pd.DataFrame(columns=col_labels).set_index("index")
-        for row in row_labels:
-            for col in col_labels[1:]:  # Skip the 'index' element.
-                xpath = data_xpath.format(row_index, col_index)
-                data = self._read_data(xpath)
-                if "," in data:
-                    data = data.replace(",", "")
-                if "%" in row:
-                    data = float(data) / 100
-                df.loc[row, col] = data
-                col_index += 1
-            col_index = _start_col_index
-            row_index += 1
-
-        df.replace("- -", np.nan, inplace=True)
-        return df
 
-    def _get_table_labels(
-        self, row_xpath: str, col_xpath: str, row_index: int, col_index: int
-    ):
-
-        # Scrape the row labels.
-        row_scraping = True
-        rows = []
-        while row_scraping:
-            row_data = self._read_data(row_xpath.format(row_index))
-            if row_data != "N\\A":
-                if "," in row_data:
-                    row_data = row_data.replace(",", "")
-                if "+" in row_data:
-                    row_data = row_data.replace("+", "")
-                if "-" in row_data:
-                    row_data = row_data.replace("-", "")
-                if row_data[0] == " ":
-                    row_data = row_data[1:]  # Skip the empty space
-                rows.append(row_data)
-            else:
-                row_scraping = False
-            row_index += 1
-
-        # Scrape the column labels
-        col_scraping = True
-        cols = ["index"]
-        while col_scraping:
-            col_data = self._read_data(col_xpath.format(col_index))
-            if col_data != "N\\A":
-                col_data = col_data.split(" ")[0]
-                cols.append(col_data)
-            else:
-                col_scraping = False
-            col_index += 1
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
 
-        return {
-            "rows": rows,
-            "cols": cols,
-        }
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
 
-    """----------------------------------- Metric Calculations -----------------------------------"""
 
-    def calc_growth(self, values: pd.Series) -> pd.Series:
+def serve(
+    service: ScrapeService,
+    host: str = "127.0.0.1",
+    port: int = 8750,
+    unix_socket: str = None,
+):
+    """
+    Start an HTTP API for the service on a background thread.
 
-        value_type = type(values.iloc[0])
-        print(f"Values: {values}   {value_type}")
+        GET /tables/{TICKER}/{table}?country=US&update=0  -> the table as JSON (pandas 'split' orient),
+                                                             with the tier in the X-Roic-Tier header
+        GET /health                                       -> {"status": "ok", "in_flight": ...}
+        GET /metrics                                      -> the metrics registry in Prometheus format
 
-        if value_type == np.float64:
-            change = values.pct_change()
-            return change
-        else:
-            print(f"EDGE CASE: {value_type}")
+    :param service: Service answering the requests.
+    :param host: Interface to listen on. Keep it local, the API has no authentication.
+    :param port: Port to listen on. 0 picks a free one.
+    :param unix_socket: If set, listen on this Unix socket path instead of host and port.
+    :return: The server. Call `shutdown` then `server_close` to stop it.
+    """
+    handler = type("ServiceHandler", (_ServiceHandler,), {"service": service})
+    if unix_socket is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not supported on this platform.")
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(unix_socket)  # Left behind by a previous run.
+        server = _UnixHTTPServer(unix_socket, handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
 
 
 if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["serve"]:
+        # python roic_scraper.py serve [--port 8750] [--unix-socket PATH] [--max-scrapes 2]
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Serve cached and scraped tables over HTTP.")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8750)
+        parser.add_argument("--unix-socket", help="Listen on a Unix socket instead of host and port.")
+        parser.add_argument("--max-scrapes", type=int, default=2, help="Pages scraped at the same time.")
+        parser.add_argument("--http-first", action="store_true")
+        args = parser.parse_args(sys.argv[2:])
+
+        server = serve(
+            ScrapeService(max_scrapes=args.max_scrapes, http_first=args.http_first),
+            args.host,
+            args.port,
+            args.unix_socket,
+        )
+        print(f"Serving on {args.unix_socket or f'http://{args.host}:{server.server_port}'}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+            server.server_close()
+    elif sys.argv[1:2] == ["work"]:
+        # python roic_scraper.py work (--sqlite PATH | --redis URL) [--processes 1]
+        import argparse
 
-    roic = RoicScraper("AAPL")
-    df = roic.get_cash_flow()
-    print(f"DF: {df}")
+        parser = argparse.ArgumentParser(description="Scrape tasks from a work queue until it is empty.")
+        backend = parser.add_mutually_exclusive_group(required=True)
+        backend.add_argument("--sqlite", help="SQLite queue file.")
+        backend.add_argument("--redis", help="Redis URL, e.g. redis://host:6379/0. Requires `redis`.")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes on this machine.")
+        parser.add_argument("--idle-timeout", type=float, default=60, help="Seconds to wait for new tasks.")
+        args = parser.parse_args(sys.argv[2:])
+
+        if args.sqlite:
+            work_queue = SqliteQueue(args.sqlite)
+        else:
+            work_queue = RedisQueue.from_url(args.redis)
+        workers = [
+            multiprocessing.Process(
+                target=run_queue_worker, args=(work_queue,), kwargs={"idle_timeout": args.idle_timeout}
+            )
+            for _ in range(args.processes)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+        print(work_queue.get_summary())
+    else:
+        roic = RoicScraper("AAPL")
+        df = roic.get_cash_flow()
+        print(f"DF: {df}")
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from roic_scraper import PAGE_TABLES, CsvStorage  # noqa: E402
+from bench import SYNTHETIC_PAGES_FOLDER, StubServer  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def pages() -> dict:
+    """Synthetic HTML of every page in PAGE_TABLES, not recorded from the live site."""
+    pages = {}
+    for page in PAGE_TABLES:
+        with open(os.path.join(SYNTHETIC_PAGES_FOLDER, f"{page}.html"), "rb") as file:
+            pages[page] = file.read()
+    return pages
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def storage(tmp_path) -> CsvStorage:
+    return CsvStorage(str(tmp_path / "data"), durable=False)
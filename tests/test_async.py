@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import roic_scraper
+
+from roic_scraper import (
+    PAGE_TABLES,
+    AsyncRoicScraper,
+    RoicScraper,
+    lxml_html,
+    parse_table,
+)
+
+
+def _no_browser(self, page, tables=None):
+    raise AssertionError("The browser must not be used.")
+
+
+def test_async_scrapes_share_nothing_but_the_storage(stub_server, storage, pages, monkeypatch):
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    roic = AsyncRoicScraper("AAPL", http_first=True, site_url=stub_server.url, storage=storage)
+
+    async def scrape_all():
+        return await asyncio.gather(*[roic.scrape_page(page) for page in PAGE_TABLES])
+
+    for page, data in zip(PAGE_TABLES, asyncio.run(scrape_all())):
+        for name, df in data.items():
+            pd.testing.assert_frame_equal(df, parse_table(pages[page], PAGE_TABLES[page][name]))
+
+
+def test_async_calls_get_a_scraper_each(storage, pages, monkeypatch):
+    scrapers = []
+
+    def load_page_snapshot(self, page, tables=None):
+        scrapers.append(self)
+        time.sleep(0.05)
+        return lxml_html.document_fromstring(pages[page])
+
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", load_page_snapshot)
+    roic = AsyncRoicScraper("AAPL", storage=storage)
+
+    async def scrape_all():
+        return await asyncio.gather(*[roic.scrape_page("financials") for _ in range(3)])
+
+    asyncio.run(scrape_all())
+    assert len({id(scraper) for scraper in scrapers}) == 3
+
+
+def test_async_http_path_fetches_without_threads_and_parses_on_the_executor(stub_server, storage, pages, monkeypatch):
+    pytest.importorskip("httpx")
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+
+    def no_blocking_session():
+        raise AssertionError("The blocking HTTP session must not be used.")
+
+    monkeypatch.setattr(roic_scraper, "get_http_session", no_blocking_session)
+    parse_threads = []
+    read_http_tables = RoicScraper._read_http_tables
+
+    def record_thread(self, snapshot, page, tables):
+        parse_threads.append(threading.get_ident())
+        return read_http_tables(self, snapshot, page, tables)
+
+    monkeypatch.setattr(RoicScraper, "_read_http_tables", record_thread)
+
+    async def scrape_all():
+        async with AsyncRoicScraper(
+            "AAPL", http_first=True, site_url=stub_server.url, storage=storage
+        ) as roic:
+            return await asyncio.gather(*[roic.scrape_page(page) for page in PAGE_TABLES])
+
+    for page, data in zip(PAGE_TABLES, asyncio.run(scrape_all())):
+        for name, df in data.items():
+            pd.testing.assert_frame_equal(df, parse_table(pages[page], PAGE_TABLES[page][name]))
+    assert len(parse_threads) == len(PAGE_TABLES)
+    assert threading.get_ident() not in parse_threads
+
+
+def test_async_getters_read_and_write_the_storage(stub_server, storage, pages, monkeypatch):
+    pytest.importorskip("httpx")
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    roic = AsyncRoicScraper("AAPL", http_first=True, site_url=stub_server.url, storage=storage)
+
+    expected = parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"])
+    pd.testing.assert_frame_equal(asyncio.run(roic.get_income_statement()), expected)
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), expected)
+
+    cached = AsyncRoicScraper("AAPL", http_first=True, site_url="http://unreachable.invalid", storage=storage)
+    pd.testing.assert_frame_equal(asyncio.run(cached.get_income_statement()), expected)
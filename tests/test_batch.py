@@ -0,0 +1,66 @@
+import multiprocessing
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from roic_scraper import PAGE_TABLES, ScrapeError, _RateLimiter, parse_table, scrape_batch
+
+
+@pytest.fixture
+def no_chromedriver(tmp_path, monkeypatch):
+    """Worker processes that need a browser fail, as no chromedriver is configured."""
+    monkeypatch.delenv("ROIC_SCRAPER_CHROMEDRIVER", raising=False)
+    monkeypatch.setenv("ROIC_SCRAPER_CONFIG", str(tmp_path / "missing.json"))
+
+
+def _cache_page(storage, pages, ticker: str, page: str) -> dict:
+    tables = {name: parse_table(pages[page], table_xpath) for name, table_xpath in PAGE_TABLES[page].items()}
+    for name, df in tables.items():
+        storage.write(ticker, name, df)
+    return tables
+
+
+def test_cached_pages_are_yielded_without_a_browser(storage, pages, no_chromedriver):
+    expected = {}
+    for ticker in ["AAPL", "MSFT", "GOOG"]:
+        for page in ["summary", "financials"]:
+            for name, df in _cache_page(storage, pages, ticker, page).items():
+                expected[(ticker, name)] = df
+
+    results = list(scrape_batch(["aapl", "msft", "goog"], ["summary", "financials"], max_workers=2, storage=storage))
+    assert sorted((ticker, name) for ticker, name, _ in results) == sorted(expected)
+    for ticker, name, df in results:
+        pd.testing.assert_frame_equal(df, expected[(ticker, name)])
+
+
+def test_failed_page_yields_an_error_per_table(storage, pages, no_chromedriver):
+    _cache_page(storage, pages, "AAPL", "summary")
+    results = list(scrape_batch(["AAPL", "MSFT"], ["summary"], max_workers=2, storage=storage))
+
+    by_ticker = {ticker: [(name, data) for t, name, data in results if t == ticker] for ticker in ["AAPL", "MSFT"]}
+    assert all(isinstance(data, pd.DataFrame) for _, data in by_ticker["AAPL"])
+    assert [name for name, _ in by_ticker["MSFT"]] == list(PAGE_TABLES["summary"])
+    for _, error in by_ticker["MSFT"]:
+        assert isinstance(error, ScrapeError)
+        assert (error.ticker, error.page) == ("MSFT", "summary")
+
+
+def test_rate_limiter_spaces_requests_across_threads():
+    limiter = _RateLimiter(50, threading.Lock(), multiprocessing.Value("d", 0.0))
+    times = []
+
+    def request() -> None:
+        limiter.wait()
+        times.append(time.time())
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.time() - start >= 5 / 50 - 0.01
+    times.sort()
+    assert min(b - a for a, b in zip(times, times[1:])) >= 1 / 50 - 0.005
@@ -0,0 +1,82 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from roic_scraper import DAY, CachePolicy
+
+
+def _at(date: str) -> float:
+    return datetime.datetime.fromisoformat(date).timestamp()
+
+
+def _table(years) -> pd.DataFrame:
+    return pd.DataFrame([[1.0] * len(years)], index=["Revenue"], columns=[str(year) for year in years])
+
+
+FY_2025 = _table(range(2023, 2026))
+
+
+@pytest.mark.parametrize("now", ["2026-03-01", "2026-12-31", "2027-01-30"])
+def test_december_year_end_waits_for_the_next_fiscal_year(now):
+    # FY 2026 ends with December 2026 and is reported after the filing lag.
+    policy = CachePolicy()
+    assert not policy.is_new_period_expected(FY_2025, _at(now))
+    assert policy.is_fresh("income_statement", FY_2025, _at(now) - 30 * DAY, _at(now))
+
+
+def test_filing_tables_go_stale_once_the_next_fiscal_year_can_be_filed():
+    policy = CachePolicy()
+    now = _at("2027-02-01")
+    assert policy.is_new_period_expected(FY_2025, now)
+    assert not policy.is_fresh("income_statement", FY_2025, now - 8 * DAY, now)
+    assert policy.is_fresh("income_statement", FY_2025, now - 1 * DAY, now)
+
+
+@pytest.mark.parametrize(
+    "ticker, month, before, after",
+    [
+        ("AAPL", 9, "2026-10-30", "2026-10-31"),  # FY 2026 ends in September 2026.
+        ("MSFT", 6, "2026-07-30", "2026-07-31"),  # FY 2026 ends in June 2026.
+    ],
+)
+def test_fiscal_year_end_month_of_the_ticker(ticker, month, before, after):
+    policy = CachePolicy(fiscal_year_end_months={ticker.lower(): month})
+    assert not policy.is_new_period_expected(FY_2025, _at(before), ticker)
+    assert policy.is_new_period_expected(FY_2025, _at(after), ticker)
+    assert not policy.is_fresh("income_statement", FY_2025, None, _at(after), ticker)
+    # Other tickers keep the default December year end.
+    assert not policy.is_new_period_expected(FY_2025, _at(after), "GOOG")
+
+
+def test_filing_lag_delays_the_expected_filing():
+    policy = CachePolicy(fiscal_year_end_month=9, filing_lag=90 * DAY)
+    assert not policy.is_new_period_expected(FY_2025, _at("2026-12-29"))
+    assert policy.is_new_period_expected(FY_2025, _at("2026-12-30"))
+
+
+def test_table_without_years_expects_a_new_period():
+    assert CachePolicy().is_new_period_expected(pd.DataFrame({"index": ["Revenue"]}), _at("2026-01-01"))
+
+
+def test_market_tables_only_follow_their_ttl():
+    policy = CachePolicy()
+    now = _at("2026-10-17")
+    assert policy.is_fresh("multiples", FY_2025, now - DAY / 2, now)
+    assert not policy.is_fresh("multiples", FY_2025, now - 2 * DAY, now)
+
+
+def test_ttls_override_the_defaults():
+    policy = CachePolicy(ttls={"summary": 10 * DAY, "income_statement": DAY}, wait_for_new_period=False)
+    now = _at("2026-10-17")
+    assert policy.get_ttl("summary") == 10 * DAY
+    assert policy.is_fresh("summary", FY_2025, now - 5 * DAY, now)
+    assert not policy.is_fresh("income_statement", FY_2025, now - 2 * DAY, now)
+    assert policy.get_ttl("balance_sheet") == policy.default_ttl
+
+
+def test_unknown_scrape_time_is_only_fresh_between_filings():
+    now = _at("2026-10-17")
+    assert CachePolicy().is_fresh("income_statement", FY_2025, None, now)
+    assert not CachePolicy(wait_for_new_period=False).is_fresh("income_statement", FY_2025, None, now)
+    assert not CachePolicy().is_fresh("summary", FY_2025, None, now)
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import ChangeTracker, CsvStorage, ParquetStorage, RoicScraper
+
+def _table(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(scale=1e5, size=(4, 3)),
+        index=["Revenue", "Gross Profit", "Net Income", "Gross Margin (%)"],
+        columns=["2022", "2023", "2024"],
+    )
+    df.iloc[1, 0] = np.nan
+    df.index.name = "index"
+    return df
+
+
+def test_unchanged_table_is_not_rewritten(storage):
+    scraper = RoicScraper("AAPL", storage=storage, changes=ChangeTracker(), memory_cache=None)
+    scraper._write_table("income_statement", _table())
+    assert len(scraper.changes.get_changelog()) == _table().count().sum()  # Every cell of a new table.
+    scraper.changes.new_run()
+    mtime = os.stat(storage._get_path("AAPL", "income_statement")).st_mtime_ns
+
+    scraper._write_table("income_statement", _table())
+    assert os.stat(storage._get_path("AAPL", "income_statement")).st_mtime_ns == mtime
+    assert scraper.changes.get_changelog().empty
+
+    changed = _table()
+    changed.loc["Revenue", "2024"] += 1
+    scraper._write_table("income_statement", changed)
+    changelog = scraper.changes.get_changelog()
+    assert changelog[["metric", "year"]].values.tolist() == [["Revenue", "2024"]]
+
+
+def test_failed_write_is_retried(storage, monkeypatch):
+    scraper = RoicScraper("AAPL", storage=storage, changes=ChangeTracker(), memory_cache=None)
+
+    def write_fails(ticker, table, df):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "write", write_fails)
+    with pytest.raises(OSError):
+        scraper._write_table("income_statement", _table())
+    assert scraper.changes.get_changelog().empty
+
+    monkeypatch.undo()
+    scraper._write_table("income_statement", _table())
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table())
+
+
+@pytest.mark.parametrize("kind", ["csv", "parquet"])
+def test_known_table_is_rewritten_once_deleted(tmp_path, kind):
+    if kind == "parquet":
+        pytest.importorskip("pyarrow")
+        storage = ParquetStorage(str(tmp_path / "data"), durable=False)
+    else:
+        storage = CsvStorage(str(tmp_path / "data"), durable=False)
+    path = str(tmp_path / "fingerprints.json")
+    changes = ChangeTracker(path)
+    RoicScraper("AAPL", storage=storage, changes=changes, memory_cache=None)._write_table("income_statement", _table())
+    changes.save()
+    if kind == "parquet":
+        storage.compact("income_statement")
+        assert storage.exists("AAPL", "income_statement")
+        os.remove(storage._get_compacted_path("income_statement"))
+    else:
+        os.remove(storage._get_path("AAPL", "income_statement"))
+    assert not storage.exists("AAPL", "income_statement")
+
+    scraper = RoicScraper("AAPL", storage=storage, changes=ChangeTracker(path), memory_cache=None)
+    scraper._write_table("income_statement", _table())
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table(), check_names=False)
@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import (
+    CsvStorage,
+    StorageWriter,
+    write_files_atomic,
+)
+
+def _table(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(scale=1e5, size=(4, 3)),
+        index=["Revenue", "Gross Profit", "Net Income", "Gross Margin (%)"],
+        columns=["2022", "2023", "2024"],
+    )
+    df.iloc[1, 0] = np.nan
+    df.index.name = "index"
+    return df
+
+
+def test_csv_round_trip_is_exact(storage):
+    df = _table()
+    storage.write("AAPL", "income_statement", df)
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), df)
+
+
+def test_csv_missing_table_raises(storage):
+    with pytest.raises(FileNotFoundError):
+        storage.read("AAPL", "income_statement")
+    assert storage.read_scrape_time("AAPL", "income_statement") is None
+
+
+def test_csv_reads_the_flat_legacy_layout(tmp_path):
+    root = str(tmp_path / "data")
+    legacy = CsvStorage(root, shard_levels=0, durable=False)
+    legacy.write("AAPL", "income_statement", _table())
+    with open(os.path.join(root, "AAPL", "scrape_log.json"), "w") as file:
+        json.dump({"income_statement": 123.0}, file)
+
+    storage = CsvStorage(root, durable=False)
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table())
+    assert storage.read_scrape_time("AAPL", "income_statement") == 123.0
+
+    storage.write_scrape_time("AAPL", "income_statement", 456.0)
+    assert storage.read_scrape_time("AAPL", "income_statement") == 456.0
+
+
+def test_csv_tables_are_stored_under_the_root(tmp_path):
+    root = tmp_path / "data"
+    storage = CsvStorage(str(root), shard_levels=2, durable=False)
+    storage.write("AAPL", "income_statement", _table())
+    storage.write_scrape_time("AAPL", "income_statement", 123.0)
+    assert os.listdir(tmp_path) == ["data"]
+    folder = os.path.dirname(storage._get_path("AAPL", "income_statement"))
+    assert os.path.relpath(folder, root).split(os.sep)[-1] == "AAPL"
+    assert sorted(os.listdir(folder)) == ["income_statement.csv", "income_statement.scraped.json"]
+
+
+@pytest.mark.skipif(os.sep == "\\", reason="Backslashes separate folders on Windows.")
+def test_csv_reads_tables_written_with_backslash_paths(tmp_path):
+    root = str(tmp_path / "data")
+    _table().to_csv(f"{root}\\AAPL\\income_statement.csv")
+    with open(f"{root}\\AAPL\\scrape_log.json", "w") as file:
+        json.dump({"income_statement": 123.0}, file)
+
+    storage = CsvStorage(root, durable=False)
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table())
+    assert storage.read_scrape_time("AAPL", "income_statement") == 123.0
+
+
+def test_failed_atomic_write_keeps_the_old_files(tmp_path):
+    good, bad = str(tmp_path / "good.txt"), str(tmp_path / "bad.txt")
+    for path in (good, bad):
+        with open(path, "w") as file:
+            file.write("old")
+
+    def write_new(temp_path):
+        with open(temp_path, "w") as file:
+            file.write("new")
+
+    def write_fails(temp_path):
+        with open(temp_path, "w") as file:
+            file.write("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_files_atomic([(str(tmp_path), good, write_new), (str(tmp_path), bad, write_fails)])
+    for path in (good, bad):
+        with open(path) as file:
+            assert file.read() == "old"
+    assert sorted(os.listdir(tmp_path)) == ["bad.txt", "good.txt"]
+
+
+def test_storage_writer_flushes_in_batches(storage):
+    with StorageWriter(storage, batch_size=2) as writer:
+        writer.write("AAPL", "summary", _table(1))
+        writer.write_scrape_time("AAPL", "summary", 42.0)
+        # Buffered writes are already visible through the writer.
+        pd.testing.assert_frame_equal(writer.read("AAPL", "summary"), _table(1))
+        assert writer.read_scrape_time("AAPL", "summary") == 42.0
+    pd.testing.assert_frame_equal(storage.read("AAPL", "summary"), _table(1))
+    assert storage.read_scrape_time("AAPL", "summary") == 42.0
+
+
+def test_write_many_writes_tables_and_scrape_times(storage):
+    tables = {(ticker, table): _table(i) for i, (ticker, table) in enumerate([("AAPL", "summary"), ("MSFT", "summary")])}
+    storage.write_many(tables, {key: 100.0 + i for i, key in enumerate(tables)})
+    for i, ((ticker, table), df) in enumerate(tables.items()):
+        pd.testing.assert_frame_equal(storage.read(ticker, table), df)
+        assert storage.read_scrape_time(ticker, table) == 100.0 + i
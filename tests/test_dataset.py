@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import ConsolidatedDataset
+
+
+def _table(metrics: list, years: list, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(len(metrics), len(years))), index=metrics, columns=[str(y) for y in years])
+    df.index.name = "index"
+    return df
+
+
+def _expected_screen(tables: dict, table: str, metric: str) -> pd.DataFrame:
+    rows = [
+        (ticker, int(year), value)
+        for (ticker, name), df in tables.items()
+        if name == table and metric in df.index
+        for year, value in df.loc[metric].items()
+        if not np.isnan(value)
+    ]
+    return pd.DataFrame(rows, columns=["ticker", "year", "value"]).pivot(index="ticker", columns="year", values="value")
+
+
+def test_screen_matches_the_tables_added_in_any_order():
+    rng = np.random.default_rng(0)
+    tables = {}
+    dataset = ConsolidatedDataset()
+    for step in range(200):
+        ticker, table = f"T{rng.integers(15)}", str(rng.choice(["income_statement", "balance_sheet"]))
+        metrics = [f"M{i}" for i in rng.choice(8, size=rng.integers(2, 6), replace=False)]
+        years = sorted(rng.choice(range(2000, 2025), size=rng.integers(1, 6), replace=False))
+        df = _table(metrics, years, step)
+        df.iloc[0, 0] = np.nan
+        tables[(ticker, table)] = df
+        dataset.add(ticker, table, df)
+        if step % 50 == 49:
+            for metric in [f"M{i}" for i in range(8)]:
+                expected = _expected_screen(tables, "income_statement", metric)
+                if expected.empty:
+                    continue
+                pd.testing.assert_frame_equal(
+                    dataset.screen(metric, table="income_statement"),
+                    expected,
+                    check_names=False,
+                    check_column_type=False,
+                )
+
+
+def test_replaced_table_drops_its_old_rows():
+    dataset = ConsolidatedDataset()
+    dataset.add("AAPL", "income_statement", _table(["Revenue", "Gross Profit"], [2022, 2023], 0))
+    dataset.add("MSFT", "income_statement", _table(["Revenue"], [2023], 1))
+    dataset.screen("Revenue")
+
+    new = _table(["Revenue"], [2024], 2)
+    dataset.add("AAPL", "income_statement", new)
+    revenue = dataset.screen("Revenue")
+    assert list(revenue.index) == ["AAPL", "MSFT"]
+    assert revenue.loc["AAPL", 2024] == new.loc["Revenue", "2024"]
+    assert np.isnan(revenue.loc["AAPL", 2023])
+    with pytest.raises(KeyError):
+        dataset.screen("Gross Profit")
+
+
+def test_screen_filters_years_and_finds_the_table():
+    dataset = ConsolidatedDataset()
+    dataset.add("AAPL", "profitability", _table(["Gross Margin (%)"], [2021, 2022, 2023], 0))
+    margins = dataset.screen("Gross Margin (%)", years=[2022, 2023])
+    assert list(margins.columns) == [2022, 2023]
+    with pytest.raises(KeyError):
+        dataset.screen("Gross Margin (%)", table="income_statement")
+
+
+def test_get_and_save_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "dataset.parquet")
+    dataset = ConsolidatedDataset(path)
+    df = _table(["Revenue", "Net Income"], [2022, 2023], 0)
+    dataset.add("AAPL", "income_statement", df)
+    dataset.add("MSFT", "income_statement", _table(["Revenue"], [2023], 1))
+    dataset.save()
+
+    loaded = ConsolidatedDataset(path)
+    pd.testing.assert_frame_equal(loaded.get("AAPL", "income_statement"), df, check_like=True)
+    pd.testing.assert_frame_equal(loaded.screen("Revenue"), dataset.screen("Revenue"))
+    loaded.add("AAPL", "income_statement", _table(["Revenue"], [2024], 2))
+    assert list(loaded.screen("Revenue").columns) == [2023, 2024]
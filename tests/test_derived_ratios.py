@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import (
+    DERIVED_TABLES,
+    FINANCIAL_TABLES,
+    PAGE_TABLES,
+    RATIO_FORMULAS,
+    RoicScraper,
+    derive_ratio_tables,
+    parse_table,
+    reconcile_ratios,
+)
+
+
+def _no_browser(self, page, tables=None):
+    raise AssertionError("The browser must not be used.")
+
+
+def test_update_with_derive_only_scrapes_the_market_tables(stub_server, storage, monkeypatch):
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    roic = RoicScraper("AAPL", http_first=True, site_url=stub_server.url, storage=storage, memory_cache=None)
+    statements = roic.get_all_financial_statements()
+
+    scraped = []
+    scrape_page = RoicScraper.scrape_page
+
+    def record_scrape(self, page, tables=None):
+        scraped.append((page, tables))
+        return scrape_page(self, page, tables)
+
+    monkeypatch.setattr(RoicScraper, "scrape_page", record_scrape)
+    ratios = roic.get_all_ratios_data(update=True, derive=True)
+    market_tables = [name for name in PAGE_TABLES["ratios"] if name not in DERIVED_TABLES]
+    assert scraped == [("ratios", market_tables)]
+    assert list(ratios) == list(PAGE_TABLES["ratios"])
+    for name, df in roic.get_all_financial_statements().items():
+        pd.testing.assert_frame_equal(df, statements[name])
+
+
+def _statements(rows: dict) -> dict:
+    """Financial statements holding `rows`, spread over the three tables, for 2022 to 2024."""
+    columns = ["2022", "2023", "2024"]
+    tables = {name: {} for name in FINANCIAL_TABLES}
+    for i, (label, values) in enumerate(rows.items()):
+        tables[FINANCIAL_TABLES[i % len(FINANCIAL_TABLES)]][label] = values
+    statements = {}
+    for name, table_rows in tables.items():
+        df = pd.DataFrame.from_dict(table_rows, orient="index", columns=columns)
+        df.index.name = "index"
+        statements[name] = df
+    return statements
+
+
+def test_derived_ratios_follow_their_formulas():
+    statements = _statements(
+        {
+            "Sales/Revenue/Turnover": [100.0, 200.0, 0.0],
+            "Gross Profit": [40.0, 50.0, 10.0],
+            "Total Current Assets": [30.0, 60.0, np.nan],
+            "Total Current Liabilities": [10.0, 20.0, 30.0],
+            "Net Income Avail to Common GAAP": [10.0, 12.0, 14.0],
+            "Equity Before Minority Interest": [100.0, 140.0, 60.0],
+            "Basic Weighted Avg Shares": [10.0, 0.0, 20.0],
+        }
+    )
+    derived = derive_ratio_tables(statements, tables=["profitability", "liquidity", "per_share_data"])
+    assert list(derived) == ["profitability", "liquidity", "per_share_data"]
+
+    profitability = derived["profitability"]
+    assert list(profitability.index) == list(RATIO_FORMULAS["profitability"])
+    assert profitability.loc["Gross Margin (%)"].tolist()[:2] == [0.4, 0.25]
+    assert np.isnan(profitability.loc["Gross Margin (%)", "2024"])  # No revenue.
+    # Equity is averaged over the opening and closing balance, or the closing one in the first year.
+    assert profitability.loc["Return on Common Equity (%)"].tolist() == pytest.approx([0.1, 0.1, 0.14])
+    assert derived["liquidity"].loc["Current Ratio"].tolist()[:2] == [3.0, 3.0]
+    assert np.isnan(derived["liquidity"].loc["Current Ratio", "2024"])
+    assert derived["per_share_data"].loc["Revenue per Share"].fillna(-1).tolist() == [10.0, -1, 0.0]
+    # A row missing from every statement gives NaN.
+    assert derived["liquidity"].loc["Cash Ratio"].isna().all()
+
+
+def test_derived_tables_have_the_rows_of_the_ratios_page(pages):
+    statements = {name: parse_table(pages["financials"], xpath) for name, xpath in PAGE_TABLES["financials"].items()}
+    for table, df in derive_ratio_tables(statements).items():
+        scraped = parse_table(pages["ratios"], PAGE_TABLES["ratios"][table])
+        assert list(df.index) == list(scraped.index)
+        assert list(df.columns) == list(scraped.columns)
+
+
+def test_reconcile_ratios_reports_matching_years():
+    statements = _statements(
+        {
+            "Sales/Revenue/Turnover": [100.0, 200.0, 300.0],
+            "Gross Profit": [40.0, 50.0, 60.0],
+            "Operating Income (Loss)": [10.0, 20.0, np.nan],
+        }
+    )
+    derived = derive_ratio_tables(statements, tables=["profitability"])
+    scraped = derived["profitability"].copy()
+    scraped.loc["Gross Margin (%)", "2024"] *= 1.5
+    scraped.loc["Operating Margin (%)", "2023"] += 0.001
+    scraped = scraped.drop(index="EBITDA Margin (%)")
+
+    report = reconcile_ratios(derived, {"profitability": scraped}).set_index("metric")
+    assert "EBITDA Margin (%)" not in report.index
+    gross_margin = report.loc["Gross Margin (%)"]
+    assert (gross_margin["years"], gross_margin["matching"], gross_margin["reconciled"]) == (3, 2, False)
+    assert gross_margin["max_relative_difference"] == pytest.approx(1 / 3)
+    operating_margin = report.loc["Operating Margin (%)"]
+    assert (operating_margin["years"], operating_margin["matching"], operating_margin["reconciled"]) == (2, 2, True)
+    assert np.isnan(report.loc["Return on Capital (%)", "max_relative_difference"])
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from roic_scraper import DriverPool
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.alive = True
+        self.quit_calls = 0
+
+    @property
+    def current_url(self) -> str:
+        if not self.alive:
+            from selenium.common.exceptions import WebDriverException
+
+            raise WebDriverException("Session crashed.")
+        return "about:blank"
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+
+
+class FakeProfile:
+    def __init__(self) -> None:
+        self.started = []
+
+    def start_browser(self, chrome_driver_path: str) -> FakeBrowser:
+        browser = FakeBrowser()
+        self.started.append(browser)
+        return browser
+
+
+@pytest.fixture
+def profile() -> FakeProfile:
+    return FakeProfile()
+
+
+def test_released_session_is_reused(profile):
+    pool = DriverPool("chromedriver", size=2, profile=profile)
+    browser = pool.acquire()
+    pool.release(browser)
+    assert pool.acquire() is browser
+    assert len(profile.started) == 1
+
+
+def test_pool_never_starts_more_than_its_size(profile):
+    pool = DriverPool("chromedriver", size=2, profile=profile)
+    pool.acquire()
+    pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.1)
+    assert len(profile.started) == 2
+
+
+def test_waiter_gets_the_released_session(profile):
+    pool = DriverPool("chromedriver", size=1, profile=profile)
+    browser = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    pool.release(browser)
+    waiter.join()
+    assert acquired == [browser]
+
+
+@pytest.mark.parametrize("failed", [True, False])
+def test_waiter_wakes_when_a_session_is_discarded(profile, failed):
+    pool = DriverPool("chromedriver", size=1, max_page_loads=1, profile=profile)
+    browser = pool.acquire()
+    pool.record_page_load(browser)  # Worn out, so it is recycled even when it did not fail.
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    pool.release(browser, failed=failed)
+    waiter.join()
+    assert len(acquired) == 1 and acquired[0] is not browser
+    assert browser.quit_calls == 1
+    assert len(profile.started) == 2
+
+
+def test_dead_idle_session_is_replaced(profile):
+    pool = DriverPool("chromedriver", size=1, profile=profile)
+    browser = pool.acquire()
+    pool.release(browser)
+    browser.alive = False
+    replacement = pool.acquire(timeout=1)
+    assert replacement is not browser
+    assert browser.quit_calls == 1
+
+
+def test_failed_start_frees_its_slot(profile):
+    pool = DriverPool("chromedriver", size=1, profile=profile)
+    start_browser = profile.start_browser
+
+    def start_fails(chrome_driver_path: str):
+        raise RuntimeError("chromedriver missing")
+
+    profile.start_browser = start_fails
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    profile.start_browser = start_browser
+    assert pool.acquire(timeout=1) is profile.started[0]
+
+
+def test_close_quits_idle_sessions_and_later_releases(profile):
+    pool = DriverPool("chromedriver", size=2, profile=profile)
+    idle, lent = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert idle.quit_calls == 1
+    pool.release(lent)
+    assert lent.quit_calls == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_many_threads_share_a_small_pool(profile):
+    pool = DriverPool("chromedriver", size=2, max_page_loads=3, profile=profile)
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def scrape() -> None:
+        for _ in range(20):
+            browser = pool.acquire(timeout=5)
+            with lock:
+                if browser in in_use:
+                    errors.append("Session lent twice.")
+                in_use.add(browser)
+            pool.record_page_load(browser)
+            with lock:
+                in_use.discard(browser)
+            pool.release(browser)
+
+    threads = [threading.Thread(target=scrape) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sum(browser.quit_calls == 0 for browser in profile.started) <= 2
@@ -0,0 +1,56 @@
+import time
+
+import pandas as pd
+import pytest
+
+from roic_scraper import (
+    PAGE_TABLES,
+    RoicReader,
+    RoicScraper,
+    lxml_html,
+    parse_table,
+)
+
+
+def _no_browser(self, page, tables=None):
+    raise AssertionError("The browser must not be used.")
+
+
+@pytest.fixture
+def scraper(stub_server, storage, monkeypatch):
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    return RoicScraper("AAPL", http_first=True, site_url=stub_server.url, storage=storage, memory_cache=None)
+
+
+@pytest.mark.parametrize("page", list(PAGE_TABLES))
+def test_scrape_page_reads_every_table_over_http(scraper, pages, page):
+    data = scraper.scrape_page(page)
+    assert list(data) == list(PAGE_TABLES[page])
+    for name, df in data.items():
+        pd.testing.assert_frame_equal(df, parse_table(pages[page], PAGE_TABLES[page][name]))
+
+
+def test_scraped_tables_are_cached(scraper, storage, pages):
+    scraper.get_all_financial_statements()
+
+    reader = RoicReader("AAPL", storage=storage, memory_cache=None)
+    for name, df in reader.get_all_financial_statements().items():
+        pd.testing.assert_frame_equal(df, parse_table(pages["financials"], PAGE_TABLES["financials"][name]))
+        assert time.time() - storage.read_scrape_time("AAPL", name) < 60
+
+
+def test_http_path_falls_back_to_the_browser(stub_server, storage, pages, monkeypatch):
+    loaded = []
+
+    def load_page_snapshot(self, page, tables=None):
+        loaded.append(page)
+        return lxml_html.document_fromstring(pages[page])
+
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", load_page_snapshot)
+    # The stand-in server answers 404 for any other URL layout.
+    scraper = RoicScraper("AAPL", http_first=True, site_url=f"{stub_server.url}/moved", storage=storage)
+    assert scraper._scrape_page_http("financials", ["income_statement"]) is None
+
+    df = scraper.scrape_page("financials", ["income_statement"])["income_statement"]
+    assert loaded == ["financials"]
+    pd.testing.assert_frame_equal(df, parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"]))
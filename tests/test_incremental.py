@@ -0,0 +1,54 @@
+import time
+
+import pandas as pd
+import pytest
+
+from roic_scraper import (
+    DAY,
+    PAGE_TABLES,
+    CachePolicy,
+    RoicScraper,
+    TableCache,
+    parse_table,
+)
+
+
+def _no_browser(self, page, tables=None):
+    raise AssertionError("The browser must not be used.")
+
+
+@pytest.fixture
+def scraper(stub_server, storage, monkeypatch):
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    return RoicScraper("AAPL", http_first=True, site_url=stub_server.url, storage=storage, memory_cache=None)
+
+
+def test_incremental_update_appends_new_years(scraper, storage, pages):
+    full = parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"])
+    storage.write("AAPL", "income_statement", full[full.columns[:-2]])
+
+    df = scraper.update_income_statement(incremental=True)
+    pd.testing.assert_frame_equal(df, full)
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), full)
+
+
+def test_incremental_check_refreshes_the_memory_cache(stub_server, storage, pages, monkeypatch):
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    full = parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"])
+    storage.write("AAPL", "income_statement", full)
+    storage.write_scrape_time("AAPL", "income_statement", time.time() - 30 * DAY)
+    memory_cache = TableCache()
+    scraper = RoicScraper(
+        "AAPL",
+        http_first=True,
+        site_url=stub_server.url,
+        storage=storage,
+        memory_cache=memory_cache,
+        cache_policy=CachePolicy(wait_for_new_period=False),
+    )
+    assert scraper.is_stale("income_statement")
+    assert ("AAPL", "US", "income_statement") in memory_cache
+
+    scraper.update_income_statement(incremental=True)
+    assert ("AAPL", "US", "income_statement") not in memory_cache
+    assert not scraper.is_stale("income_statement")
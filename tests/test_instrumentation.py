@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from roic_scraper import DURATION_BUCKETS, JsonLinesWriter, MetricsRegistry
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.count("webdriver_round_trips_total", 3, ticker="AAPL", table="income_statement")
+    registry.count("webdriver_round_trips_total", 2, ticker="MSFT", table="income_statement")
+    registry.observe("stage_seconds", 0.2, stage="page_load", ticker="AAPL", table="financials")
+    registry.observe("stage_seconds", 3.0, stage="page_load", ticker="AAPL", table="financials")
+    return registry
+
+
+def test_to_prometheus(registry):
+    lines = registry.to_prometheus().splitlines()
+    assert lines[:3] == [
+        "# TYPE roic_webdriver_round_trips_total counter",
+        'roic_webdriver_round_trips_total{table="income_statement",ticker="AAPL"} 3',
+        'roic_webdriver_round_trips_total{table="income_statement",ticker="MSFT"} 2',
+    ]
+    labels = 'stage="page_load",table="financials",ticker="AAPL"'
+    assert "# TYPE roic_stage_seconds histogram" in lines
+    # Buckets are cumulative.
+    assert f'roic_stage_seconds_bucket{{{labels},le="0.1"}} 0' in lines
+    assert f'roic_stage_seconds_bucket{{{labels},le="0.25"}} 1' in lines
+    assert f'roic_stage_seconds_bucket{{{labels},le="5"}} 2' in lines
+    assert f'roic_stage_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"roic_stage_seconds_sum{{{labels}}} 3.2" in lines
+    assert f"roic_stage_seconds_count{{{labels}}} 2" in lines
+
+
+def test_to_json_lines(registry):
+    records = [json.loads(line) for line in registry.to_json_lines().splitlines()]
+    assert records[0] == {
+        "type": "counter", "name": "webdriver_round_trips_total", "value": 3, "ticker": "AAPL", "table": "income_statement"
+    }
+    histogram = records[2]
+    assert (histogram["name"], histogram["stage"], histogram["count"]) == ("stage_seconds", "page_load", 2)
+    assert histogram["sum"] == pytest.approx(3.2)
+    assert list(histogram["buckets"]) == [str(bound) for bound in DURATION_BUCKETS]
+    assert histogram["buckets"]["inf"] == 2
+
+
+def test_timed_stage_counts_failures(tmp_path):
+    registry = MetricsRegistry()
+    path = tmp_path / "events.jsonl"
+    registry.add_listener(JsonLinesWriter(str(path)))
+    with pytest.raises(ValueError):
+        with registry.time("table_parse", ticker="AAPL", table="summary"):
+            raise ValueError("bad cell")
+    assert registry.get_counter("stage_failures_total", stage="table_parse") == 1
+    assert registry.get_counter("stage_failures_total", ticker="MSFT") == 0
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(event["type"], event["name"]) for event in events] == [
+        ("counter", "stage_failures_total"), ("histogram", "stage_seconds")
+    ]
+
+    registry.reset()
+    assert registry.to_prometheus() == "\n"
@@ -0,0 +1,69 @@
+import pytest
+
+from roic_scraper import PAGE_TABLES, JobJournal, ScrapeError, parse_table, scrape_batch
+
+
+@pytest.fixture
+def journal_path(tmp_path) -> str:
+    return str(tmp_path / "journal.db")
+
+
+def test_resumed_run_skips_done_tasks_and_recovers_running_ones(journal_path):
+    journal = JobJournal(journal_path)
+    journal.add_tasks(["aapl", "msft"], ["summary"])
+    journal.mark_running("AAPL", "summary")
+    journal.mark_done("AAPL", "summary")
+    journal.mark_running("MSFT", "summary")
+    journal.close()  # The run dies with MSFT still running.
+
+    journal = JobJournal(journal_path)
+    journal.add_tasks(["AAPL", "MSFT", "GOOG"], ["summary"])
+    assert journal.recover() == 1
+    assert journal.get_runnable() == [("GOOG", "summary"), ("MSFT", "summary")]
+    assert journal.get_summary() == {"done": 1, "pending": 2}
+
+
+def test_backoff_doubles_up_to_its_limit(journal_path, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("roic_scraper.time.time", lambda: now)
+    journal = JobJournal(journal_path, max_attempts=10, backoff=30, max_backoff=100)
+    journal.add_tasks(["AAPL"], ["summary"])
+    delays = []
+    for _ in range(4):
+        journal.mark_running("AAPL", "summary")
+        assert not journal.mark_failed("AAPL", "summary", "timeout")
+        delays.append(journal.get_next_retry_time() - now)
+        assert journal.get_runnable(now) == []
+        assert journal.get_runnable(now + delays[-1]) == [("AAPL", "summary")]
+    assert delays == [30, 60, 100, 100]
+
+
+def test_task_is_dead_once_out_of_attempts(journal_path):
+    journal = JobJournal(journal_path, max_attempts=2, backoff=0)
+    journal.add_tasks(["AAPL"], ["summary"])
+    for attempt in range(2):
+        journal.mark_running("AAPL", "summary")
+        dead = journal.mark_failed("AAPL", "summary", f"timeout {attempt}")
+    assert dead
+    assert journal.get_runnable() == []
+    assert journal.get_next_retry_time() is None
+    task = journal.to_frame().iloc[0]
+    assert (task["state"], task["attempts"], task["last_error"]) == ("dead", 2, "timeout 1")
+
+
+def test_batch_with_a_journal_retries_then_yields_errors(storage, pages, journal_path, tmp_path, monkeypatch):
+    monkeypatch.delenv("ROIC_SCRAPER_CHROMEDRIVER", raising=False)
+    monkeypatch.setenv("ROIC_SCRAPER_CONFIG", str(tmp_path / "missing.json"))  # Scrapes fail without a browser.
+    for name, table_xpath in PAGE_TABLES["summary"].items():
+        storage.write("AAPL", name, parse_table(pages["summary"], table_xpath))
+
+    journal = JobJournal(journal_path, max_attempts=2, backoff=0.01)
+    results = list(scrape_batch(["AAPL", "MSFT"], ["summary"], max_workers=2, storage=storage, journal=journal))
+    errors = [data for ticker, _, data in results if ticker == "MSFT"]
+    assert len(errors) == len(PAGE_TABLES["summary"])
+    assert all(isinstance(error, ScrapeError) for error in errors)
+    assert journal.get_summary() == {"dead": 1, "done": 1}
+    assert journal.to_frame().set_index("ticker").loc["MSFT", "attempts"] == 2
+
+    # Nothing is left to run when the same journal is used again.
+    assert list(scrape_batch(["AAPL", "MSFT"], ["summary"], max_workers=2, storage=storage, journal=journal)) == []
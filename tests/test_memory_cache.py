@@ -0,0 +1,69 @@
+import json
+
+import pandas as pd
+import pytest
+
+from roic_scraper import RoicReader, TableCache, get_setting, load_config
+
+
+def _table(value: float) -> pd.DataFrame:
+    return pd.DataFrame({"2024": [value]}, index=pd.Index(["Revenue"], name="index"))
+
+
+def test_least_recently_used_table_is_evicted():
+    cache = TableCache(max_tables=2)
+    cache.put(("AAPL", "US", "summary"), _table(1), 1.0)
+    cache.put(("MSFT", "US", "summary"), _table(2), 2.0)
+    assert cache.get(("AAPL", "US", "summary"))[1] == 1.0  # Now the most recently used.
+    cache.put(("GOOG", "US", "summary"), _table(3), 3.0)
+
+    assert ("MSFT", "US", "summary") not in cache
+    assert ("AAPL", "US", "summary") in cache
+    assert ("GOOG", "US", "summary") in cache
+    assert cache.get(("MSFT", "US", "summary")) is None
+
+
+def test_cached_tables_are_copied_both_ways():
+    cache = TableCache()
+    df = _table(1)
+    cache.put(("AAPL", "US", "summary"), df, 1.0)
+    df.iloc[0, 0] = 99
+    cached, _ = cache.get(("AAPL", "US", "summary"))
+    cached.iloc[0, 0] = 42
+    assert cache.get(("AAPL", "US", "summary"))[0].iloc[0, 0] == 1
+
+
+def test_reader_fills_the_cache_and_serves_from_it(storage):
+    storage.write("AAPL", "summary", _table(1))
+    storage.write_scrape_time("AAPL", "summary", 123.0)
+    cache = TableCache()
+    reader = RoicReader("aapl", storage=storage, memory_cache=cache)
+    pd.testing.assert_frame_equal(reader.get_table("summary"), _table(1))
+    assert cache.get(("AAPL", "US", "summary"))[1] == 123.0
+
+    storage.write("AAPL", "summary", _table(2))
+    pd.testing.assert_frame_equal(reader.get_table("summary"), _table(1))
+    cache.invalidate(("AAPL", "US", "summary"))
+    pd.testing.assert_frame_equal(reader.get_table("summary"), _table(2))
+
+
+def test_config_is_read_once_per_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"data_export_path": "first", "chrome_driver_path": "chromedriver"}))
+    monkeypatch.setenv("ROIC_SCRAPER_CONFIG", str(path))
+    monkeypatch.delenv("ROIC_SCRAPER_DATA_PATH", raising=False)
+    assert load_config()["data_export_path"] == "first"
+
+    path.write_text(json.dumps({"data_export_path": "second"}))
+    assert get_setting("data_export_path") == "first"
+    assert get_setting("data_export_path", "passed") == "passed"
+    monkeypatch.setenv("ROIC_SCRAPER_DATA_PATH", "from-env")
+    assert get_setting("data_export_path") == "from-env"
+
+
+def test_missing_config_is_only_an_error_when_a_setting_is_needed(tmp_path, monkeypatch):
+    monkeypatch.setenv("ROIC_SCRAPER_CONFIG", str(tmp_path / "missing.json"))
+    monkeypatch.delenv("ROIC_SCRAPER_CHROMEDRIVER", raising=False)
+    RoicReader("AAPL", data_export_path=str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        get_setting("chrome_driver_path")
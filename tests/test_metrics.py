@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import RoicScraper, cagr, rolling_mean, yoy_growth
+
+
+def test_yoy_growth_matches_pct_change_except_after_zero(storage):
+    values = pd.Series([100.0, -50.0, -25.0, np.nan, 10.0, 0.0, 5.0], index=[str(y) for y in range(2018, 2025)])
+    expected = values.pct_change(fill_method=None).replace([np.inf, -np.inf], np.nan)
+    pd.testing.assert_series_equal(yoy_growth(values), expected)
+    # A loss that shrinks is negative growth, as with pct_change.
+    assert yoy_growth(values)["2020"] == -0.5
+    pd.testing.assert_series_equal(RoicScraper("AAPL", storage=storage).calc_growth(values), expected)
+
+
+def test_yoy_growth_over_several_periods_of_a_table():
+    df = pd.DataFrame([[100.0, 110.0, 121.0], [np.nan, 50.0, 75.0]], columns=["2022", "2023", "2024"])
+    growth = yoy_growth(df, periods=2)
+    assert growth.columns.tolist() == df.columns.tolist()
+    assert growth.iloc[:, :2].isna().all().all()
+    assert growth.iloc[0, 2] == pytest.approx(0.21)
+    assert np.isnan(growth.iloc[1, 2])  # Its value two years earlier is missing.
+
+
+def test_yoy_growth_parses_cell_text():
+    pd.testing.assert_series_equal(
+        yoy_growth(pd.Series(["1,000", "(500)", "- -", "250"])), pd.Series([np.nan, -1.5, np.nan, np.nan])
+    )
+
+
+def test_cagr_needs_a_positive_start_and_a_present_end():
+    values = np.array([[100.0, 150.0, 121.0], [-10.0, 5.0, 20.0], [100.0, np.nan, -1.0], [0.0, 1.0, 2.0]])
+    result = cagr(values, 2)
+    assert np.isnan(result[:, :2]).all()
+    assert result[0, 2] == pytest.approx(0.1)
+    assert np.isnan(result[1:, 2]).all()  # Negative start, negative end, zero start.
+
+
+def test_rolling_mean_skips_missing_values():
+    values = pd.Series([1.0, np.nan, 3.0, 5.0, np.nan, np.nan])
+    means = rolling_mean(values, 3, min_periods=2)
+    assert means.tolist()[2:5] == [2.0, 4.0, 4.0]
+    assert means.isna().tolist() == [True, True, False, False, False, True]
+    # By default every year of the window is needed.
+    assert rolling_mean(values, 3).isna().all()
+    assert rolling_mean(values, 2, min_periods=1).tolist()[:2] == [1.0, 1.0]
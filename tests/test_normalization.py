@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from roic_scraper import normalize_values
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1,234.5", 1234.5),
+        ("(12.5)", -12.5),
+        ("1.5K", 1500.0),
+        ("2M", 2e6),
+        ("3b", 3e9),
+        ("$4", 4.0),
+        ("12.5%", 0.125),
+        ("(10%)", -0.1),
+        (" 7 ", 7.0),
+    ],
+)
+def test_normalize_values_parses_cell_text(text, expected):
+    assert normalize_values([[text]])[0, 0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["- -", "--", "-", "N\\A", "N/A", "NA", "", "abc", None])
+def test_normalize_values_turns_missing_cells_into_nan(text):
+    assert np.isnan(normalize_values([[text]])[0, 0])
+
+
+def test_normalize_values_scales_flagged_rows():
+    values = normalize_values([["50", "25"], ["50", "25"]], percent_rows=[True, False])
+    np.testing.assert_array_equal(values, [[0.5, 0.25], [50.0, 25.0]])
+
+
+def test_normalize_values_keeps_the_grid_shape():
+    assert normalize_values(np.empty((0, 0), dtype=object)).shape == (0, 0)
+    assert normalize_values([["1", "2", "3"], ["4", "5", "6"]]).shape == (2, 3)
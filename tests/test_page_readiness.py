@@ -0,0 +1,48 @@
+import pytest
+
+import roic_scraper
+from roic_scraper import MetricsRegistry, RoicScraper, _TablesReady
+
+
+class FakePage:
+    def __init__(self, states: list) -> None:
+        self.states = states
+        self.polls = 0
+
+    def execute_script(self, script, table_xpaths):
+        state = self.states[min(self.polls, len(self.states) - 1)]
+        self.polls += 1
+        return state
+
+
+def _poll_until_ready(condition, page, max_polls: int = 50):
+    for poll in range(1, max_polls + 1):
+        if condition(page):
+            return poll
+    return None
+
+
+def test_tables_ready_once_populated_and_stable():
+    condition = _TablesReady(["a", "b"])
+    page = FakePage([["loading", 1, [-1, -1]], ["complete", 4, [0, 3]], ["complete", 5, [10, 12]]])
+    assert _poll_until_ready(condition, page) == 5
+    assert condition.empty == []
+
+
+def test_tables_that_stay_empty_or_missing_are_reported():
+    condition = _TablesReady(["a", "b", "c"])
+    page = FakePage([["complete", 5, [10, 0, -1]]])
+    assert _poll_until_ready(condition, page) is not None
+    assert condition.empty == ["b", "c"]
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_empty_tables_are_counted_and_only_printed_in_debug(storage, monkeypatch, capsys, debug):
+    pytest.importorskip("selenium")
+    monkeypatch.setattr(roic_scraper, "READY_POLL_INTERVAL", 0.001)
+    registry = MetricsRegistry()
+    scraper = RoicScraper("AAPL", debug=debug, storage=storage, metrics=registry)
+    scraper.browser = FakePage([["complete", 5, [10, 0]]])
+    scraper._wait_for_tables(["a", "b"], page="financials")
+    assert registry.to_json_lines().count('"empty_tables_total"') == 1
+    assert ("table has no rows: b" in capsys.readouterr().out) == debug
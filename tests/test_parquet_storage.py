@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import ParquetStorage
+
+def _table(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(scale=1e5, size=(4, 3)),
+        index=["Revenue", "Gross Profit", "Net Income", "Gross Margin (%)"],
+        columns=["2022", "2023", "2024"],
+    )
+    df.iloc[1, 0] = np.nan
+    df.index.name = "index"
+    return df
+
+
+def test_parquet_round_trip_and_compact(tmp_path):
+    pytest.importorskip("pyarrow")
+    storage = ParquetStorage(str(tmp_path / "parquet"), durable=False)
+    storage.write("AAPL", "income_statement", _table(1))
+    storage.write("MSFT", "income_statement", _table(2))
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table(1), check_names=False)
+
+    storage.compact("income_statement")
+    pd.testing.assert_frame_equal(storage.read("MSFT", "income_statement"), _table(2), check_names=False)
+    gross_profits = storage.read_metric("income_statement", "Gross Profit")
+    assert list(gross_profits.index) == ["AAPL", "MSFT"]
+    assert gross_profits.loc["MSFT", 2024] == _table(2).loc["Gross Profit", "2024"]
+
+
+def test_part_written_during_compaction_is_kept(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    storage = ParquetStorage(str(tmp_path / "parquet"), durable=False)
+    storage.write("AAPL", "income_statement", _table(1))
+    wide_to_long = ParquetStorage._wide_to_long
+
+    def write_during_compaction(ticker, df):
+        # Another process rewrites the table while its old part is being merged.
+        storage.write("AAPL", "income_statement", _table(2))
+        assert storage.exists("AAPL", "income_statement")
+        return wide_to_long(ticker, df)
+
+    monkeypatch.setattr(ParquetStorage, "_wide_to_long", staticmethod(write_during_compaction))
+    storage.compact("income_statement")
+    monkeypatch.undo()
+
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table(2), check_names=False)
+    assert storage.read_metric("income_statement", "Revenue").loc["AAPL", 2024] == _table(1).loc["Revenue", "2024"]
+    storage.compact("income_statement")
+    assert storage.read_metric("income_statement", "Revenue").loc["AAPL", 2024] == _table(2).loc["Revenue", "2024"]
+
+
+def test_compaction_drops_columns_that_are_not_years(tmp_path):
+    pytest.importorskip("pyarrow")
+    storage = ParquetStorage(str(tmp_path / "parquet"), durable=False)
+    df = _table(1)
+    df["TTM"] = 1.0
+    storage.write("AAPL", "income_statement", df)
+    storage.compact("income_statement")
+    pd.testing.assert_frame_equal(storage.read("AAPL", "income_statement"), _table(1), check_names=False)
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from roic_scraper import (
+    PAGE_TABLES,
+    TableNotFoundError,
+    _find_table,
+    extract_table_cells,
+    parse_table,
+    parse_table_labels,
+)
+
+INCOME_STATEMENT = PAGE_TABLES["financials"]["income_statement"]
+
+
+def test_parse_table_reads_every_table_of_every_page(pages):
+    for page, tables in PAGE_TABLES.items():
+        for name, table_xpath in tables.items():
+            df = parse_table(pages[page], table_xpath)
+            assert not df.empty, name
+            assert df.index.name == "index"
+            assert list(df.dtypes.unique()) == [np.dtype("float64")]
+            assert list(df.columns) == [str(year) for year in range(1994, 1994 + df.shape[1])]
+
+
+def test_parse_table_matches_the_raw_cells(pages):
+    df = parse_table(pages["financials"], INCOME_STATEMENT)
+    assert df.shape == (41, 30)
+    assert list(df.index[:3]) == ["Sales/Revenue/Turnover", "Sales & Services Revenue", "Cost of Revenue"]
+    assert df.loc["Sales/Revenue/Turnover", "1994"] == 56093.92
+    assert df.loc["Sales/Revenue/Turnover", "1995"] == 25147.92
+
+
+def test_parse_table_scales_percent_rows(pages):
+    table = _find_table(pages["ratios"], PAGE_TABLES["ratios"]["profitability"])
+    labels = parse_table_labels(table)
+    grid, _ = extract_table_cells(table, labels)
+    raw = float(grid[0, 0].replace(",", ""))
+
+    df = parse_table(pages["ratios"], PAGE_TABLES["ratios"]["profitability"])
+    assert df.index[0] == "Return on Common Equity (%)"
+    assert df.iloc[0, 0] == pytest.approx(raw / 100)
+
+
+def test_parse_table_reads_only_the_requested_columns(pages):
+    full = parse_table(pages["financials"], INCOME_STATEMENT)
+    df = parse_table(pages["financials"], INCOME_STATEMENT, columns=["2020", "2021"])
+    assert list(df.columns) == ["2020", "2021"]
+    pd.testing.assert_frame_equal(df, full[["2020", "2021"]])
+
+
+def test_parse_table_accepts_a_parsed_snapshot(pages):
+    from lxml import html as lxml_html
+
+    snapshot = lxml_html.document_fromstring(pages["financials"])
+    pd.testing.assert_frame_equal(
+        parse_table(snapshot, INCOME_STATEMENT), parse_table(pages["financials"], INCOME_STATEMENT)
+    )
+
+
+def test_missing_table_raises_table_not_found(pages):
+    with pytest.raises(TableNotFoundError):
+        parse_table(pages["summary"], INCOME_STATEMENT)
+    with pytest.raises(LookupError):
+        parse_table("<html><body></body></html>", INCOME_STATEMENT)
+
+
+def test_parsing_saved_html_does_not_import_selenium():
+    code = (
+        "import sys, roic_scraper\n"
+        "try:\n"
+        "    roic_scraper.parse_table('<html><body></body></html>', '//table')\n"
+        "except roic_scraper.TableNotFoundError:\n"
+        "    pass\n"
+        "assert not any(name.startswith('selenium') for name in sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
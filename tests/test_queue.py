@@ -0,0 +1,150 @@
+import pickle
+import threading
+import time
+
+import pytest
+
+from roic_scraper import RedisQueue, SqliteQueue
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, tmp_path):
+    """Build queues of either backend, all sharing the same tasks."""
+    if request.param == "sqlite":
+        return lambda max_attempts=3: SqliteQueue(str(tmp_path / "queue.db"), max_attempts=max_attempts)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua scripts with it.
+    server = fakeredis.FakeServer()
+    return lambda max_attempts=3: RedisQueue(fakeredis.FakeRedis(server=server), max_attempts=max_attempts)
+
+
+def _drain(work_queue, worker: str) -> list:
+    tasks = []
+    while (task := work_queue.lease(worker)) is not None:
+        tasks.append(task)
+    return tasks
+
+
+def test_enqueue_is_idempotent(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue(["aapl", "msft"], pages=["summary", "ratios"])
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    assert work_queue.get_summary() == {"pending": 4}
+
+
+def test_lease_hands_out_every_task_once(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue(["AAPL", "MSFT"], pages=["summary", "ratios"])
+    tasks = _drain(work_queue, "worker-1")
+    assert sorted((task["ticker"], task["page"]) for task in tasks) == [
+        ("AAPL", "ratios"), ("AAPL", "summary"), ("MSFT", "ratios"), ("MSFT", "summary")
+    ]
+    assert all(task["country"] == "US" and task["attempt"] == 1 for task in tasks)
+    assert work_queue.get_summary() == {"leased": 4}
+
+
+def test_concurrent_workers_never_share_a_task(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue([f"T{i}" for i in range(50)], pages=["summary", "financials"])
+    leased = {}
+
+    def work(worker: str) -> None:
+        # Each worker has its own connection, like a worker process.
+        own_queue = make_queue()
+        leased[worker] = _drain(own_queue, worker)
+        for task in leased[worker]:
+            own_queue.complete(task["id"], worker)
+
+    threads = [threading.Thread(target=work, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [task["id"] for tasks in leased.values() for task in tasks]
+    assert len(ids) == len(set(ids)) == 100
+    assert work_queue.get_summary() == {"done": 100}
+
+
+def test_expired_lease_is_handed_to_another_worker(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    task = work_queue.lease("dead-worker", lease_seconds=0.05)
+    assert work_queue.lease("worker-2") is None
+    time.sleep(0.1)
+
+    retried = work_queue.lease("worker-2")
+    assert retried["id"] == task["id"]
+    assert retried["attempt"] == 2
+    # The first worker lost the task, so its heartbeat, completion and failure are ignored.
+    assert not work_queue.heartbeat(task["id"], "dead-worker")
+    work_queue.complete(task["id"], "dead-worker")
+    work_queue.fail(task["id"], "dead-worker", "late")
+    assert work_queue.get_summary() == {"leased": 1}
+
+
+def test_heartbeat_keeps_the_lease(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    task = work_queue.lease("worker-1", lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert work_queue.heartbeat(task["id"], "worker-1", lease_seconds=0.2)
+    assert work_queue.lease("worker-2") is None
+    work_queue.complete(task["id"], "worker-1")
+    assert work_queue.get_summary() == {"done": 1}
+
+
+def test_failed_task_is_retried_until_it_is_dead(make_queue):
+    work_queue = make_queue(max_attempts=2)
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    task = work_queue.lease("worker-1")
+    work_queue.fail(task["id"], "worker-1", "timeout")
+    assert work_queue.get_summary() == {"pending": 1}
+
+    task = work_queue.lease("worker-1")
+    assert task["attempt"] == 2
+    work_queue.fail(task["id"], "worker-1", "timeout")
+    assert work_queue.get_summary() == {"dead": 1}
+    assert work_queue.lease("worker-1") is None
+
+
+def test_lease_expiring_on_the_last_attempt_marks_the_task_dead(make_queue):
+    work_queue = make_queue(max_attempts=1)
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    work_queue.lease("dead-worker", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert work_queue.lease("worker-2") is None
+    assert work_queue.get_summary() == {"dead": 1}
+
+
+def test_sqlite_queue_reconnects_when_unpickled(tmp_path):
+    work_queue = SqliteQueue(str(tmp_path / "queue.db"))
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+    assert pickle.loads(pickle.dumps(work_queue)).lease("worker-1")["ticker"] == "AAPL"
+
+
+def test_redis_queue_reconnects_from_its_url_when_unpickled(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    redis = pytest.importorskip("redis")
+    server = fakeredis.FakeServer()
+    urls = []
+
+    def from_url(url, **kwargs):
+        urls.append(url)
+        return fakeredis.FakeRedis(server=server)
+
+    monkeypatch.setattr(redis.Redis, "from_url", staticmethod(from_url))
+    work_queue = RedisQueue.from_url("redis://queue-host:6379/0", name="refresh")
+    work_queue.enqueue(["AAPL"], pages=["summary"])
+
+    copy = pickle.loads(pickle.dumps(work_queue))
+    assert urls == ["redis://queue-host:6379/0"] * 2
+    assert copy.name == "refresh"
+    assert copy.lease("worker-1")["ticker"] == "AAPL"
+
+
+def test_redis_queue_built_from_a_client_refuses_to_pickle():
+    fakeredis = pytest.importorskip("fakeredis")
+    with pytest.raises(TypeError):
+        pickle.dumps(RedisQueue(fakeredis.FakeRedis()))
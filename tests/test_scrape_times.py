@@ -0,0 +1,30 @@
+import multiprocessing
+
+import pytest
+
+from roic_scraper import (
+    CsvStorage,
+    ParquetStorage,
+)
+
+TABLES = ["summary", "income_statement", "profitability"]
+
+
+def _write_scrape_times(args) -> None:
+    kind, root, table = args
+    storage = CsvStorage(root, durable=False) if kind == "csv" else ParquetStorage(root, durable=False)
+    for i in range(50):
+        storage.write_scrape_time(f"T{i}", table, 1.0)
+
+
+@pytest.mark.parametrize("kind", ["csv", "parquet"])
+def test_parallel_scrape_time_writes_are_not_lost(tmp_path, kind):
+    if kind == "parquet":
+        pytest.importorskip("pyarrow")
+    root = str(tmp_path / "data")
+    with multiprocessing.get_context("spawn").Pool(len(TABLES)) as pool:
+        pool.map(_write_scrape_times, [(kind, root, table) for table in TABLES])
+    storage = CsvStorage(root) if kind == "csv" else ParquetStorage(root)
+    for i in range(50):
+        for table in TABLES:
+            assert storage.read_scrape_time(f"T{i}", table) == 1.0
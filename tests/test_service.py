@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from roic_scraper import (
+    PAGE_TABLES,
+    MetricsRegistry,
+    RoicScraper,
+    ScrapeService,
+    SingleFlight,
+    TableCache,
+    parse_table,
+    serve,
+)
+
+
+def _no_browser(self, page, tables=None):
+    raise AssertionError("The browser must not be used.")
+
+
+def _run_threads(target, n: int) -> list:
+    results = [None] * n
+
+    def run(i: int) -> None:
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_one_call_per_key():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "result"
+
+    results = _run_threads(lambda i: flights.do("key", work), 5)
+    assert calls == [1]
+    assert sorted(results) == [("result", False)] + [("result", True)] * 4
+    assert len(flights) == 0
+    assert flights.do("key", lambda: "again") == ("again", False)
+
+
+def test_single_flight_shares_the_exception():
+    flights = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("page failed")
+
+    def call(i: int):
+        try:
+            flights.do("key", fail)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_threads(call, 3) == ["page failed"] * 3
+    assert len(flights) == 0
+
+
+@pytest.fixture
+def scrapes(stub_server, monkeypatch) -> list:
+    """Pages scraped by the service, each scrape taking a little while."""
+    monkeypatch.setattr(RoicScraper, "_load_page_snapshot", _no_browser)
+    scraped = []
+    scrape_page = RoicScraper.scrape_page
+
+    def slow_scrape(self, page, tables=None):
+        scraped.append((page, tables))
+        time.sleep(0.2)
+        return scrape_page(self, page, tables)
+
+    monkeypatch.setattr(RoicScraper, "scrape_page", slow_scrape)
+    return scraped
+
+
+@pytest.fixture
+def service(stub_server, storage, scrapes) -> ScrapeService:
+    return ScrapeService(
+        storage, http_first=True, site_url=stub_server.url, memory_cache=TableCache(), metrics=MetricsRegistry()
+    )
+
+
+def test_concurrent_requests_share_one_scrape(service, scrapes, pages):
+    tables = list(PAGE_TABLES["financials"]) * 3
+    results = _run_threads(lambda i: service.get_table("aapl", tables[i]), len(tables))
+
+    assert scrapes == [("financials", list(PAGE_TABLES["financials"]))]
+    for table, (df, tier) in zip(tables, results):
+        assert tier == "scrape"
+        pd.testing.assert_frame_equal(df, parse_table(pages["financials"], PAGE_TABLES["financials"][table]))
+    assert service.metrics.get_counter("service_coalesced_total") == len(tables) - 1
+
+    df, tier = service.get_table("AAPL", "balance_sheet")
+    assert tier == "memory"
+    assert service.memory_cache.get(("AAPL", "US", "balance_sheet"))[1] == service.storage.read_scrape_time(
+        "AAPL", "balance_sheet"
+    )
+
+
+def test_tables_read_from_disk_keep_their_scrape_time(service, scrapes, storage, pages):
+    storage.write("AAPL", "income_statement", parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"]))
+    storage.write_scrape_time("AAPL", "income_statement", 123.0)
+
+    _, tier = service.get_table("AAPL", "cash_flow")
+    assert tier == "scrape"
+    assert scrapes == [("financials", ["balance_sheet", "cash_flow"])]
+    assert service.memory_cache.get(("AAPL", "US", "income_statement"))[1] == 123.0
+    assert service.memory_cache.get(("AAPL", "US", "cash_flow"))[1] == storage.read_scrape_time("AAPL", "cash_flow")
+
+
+def test_update_does_not_join_a_plain_request(service, scrapes):
+    def request(i: int):
+        time.sleep(0.05 * i)  # The update starts while the plain request is scraping.
+        return service.get_table("AAPL", "income_statement", update=i == 1)
+
+    results = _run_threads(request, 2)
+    assert [tier for _, tier in results] == ["scrape", "scrape"]
+    assert len(scrapes) == 2
+    assert service.metrics.get_counter("service_coalesced_total") == 0
+
+
+def test_served_over_http(service, pages):
+    server = serve(service, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/tables/aapl/income_statement") as response:
+            assert response.headers["X-Roic-Tier"] == "scrape"
+            df = pd.read_json(response, orient="split")
+        expected = parse_table(pages["financials"], PAGE_TABLES["financials"]["income_statement"])
+        assert df.shape == expected.shape
+        with urllib.request.urlopen(f"{url}/health") as response:
+            assert json.load(response) == {"status": "ok", "in_flight": 0}
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/tables/aapl/unknown_table")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from roic_scraper import Universe, UniverseTable
+
+
+def _table(metrics: list, years: list, start: float) -> pd.DataFrame:
+    values = np.arange(len(metrics) * len(years), dtype="float64").reshape(len(metrics), len(years)) + start
+    return pd.DataFrame(values, index=pd.Index(metrics, name="index"), columns=[str(year) for year in years])
+
+
+@pytest.fixture
+def tables() -> dict:
+    return {
+        "AAPL": _table(["Revenue", "Gross Profit", "Net Income"], [2022, 2023, 2024], 0),
+        "MSFT": _table(["Revenue", "Net Income"], [2023, 2024], 100),
+        "GOOG": _table(["Net Income", "Revenue", "Revenue"], [2021, 2022], 200),
+    }
+
+
+def test_get_is_a_view_of_the_block(tables):
+    universe_table = UniverseTable.from_tables("income_statement", tables)
+    assert list(universe_table.years) == ["2021", "2022", "2023", "2024"]
+
+    df = universe_table.get("msft")
+    assert isinstance(df.index, pd.CategoricalIndex)
+    assert list(df.index) == ["Revenue", "Net Income"]
+    np.testing.assert_array_equal(df.to_numpy(), tables["MSFT"].reindex(columns=universe_table.years).to_numpy())
+    assert np.shares_memory(df.to_numpy(), universe_table.block)
+
+    df.iloc[0, 3] = -1.0
+    assert universe_table.get("MSFT").iloc[0, 3] == -1.0
+    with pytest.raises(KeyError):
+        universe_table.get("TSLA")
+
+
+def test_screen_gathers_one_metric_for_every_ticker(tables):
+    universe_table = UniverseTable.from_tables("income_statement", tables)
+    revenue = universe_table.screen("Revenue")
+    assert list(revenue.index) == ["AAPL", "MSFT", "GOOG"]
+    assert revenue.loc["AAPL"].tolist()[1:] == tables["AAPL"].loc["Revenue"].tolist()
+    np.testing.assert_array_equal(revenue.loc["MSFT"].to_numpy(), [np.nan, np.nan, 100.0, 101.0])
+    # A label repeated within a table keeps its first row.
+    assert revenue.loc["GOOG"].tolist()[:2] == tables["GOOG"].iloc[1].tolist()
+
+    assert list(universe_table.screen("Gross Profit").index) == ["AAPL"]
+    with pytest.raises(KeyError):
+        universe_table.screen("EBITDA")
+
+
+def test_universe_from_storage_skips_missing_tables(storage, tables):
+    for ticker, df in tables.items():
+        storage.write(ticker, "income_statement", df)
+    storage.write("AAPL", "balance_sheet", _table(["Total Assets"], [2024], 5))
+
+    universe = Universe.from_storage(storage, ["aapl", "msft", "goog", "tsla"], ["income_statement", "balance_sheet"])
+    assert universe.tables["income_statement"].tickers == ["AAPL", "MSFT", "GOOG"]
+    assert universe.tables["balance_sheet"].tickers == ["AAPL"]
+    assert universe.get("AAPL", "balance_sheet").loc["Total Assets", "2024"] == 5.0
+    pd.testing.assert_frame_equal(
+        universe.screen("Net Income", "income_statement"),
+        universe.tables["income_statement"].screen("Net Income"),
+    )
+
+    small = Universe.from_storage(storage, ["aapl", "msft", "goog"], ["income_statement"], dtype="float32")
+    assert small.tables["income_statement"].block.nbytes * 2 == universe.tables["income_statement"].block.nbytes
+    assert small.nbytes < universe.nbytes